@@ -14,7 +14,6 @@ import pandas as pd
 import schedule
 import time
 import traceback
-from concurrent.futures import ThreadPoolExecutor, as_completed
 import os
 from pathlib import Path
 import json
@@ -22,9 +21,13 @@ import json
 # Import project modules
 from utils.helpers import (
     load_config, load_symbols, setup_logging, is_trading_hours,
-    get_env_variable, save_to_csv, DataCache, CircuitBreaker
+    get_env_variable, save_to_csv, CircuitBreaker,
+    get_next_market_open, seconds_until_market_open
 )
-from utils.fiinquant_adapter import FiinQuantAdapter
+from utils.cache_manager import init_cache_manager
+from utils.data_source import create_data_source
+from utils.warmup import CacheWarmer, WarmupReport
+from utils.state_store import StateSnapshotStore
 from strategy.rsi_psar_engulfing import RSIPSAREngulfingStrategy, TradingSignal
 from jobs.telegram_bot import TradingTelegramBot
 from jobs.email_service import get_email_service
@@ -94,21 +97,16 @@ class MainOrchestrator:
     def _initialize_components(self):
         """Initialize all system components."""
         try:
-            # Data adapter - FiinQuant
-            username = get_env_variable('FIINQUANT_USERNAME', required=True)
-            password = get_env_variable('FIINQUANT_PASSWORD', required=True)
-            
-            self.logger.info("Initializing FiinQuant data adapter")
-            data_config = self.config.get('data_source', {})
-            self.data_adapter = FiinQuantAdapter(
-                username=username,
-                password=password,
-                retry_attempts=data_config.get('retry_attempts', 3),
-                retry_delay=data_config.get('retry_delay', 5)
-            )
+            # Shared cache (memory + Redis) for market data
+            self.cache_manager = init_cache_manager(self.config)
+            
+            # Market data source (FiinQuant, or offline replay)
+            self.data_adapter = create_data_source(self.config)
+            self.logger.info(f"Initialized {type(self.data_adapter).__name__} data source")
             
             # Trading strategy
             self.strategy = RSIPSAREngulfingStrategy(self.config)
+            self._init_state_store()
             
             # Notification services
             self.telegram_bot = TradingTelegramBot(self.config)
@@ -129,9 +127,6 @@ class MainOrchestrator:
                 self.universe = symbols.get('universe', {}).get('vn30', [])
                 self.logger.info(f"Monitoring VN30 symbols: {len(self.universe)} symbols")
             
-            # Cache for data
-            self.data_cache = DataCache(default_ttl=300)  # 5 minutes
-            
             # Configuration
             self.refresh_interval = int(get_env_variable('REFRESH_INTERVAL_SECONDS', 60))
             self.timeframe = get_env_variable('TIMEFRAME', '15m')
@@ -142,12 +137,40 @@ class MainOrchestrator:
             self.portfolio_size = strategy_config.get('portfolio_size', 10)
             self.risk_tolerance = strategy_config.get('risk_tolerance', 'medium')
             
+            # Pre-market warm-up of the cache tiers (the polling cycle computes indicators per cycle)
+            warmup_config = self.config.get('cache', {}).get('warmup', {})
+            self.warmup_enabled = warmup_config.get('enabled', True)
+            self.warmup_lead_minutes = warmup_config.get('lead_minutes', 30)
+            self.cache_warmer = CacheWarmer(
+                self.data_adapter,
+                self.cache_manager,
+                self._data_cache_key,
+                timeframe=self.timeframe,
+                period=200,  # Same history as the update cycle
+                time_budget=warmup_config.get('time_budget', 300),
+                chunk_size=warmup_config.get('chunk_size', 100)
+            )
+            self.last_warmup: Optional[WarmupReport] = None
+            self._warmup_session = None
+            
             self.logger.info("All components initialized successfully")
             
         except Exception as e:
             self.logger.error(f"Failed to initialize components: {str(e)}")
             raise
     
+    def _init_state_store(self):
+        """Open the strategy state snapshot store when snapshots are enabled."""
+        snapshot_config = self.config.get('strategy', {}).get('state_snapshot', {})
+        self.snapshot_interval = snapshot_config.get('interval', 300)
+        self.state_store = None
+        
+        if snapshot_config.get('enabled', False):
+            try:
+                self.state_store = StateSnapshotStore(snapshot_config.get('path', 'data/state/strategy_state.db'))
+            except Exception as e:
+                self.logger.warning(f"Strategy state snapshots disabled: {str(e)}")
+    
     async def start(self):
         """Start the main orchestrator."""
         self.logger.info("Starting Main Orchestrator")
@@ -157,9 +180,16 @@ class MainOrchestrator:
             await self.db_manager.initialize()
             
             # Initialize data adapter
-            if not self.data_adapter.login():
+            if not await self.data_adapter.alogin():
                 raise Exception("Failed to login to data source")
             
+            # Resume from the last state snapshot; the warm-up applies the newer bars
+            self._restore_state()
+            
+            # Load the universe into the cache before the first cycle
+            if self.warmup_enabled:
+                await self._run_warmup()
+            
             # Initialize notification services
             await self.telegram_bot.initialize()
             await self.telegram_bot.start_bot()
@@ -206,6 +236,10 @@ class MainOrchestrator:
         # Automated strategy generation every 30 minutes during trading hours
         schedule.every(30).minutes.do(self._schedule_strategy_generation)
         
+        # Strategy state snapshots
+        if self.state_store is not None:
+            schedule.every(self.snapshot_interval).seconds.do(self._schedule_state_snapshot)
+        
         # Health check every 5 minutes
         schedule.every(5).minutes.do(self._schedule_health_check)
         
@@ -223,10 +257,14 @@ class MainOrchestrator:
         
         self.logger.info("Scheduled tasks configured")
     
+    def _market_open(self) -> bool:
+        """Whether the market is trading (always, when replaying recorded data)."""
+        return self.data_adapter.simulated or is_trading_hours(self.config)
+    
     def _schedule_update(self):
         """Scheduled data update and analysis wrapper."""
         try:
-            if is_trading_hours(self.config):
+            if self._market_open():
                 asyncio.create_task(self._update_and_analyze_cycle())
         except Exception as e:
             self.logger.error(f"Scheduled update error: {str(e)}")
@@ -234,11 +272,18 @@ class MainOrchestrator:
     def _schedule_strategy_generation(self):
         """Scheduled automated strategy generation."""
         try:
-            if is_trading_hours(self.config) and self.auto_strategy_enabled:
+            if self._market_open() and self.auto_strategy_enabled:
                 asyncio.create_task(self._generate_automated_strategy())
         except Exception as e:
             self.logger.error(f"Scheduled strategy generation error: {str(e)}")
     
+    def _schedule_state_snapshot(self):
+        """Scheduled strategy state snapshot."""
+        try:
+            asyncio.create_task(self._save_state_snapshot())
+        except Exception as e:
+            self.logger.error(f"State snapshot error: {str(e)}")
+    
     def _schedule_health_check(self):
         """Scheduled health check."""
         try:
@@ -256,7 +301,7 @@ class MainOrchestrator:
     def _schedule_portfolio_update(self):
         """Scheduled portfolio update."""
         try:
-            if is_trading_hours(self.config):
+            if self._market_open():
                 asyncio.create_task(self._send_portfolio_update())
         except Exception as e:
             self.logger.error(f"Portfolio update error: {str(e)}")
@@ -281,6 +326,10 @@ class MainOrchestrator:
         
         while self.is_running:
             try:
+                # Warm the cache ahead of the open
+                if not self._market_open():
+                    await self._maybe_warmup()
+                
                 # Run scheduled tasks
                 schedule.run_pending()
                 
@@ -301,6 +350,65 @@ class MainOrchestrator:
                     await asyncio.sleep(30)
                     self.error_count = 0
     
+    async def _maybe_warmup(self):
+        """Run the warm-up once per session, lead_minutes before the open."""
+        if not self.warmup_enabled or self.data_adapter.simulated:
+            return
+        if get_next_market_open(self.config).date() == self._warmup_session:
+            return
+        if seconds_until_market_open(self.config) <= self.warmup_lead_minutes * 60:
+            await self._run_warmup()
+    
+    async def _run_warmup(self):
+        """Bulk-load the universe's recent bars into the cache tiers."""
+        until_open = 0.0 if self.data_adapter.simulated else seconds_until_market_open(self.config)
+        if until_open <= self.warmup_lead_minutes * 60:
+            self._warmup_session = get_next_market_open(self.config).date()
+        
+        self.logger.info(f"Warming up {len(self.universe)} symbols "
+                         f"({until_open / 60:.0f} min before the open)")
+        try:
+            self.last_warmup = await self.cache_warmer.run(
+                self.universe,
+                cache_ttl=int(until_open) + self.refresh_interval,  # Still warm for the first cycle
+                on_progress=self._log_warmup_progress
+            )
+        except Exception as e:
+            self.logger.error(f"Warm-up failed: {str(e)}")
+            return
+        
+        if self.last_warmup.completed:
+            self.logger.info(f"Warm-up complete: {self.last_warmup.summary()}")
+        else:
+            self.logger.warning(f"Warm-up incomplete: {self.last_warmup.summary()}")
+    
+    def _restore_state(self):
+        """Restore indicator engines and strategy states from the last snapshot."""
+        if self.state_store is None:
+            return
+        
+        try:
+            restored = self.strategy.restore_state(self.state_store.load())
+            self.logger.info(f"Restored {restored['indicators']} indicator engines and "
+                             f"{restored['strategy']} strategy states from snapshot")
+        except Exception as e:
+            self.logger.error(f"Failed to restore state snapshot: {str(e)}")
+    
+    async def _save_state_snapshot(self):
+        """Write per-ticker indicator and strategy state to the snapshot store."""
+        try:
+            snapshot = self.strategy.snapshot_state()
+            if snapshot:
+                count = await asyncio.to_thread(self.state_store.save, snapshot)
+                self.logger.debug(f"Saved state snapshot for {count} tickers")
+        except Exception as e:
+            self.logger.error(f"State snapshot failed: {str(e)}")
+    
+    def _log_warmup_progress(self, report: WarmupReport):
+        """Log warm-up progress after each chunk."""
+        self.logger.info(f"Warm-up: {report.tickers_done}/{report.tickers_total} symbols "
+                         f"({report.progress:.0%}) in {report.elapsed:.1f}s")
+    
     async def _update_and_analyze_cycle(self):
         """Perform data update and analysis cycle."""
         if not self.circuit_breaker.can_execute():
@@ -345,71 +453,45 @@ class MainOrchestrator:
         """Perform the actual data update and analysis."""
         all_signals = []
         
-        # Process tickers in batches for better performance
-        batch_size = 20
-        ticker_batches = [self.universe[i:i + batch_size] for i in range(0, len(self.universe), batch_size)]
+        # Read cached data for the whole universe in one round trip
+        cache_keys = {ticker: self._data_cache_key(ticker) for ticker in self.universe}
+        cached_data = await self.cache_manager.aget_many(list(cache_keys.values()))
+        market_data = {
+            ticker: cached_data[key] for ticker, key in cache_keys.items() if key in cached_data
+        }
         
-        # Use ThreadPoolExecutor for parallel processing
-        with ThreadPoolExecutor(max_workers=4) as executor:
-            batch_futures = [
-                executor.submit(self._process_ticker_batch, batch)
-                for batch in ticker_batches
-            ]
-            
-            for future in as_completed(batch_futures):
-                try:
-                    batch_signals = future.result(timeout=30)
-                    all_signals.extend(batch_signals)
-                except Exception as e:
-                    self.logger.error(f"Batch processing failed: {str(e)}")
+        # Fetch the rest with a few multi-ticker API calls
+        missing = [ticker for ticker in self.universe if ticker not in market_data]
+        if missing:
+            try:
+                fetched = await self._fetch_ticker_batch(missing)
+                market_data.update(fetched)
+                await self.cache_manager.aset_many(
+                    {cache_keys[ticker]: data for ticker, data in fetched.items()}
+                )
+            except Exception as e:
+                self.logger.error(f"Batch processing failed: {str(e)}")
+        
+        # Analyze the whole universe in one batched indicator pass
+        for ticker_signals in self.strategy.analyze_universe(market_data).values():
+            all_signals.extend(ticker_signals)
         
         # Update daily stats
         self.daily_stats['total_analyzed'] += len(self.universe)
         
         return all_signals
     
-    def _process_ticker_batch(self, tickers: List[str]) -> List[TradingSignal]:
-        """Process a batch of tickers."""
-        signals = []
-        
-        for ticker in tickers:
-            try:
-                ticker_signals = self._analyze_ticker(ticker)
-                signals.extend(ticker_signals)
-            except Exception as e:
-                self.logger.error(f"Failed to analyze {ticker}: {str(e)}")
-        
-        return signals
+    def _data_cache_key(self, ticker: str) -> str:
+        """Cache key for a ticker's OHLCV data."""
+        return f"ohlcv:{self.timeframe}:{ticker}"
     
-    def _analyze_ticker(self, ticker: str) -> List[TradingSignal]:
-        """Analyze a single ticker for trading signals."""
-        try:
-            # Check cache first
-            cache_key = f"data_{ticker}_{self.timeframe}"
-            data = self.data_cache.get(cache_key)
-            
-            if data is None:
-                # Fetch fresh data
-                data = self.data_adapter.get_historical_data(
-                    symbol=ticker,
-                    timeframe=self.timeframe,
-                    limit=200
-                )
-                
-                if data is None or data.empty:
-                    return []
-                
-                # Cache the data
-                self.data_cache.set(cache_key, data)
-            
-            # Analyze with strategy
-            signals = self.strategy.analyze(data, ticker)
-            
-            return signals
-            
-        except Exception as e:
-            self.logger.error(f"Analysis failed for {ticker}: {str(e)}")
-            return []
+    async def _fetch_ticker_batch(self, tickers: List[str]) -> Dict[str, pd.DataFrame]:
+        """Fetch fresh data for many tickers (concurrent chunks on the adapter's I/O executor)."""
+        return await self.data_adapter.afetch_many(
+            tickers,
+            timeframe=self.timeframe,
+            period=200
+        )
     
     async def _process_signals_and_notify(self, signals: List[TradingSignal]):
         """Process signals and send notifications."""
@@ -623,7 +705,9 @@ class MainOrchestrator:
                 'signal_counts': self.signal_counts.copy(),
                 'daily_stats': self.daily_stats.copy(),
                 'email_service_status': self.email_service.get_email_stats() if self.email_service.enabled else 'disabled',
-                'circuit_breaker_status': 'open' if not self.circuit_breaker.can_execute() else 'closed'
+                'circuit_breaker_status': 'open' if not self.circuit_breaker.can_execute() else 'closed',
+                'last_warmup': self.last_warmup.summary() if self.last_warmup else None,
+                'state_snapshot': self.state_store.get_stats() if self.state_store else None
             }
             
             self.logger.info(f"Health Status: {json.dumps(health_status, indent=2)}")
@@ -716,7 +800,7 @@ class MainOrchestrator:
             self.logger.info("Performing daily cleanup")
             
             # Clear old cache entries
-            self.data_cache.clear_expired()
+            self.cache_manager.cleanup()
             
             # Reset error count
             self.error_count = 0
@@ -770,7 +854,15 @@ class MainOrchestrator:
                 await self.db_manager.close()
             
             if hasattr(self, 'data_adapter'):
-                self.data_adapter.logout()
+                self.data_adapter.close()
+            
+            # Persist the final state once the stream has stopped
+            if getattr(self, 'state_store', None) is not None:
+                await self._save_state_snapshot()
+                self.state_store.close()
+            
+            if hasattr(self, 'cache_manager'):
+                await self.cache_manager.aclose()
             
             self.logger.info("Main Orchestrator shutdown completed")
             
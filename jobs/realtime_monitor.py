@@ -7,22 +7,27 @@ import asyncio
 import logging
 import signal
 import sys
+import threading
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Any
 import pandas as pd
 import schedule
 import time
 import traceback
-from concurrent.futures import ThreadPoolExecutor, as_completed
 import os
 from pathlib import Path
 
 # Import project modules
 from utils.helpers import (
     load_config, load_symbols, setup_logging, is_trading_hours,
-    get_env_variable, save_to_csv, DataCache, CircuitBreaker
+    get_env_variable, save_to_csv, CircuitBreaker,
+    get_next_market_open, seconds_until_market_open
 )
-from utils.fiinquant_adapter import FiinQuantAdapter
+from utils.cache_manager import init_cache_manager
+from utils.data_source import create_data_source
+from utils.bar_builder import Bar, BarBuilder
+from utils.warmup import CacheWarmer, WarmupReport
+from utils.state_store import StateSnapshotStore
 from strategy.rsi_psar_engulfing import RSIPSAREngulfingStrategy, TradingSignal
 from jobs.telegram_bot import TradingTelegramBot
 from database.data_manager import DatabaseManager
@@ -74,21 +79,17 @@ class RealtimeMonitor:
     def _initialize_components(self):
         """Initialize all system components."""
         try:
-            # Data adapter - FiinQuant only
-            username = get_env_variable('FIINQUANT_USERNAME', required=True)
-            password = get_env_variable('FIINQUANT_PASSWORD', required=True)
+            # Shared cache (memory + Redis) for market data
+            self.cache_manager = init_cache_manager(self.config)
             
-            self.logger.info("Initializing FiinQuant data adapter")
+            # Market data source (FiinQuant, or offline replay)
             data_config = self.config.get('data_source', {})
-            self.data_adapter = FiinQuantAdapter(
-                username=username,
-                password=password,
-                retry_attempts=data_config.get('retry_attempts', 3),
-                retry_delay=data_config.get('retry_delay', 5)
-            )
+            self.data_adapter = create_data_source(self.config)
+            self.logger.info(f"Initialized {type(self.data_adapter).__name__} data source")
             
             # Trading strategy
             self.strategy = RSIPSAREngulfingStrategy(self.config)
+            self._init_state_store()
             
             # Telegram bot
             self.telegram_bot = TradingTelegramBot(self.config)
@@ -108,19 +109,59 @@ class RealtimeMonitor:
                 self.universe = symbols.get('universe', {}).get('vn30', [])
                 self.logger.info(f"Monitoring VN30 symbols: {len(self.universe)} symbols")
             
-            # Cache for data
-            self.data_cache = DataCache(default_ttl=300)  # 5 minutes
-            
             # Configuration
             self.refresh_interval = int(get_env_variable('REFRESH_INTERVAL_SECONDS', 60))
             self.timeframe = get_env_variable('TIMEFRAME', '15m')
             
+            # Streamed bars (replace polling once the stream is up)
+            self.bar_builder = None
+            self._stream_lock = threading.Lock()
+            self._loop = None
+            bars_config = data_config.get('realtime_bars', {})
+            self.partial_bar_signals = bars_config.get('partial_signals', False)
+            if bars_config.get('enabled', False):
+                self.bar_builder = BarBuilder(
+                    self.timeframe,
+                    self._on_stream_bar,
+                    timezone=self.config.get('market', {}).get('trading_hours', {}).get('timezone', 'Asia/Ho_Chi_Minh'),
+                    partial_interval=bars_config.get('partial_interval', 1.0)
+                )
+            
+            # Pre-market warm-up (indicator engines are only used by streamed bars)
+            warmup_config = self.config.get('cache', {}).get('warmup', {})
+            self.warmup_enabled = warmup_config.get('enabled', True)
+            self.warmup_lead_minutes = warmup_config.get('lead_minutes', 30)
+            self.cache_warmer = CacheWarmer(
+                self.data_adapter,
+                self.cache_manager,
+                self._data_cache_key,
+                strategy=self.strategy if self.bar_builder is not None else None,
+                timeframe=self.timeframe,
+                period=100,  # Same history as the update cycle
+                time_budget=warmup_config.get('time_budget', 300),
+                chunk_size=warmup_config.get('chunk_size', 100)
+            )
+            self.last_warmup: Optional[WarmupReport] = None
+            self._warmup_session = None
+            
             self.logger.info("All components initialized successfully")
             
         except Exception as e:
             self.logger.error(f"Failed to initialize components: {str(e)}")
             raise
     
+    def _init_state_store(self):
+        """Open the strategy state snapshot store when snapshots are enabled."""
+        snapshot_config = self.config.get('strategy', {}).get('state_snapshot', {})
+        self.snapshot_interval = snapshot_config.get('interval', 300)
+        self.state_store = None
+        
+        if snapshot_config.get('enabled', False):
+            try:
+                self.state_store = StateSnapshotStore(snapshot_config.get('path', 'data/state/strategy_state.db'))
+            except Exception as e:
+                self.logger.warning(f"Strategy state snapshots disabled: {str(e)}")
+    
     async def start(self):
         """Start the real-time monitoring system."""
         self.logger.info("Starting Real-time Monitor")
@@ -130,9 +171,16 @@ class RealtimeMonitor:
             await self.db_manager.initialize()
             
             # Initialize data adapter
-            if not self.data_adapter.login():
+            if not await self.data_adapter.alogin():
                 raise Exception("Failed to login to data source")
             
+            # Resume from the last state snapshot; the warm-up applies the newer bars
+            self._restore_state()
+            
+            # Load the universe into the cache before the first cycle
+            if self.warmup_enabled:
+                await self._run_warmup()
+            
             # Initialize Telegram bot
             await self.telegram_bot.initialize()
             await self.telegram_bot.start_bot()
@@ -149,6 +197,10 @@ class RealtimeMonitor:
             # Set running flag
             self.is_running = True
             
+            # Switch to streamed bars when enabled
+            if self.bar_builder is not None:
+                await self._start_bar_stream()
+            
             # Schedule periodic tasks
             self._setup_schedules()
             
@@ -162,8 +214,15 @@ class RealtimeMonitor:
     
     def _setup_schedules(self):
         """Setup scheduled tasks."""
-        # Main data update
-        schedule.every(self.refresh_interval).seconds.do(self._schedule_update)
+        # Main data update (streamed bars only need closing on time)
+        if self.bar_builder is not None:
+            schedule.every(5).seconds.do(self._schedule_bar_close)
+        else:
+            schedule.every(self.refresh_interval).seconds.do(self._schedule_update)
+        
+        # Strategy state snapshots
+        if self.state_store is not None:
+            schedule.every(self.snapshot_interval).seconds.do(self._schedule_state_snapshot)
         
         # Health check every 5 minutes
         schedule.every(5).minutes.do(self._schedule_health_check)
@@ -176,14 +235,32 @@ class RealtimeMonitor:
         
         self.logger.info("Scheduled tasks configured")
     
+    def _market_open(self) -> bool:
+        """Whether the market is trading (always, when replaying recorded data)."""
+        return self.data_adapter.simulated or is_trading_hours(self.config)
+    
     def _schedule_update(self):
         """Scheduled data update wrapper."""
         try:
-            if is_trading_hours(self.config):
+            if self._market_open():
                 asyncio.create_task(self._update_cycle())
         except Exception as e:
             self.logger.error(f"Scheduled update error: {str(e)}")
     
+    def _schedule_bar_close(self):
+        """Close streamed bars whose period has ended."""
+        try:
+            self.bar_builder.close_due()
+        except Exception as e:
+            self.logger.error(f"Bar close error: {str(e)}")
+    
+    def _schedule_state_snapshot(self):
+        """Scheduled strategy state snapshot."""
+        try:
+            asyncio.create_task(self._save_state_snapshot())
+        except Exception as e:
+            self.logger.error(f"State snapshot error: {str(e)}")
+    
     def _schedule_health_check(self):
         """Scheduled health check."""
         try:
@@ -212,7 +289,8 @@ class RealtimeMonitor:
         while self.is_running:
             try:
                 # Check if in trading hours
-                if not is_trading_hours(self.config):
+                if not self._market_open():
+                    await self._maybe_warmup()
                     await asyncio.sleep(300)  # Check every 5 minutes outside hours
                     continue
                 
@@ -232,6 +310,67 @@ class RealtimeMonitor:
                     await asyncio.sleep(60)  # Cool down period
                     self.error_count = 0
     
+    async def _maybe_warmup(self):
+        """Run the warm-up once per session, lead_minutes before the open."""
+        if not self.warmup_enabled or self.data_adapter.simulated:
+            return
+        if get_next_market_open(self.config).date() == self._warmup_session:
+            return
+        if seconds_until_market_open(self.config) <= self.warmup_lead_minutes * 60:
+            await self._run_warmup()
+    
+    async def _run_warmup(self):
+        """Bulk-load the universe's recent bars into the cache tiers and indicator state."""
+        until_open = 0.0 if self.data_adapter.simulated else seconds_until_market_open(self.config)
+        if until_open <= self.warmup_lead_minutes * 60:
+            self._warmup_session = get_next_market_open(self.config).date()
+        
+        self.logger.info(f"Warming up {len(self.universe)} symbols "
+                         f"({until_open / 60:.0f} min before the open)")
+        try:
+            self.last_warmup = await self.cache_warmer.run(
+                self.universe,
+                cache_ttl=int(until_open) + self.refresh_interval,  # Still warm for the first cycle
+                drop_last_bar=until_open == 0 and not self.data_adapter.simulated,
+                on_progress=self._log_warmup_progress
+            )
+        except Exception as e:
+            self.logger.error(f"Warm-up failed: {str(e)}")
+            return
+        
+        if self.last_warmup.completed:
+            self.logger.info(f"Warm-up complete: {self.last_warmup.summary()}")
+        else:
+            self.logger.warning(f"Warm-up incomplete: {self.last_warmup.summary()}")
+    
+    def _restore_state(self):
+        """Restore indicator engines and strategy states from the last snapshot."""
+        if self.state_store is None:
+            return
+        
+        try:
+            restored = self.strategy.restore_state(self.state_store.load())
+            self.logger.info(f"Restored {restored['indicators']} indicator engines and "
+                             f"{restored['strategy']} strategy states from snapshot")
+        except Exception as e:
+            self.logger.error(f"Failed to restore state snapshot: {str(e)}")
+    
+    async def _save_state_snapshot(self):
+        """Write per-ticker indicator and strategy state to the snapshot store."""
+        try:
+            with self._stream_lock:
+                snapshot = self.strategy.snapshot_state()
+            if snapshot:
+                count = await asyncio.to_thread(self.state_store.save, snapshot)
+                self.logger.debug(f"Saved state snapshot for {count} tickers")
+        except Exception as e:
+            self.logger.error(f"State snapshot failed: {str(e)}")
+    
+    def _log_warmup_progress(self, report: WarmupReport):
+        """Log warm-up progress after each chunk."""
+        self.logger.info(f"Warm-up: {report.tickers_done}/{report.tickers_total} symbols "
+                         f"({report.progress:.0%}) in {report.elapsed:.1f}s")
+    
     async def _update_cycle(self):
         """Single update cycle - fetch data and analyze signals."""
         start_time = time.time()
@@ -268,19 +407,26 @@ class RealtimeMonitor:
     
     async def _perform_update_cycle(self):
         """Perform the actual update cycle."""
-        # Batch process tickers for efficiency
-        batch_size = 10
-        ticker_batches = [
-            self.universe[i:i + batch_size]
-            for i in range(0, len(self.universe), batch_size)
-        ]
+        # Read cached data for the whole universe in one round trip
+        cache_keys = {ticker: self._data_cache_key(ticker) for ticker in self.universe}
+        cached_data = await self.cache_manager.aget_many(list(cache_keys.values()))
+        market_data = {
+            ticker: cached_data[key] for ticker, key in cache_keys.items() if key in cached_data
+        }
         
-        all_signals = []
+        # Fetch the rest with a few multi-ticker API calls
+        missing = [ticker for ticker in self.universe if ticker not in market_data]
+        if missing:
+            fetched = await self._fetch_ticker_batch(missing)
+            market_data.update(fetched)
+            await self.cache_manager.aset_many(
+                {cache_keys[ticker]: df for ticker, df in fetched.items()}, ttl=60  # 1 minute cache
+            )
         
-        # Process each batch
-        for batch in ticker_batches:
-            batch_signals = await self._process_ticker_batch(batch)
-            all_signals.extend(batch_signals)
+        # Analyze the whole universe in one batched indicator pass
+        all_signals = []
+        for ticker_signals in self.strategy.analyze_universe(market_data).values():
+            all_signals.extend(ticker_signals)
         
         # Process all signals
         if all_signals:
@@ -288,61 +434,58 @@ class RealtimeMonitor:
         
         self.logger.debug(f"Processed {len(self.universe)} tickers, generated {len(all_signals)} signals")
     
-    async def _process_ticker_batch(self, tickers: List[str]) -> List[TradingSignal]:
-        """Process a batch of tickers in parallel."""
-        signals = []
+    async def _start_bar_stream(self):
+        """Warm the streaming indicators and start building bars from the realtime stream."""
+        self._loop = asyncio.get_running_loop()
         
-        # Use ThreadPoolExecutor for parallel processing
-        with ThreadPoolExecutor(max_workers=5) as executor:
-            # Submit tasks
-            future_to_ticker = {
-                executor.submit(self._analyze_ticker, ticker): ticker
-                for ticker in tickers
-            }
-            
-            # Collect results
-            for future in as_completed(future_to_ticker):
-                ticker = future_to_ticker[future]
-                try:
-                    ticker_signals = future.result()
-                    signals.extend(ticker_signals)
-                except Exception as e:
-                    self.logger.error(f"Error processing {ticker}: {str(e)}")
+        # Sync engines the warm-up didn't with closed bars; the last fetched bar may still be forming
+        synced = set(self.last_warmup.seeded) if self.last_warmup else set()
+        pending = [ticker for ticker in self.universe if ticker not in synced]
+        histories = await self._fetch_ticker_batch(pending) if pending else {}
+        for ticker, df in histories.items():
+            self.strategy.sync_streaming_indicators(ticker, df.iloc[:-1])
+        
+        if self.data_adapter.start_realtime_stream(self.universe, self.bar_builder.on_market_data):
+            self.logger.info(f"Building {self.timeframe} bars from the realtime stream "
+                             f"({len(self.strategy.streaming_indicators)} tickers warmed)")
+        else:
+            self.logger.warning("Realtime stream unavailable, falling back to polling")
+            self.bar_builder = None
+    
+    def _on_stream_bar(self, bar: Bar):
+        """
+        Analyze a streamed bar (runs on the stream thread or the scheduler).
+        
+        Args:
+            bar: Finished or partial bar from the bar builder
+        """
+        with self._stream_lock:
+            signals = self.strategy.analyze_bar(
+                bar.ticker, bar.open, bar.high, bar.low, bar.close, bar.volume, final=bar.final,
+                timestamp=bar.start.replace(tzinfo=None)  # Exchange time, like fetched bars
+            )
+        
+        if bar.final:
+            self.last_update_time = datetime.now()
         
-        return signals
+        if signals and (bar.final or self.partial_bar_signals) and self._loop is not None:
+            asyncio.run_coroutine_threadsafe(self._process_signals(signals), self._loop)
     
-    def _analyze_ticker(self, ticker: str) -> List[TradingSignal]:
-        """Analyze single ticker and return signals."""
+    async def _fetch_ticker_batch(self, tickers: List[str]) -> Dict[str, pd.DataFrame]:
+        """Fetch OHLCV data for many tickers (concurrent chunks on the adapter's I/O executor)."""
         try:
-            # Check cache first
-            cache_key = f"data_{ticker}_{self.timeframe}"
-            cached_data = self.data_cache.get(cache_key)
-            
-            if cached_data is None:
-                # Fetch fresh data
-                df = self.data_adapter.fetch_historical_data(
-                    tickers=[ticker],
-                    timeframe=self.timeframe,
-                    period=100  # Sufficient for indicators
-                )
-                
-                if df.empty:
-                    self.logger.warning(f"No data for {ticker}")
-                    return []
-                
-                # Cache the data
-                self.data_cache.set(cache_key, df, ttl=60)  # 1 minute cache
-            else:
-                df = cached_data
-            
-            # Analyze with strategy
-            signals = self.strategy.analyze_ticker(ticker, df)
-            
-            return signals
-            
+            return await self.data_adapter.afetch_many(
+                tickers,
+                timeframe=self.timeframe,
+                period=100  # Sufficient for indicators
+            )
         except Exception as e:
-            self.logger.error(f"Failed to analyze {ticker}: {str(e)}")
-            return []
+            self.logger.error(f"Error fetching {len(tickers)} tickers: {str(e)}")
+            return {}
+    
+    def _data_cache_key(self, ticker: str) -> str:
+        """Cache key for a ticker's OHLCV data."""
+        return f"ohlcv:{self.timeframe}:{ticker}"
     
     async def _process_signals(self, signals: List[TradingSignal]):
         """Process and distribute generated signals."""
@@ -418,6 +561,9 @@ class RealtimeMonitor:
                 if self.processing_times else 0
             )
             
+            # Cache telemetry since the previous health check
+            cache_stats = self.cache_manager.snapshot_stats()
+            
             health_report = {
                 'timestamp': datetime.now().isoformat(),
                 'update_count': self.update_count,
@@ -426,14 +572,41 @@ class RealtimeMonitor:
                 'signal_counts': self.signal_counts,
                 'adapter_health': adapter_health,
                 'bot_health': bot_health,
-                'strategy_stats': strategy_stats
+                'strategy_stats': strategy_stats,
+                'cache_stats': cache_stats['overall'],
+                'last_warmup': self.last_warmup.summary() if self.last_warmup else None,
+                'state_snapshot': self.state_store.get_stats() if self.state_store else None
             }
             
             self.logger.info(f"Health Status: {health_report}")
+            self._check_cache_hit_ratio(cache_stats)
             
         except Exception as e:
             self.logger.error(f"Health check failed: {str(e)}")
     
+    def _check_cache_hit_ratio(self, cache_stats: Dict[str, Any]):
+        """Alert when the cache hit ratio drops below the configured threshold."""
+        threshold = self.config.get('monitoring', {}).get('cache_hit_ratio_threshold', 0.8)
+        min_lookups = self.config.get('monitoring', {}).get('cache_min_lookups', 100)
+        
+        overall = cache_stats['overall']
+        if (overall['hit_ratio'] is None or overall['hits'] + overall['misses'] < min_lookups
+                or overall['hit_ratio'] >= threshold):
+            return
+        
+        # Name the prefixes dragging the ratio down
+        low_prefixes = {
+            prefix: round(stats['hit_ratio'], 3)
+            for prefix, stats in cache_stats['prefixes'].items()
+            if stats['hit_ratio'] is not None and stats['hit_ratio'] < threshold
+        }
+        self.logger.warning(
+            f"Cache hit ratio {overall['hit_ratio']:.2%} below threshold {threshold:.0%} "
+            f"over the last {cache_stats['interval_seconds']:.0f}s "
+            f"({overall['hits']} hits, {overall['misses']} misses, {overall['evictions']} evictions); "
+            f"low prefixes: {low_prefixes}"
+        )
+    
     async def _send_performance_report(self):
         """Send hourly performance report via Telegram."""
         try:
@@ -472,7 +645,7 @@ class RealtimeMonitor:
             self.logger.info("Performing daily cleanup")
             
             # Clean up old cache entries
-            self.data_cache.cleanup()
+            self.cache_manager.cleanup()
             
             # Clean up old logs (keep last 30 days)
             await self.db_manager.cleanup_old_data(days=30)
@@ -536,11 +709,19 @@ class RealtimeMonitor:
                 await self.telegram_bot.stop_bot()
             
             if hasattr(self, 'data_adapter'):
-                self.data_adapter.stop_realtime_stream()
+                self.data_adapter.close()
+            
+            # Persist the final state once the stream has stopped
+            if getattr(self, 'state_store', None) is not None:
+                await self._save_state_snapshot()
+                self.state_store.close()
             
             if hasattr(self, 'db_manager'):
                 await self.db_manager.close()
             
+            if hasattr(self, 'cache_manager'):
+                await self.cache_manager.aclose()
+            
             self.logger.info("Shutdown completed")
             
         except Exception as e:
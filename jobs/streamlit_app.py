@@ -15,7 +15,7 @@ import json
 from typing import Dict, List, Optional, Any
 
 from utils.helpers import load_config, format_currency, format_percentage
-from utils.fiinquant_adapter import FiinQuantAdapter, MarketDataPoint
+from utils.data_source import DataSource, MarketDataPoint, create_data_source
 from utils.indicators import TechnicalIndicators
 from strategy.rsi_psar_engulfing import RSIPSAREngulfingStrategy, TradingSignal
 
@@ -796,13 +796,14 @@ def initialize_components():
         import os
         username = os.getenv('FIINQUANT_USERNAME')
         password = os.getenv('FIINQUANT_PASSWORD')
+        provider = os.getenv('DATA_PROVIDER', config.get('data_source', {}).get('provider', 'fiinquant')).lower()
         
-        if not username or not password:
+        if provider == 'fiinquant' and (not username or not password):
             loading_placeholder.empty()
             show_error_message("Không tìm thấy thông tin đăng nhập FiinQuant. Vui lòng kiểm tra file .env.")
             st.stop()
         
-        adapter = FiinQuantAdapter(username, password)
+        adapter = create_data_source(config)
         strategy = RSIPSAREngulfingStrategy(config)
         
         loading_placeholder.empty()
@@ -823,7 +824,7 @@ def fetch_real_data_cached(adapter_hash: str, tickers: tuple, timestamp: int, pe
     # The timestamp ensures cache invalidation every 30 seconds
     return None  # Placeholder for actual implementation
 
-def fetch_real_data(adapter: FiinQuantAdapter, tickers: List[str], periods: int = 100) -> Dict[str, pd.DataFrame]:
+def fetch_real_data(adapter: DataSource, tickers: List[str], periods: int = 100) -> Dict[str, pd.DataFrame]:
     """Fetch real market data from FiinQuant with optimized performance and lazy loading."""
     data = {}
     failed_tickers = []
@@ -844,47 +845,41 @@ def fetch_real_data(adapter: FiinQuantAdapter, tickers: List[str], periods: int
             show_error_message("Không thể đăng nhập vào FiinQuant")
             return {}
         
-        # Batch processing for better performance
-        batch_size = 3  # Process 3 tickers at a time
-        ticker_batches = [tickers[i:i + batch_size] for i in range(0, len(tickers), batch_size)]
+        # Check session state cache first
+        cache_keys = {ticker: f"data_{ticker}_{cache_timestamp}_{periods}" for ticker in tickers}
+        for ticker, cache_key in cache_keys.items():
+            if cache_key in st.session_state:
+                data[ticker] = st.session_state[cache_key]
+        
+        # Fetch the rest with a few multi-ticker API calls
+        missing = [ticker for ticker in tickers if ticker not in data]
+        fetched = {}
+        if missing:
+            status_text.text(f"Đang tải dữ liệu cho {len(missing)} mã cổ phiếu...")
+            try:
+                fetched = adapter.fetch_historical_data_batch(missing, timeframe='15m', period=periods)
+            except Exception as e:
+                st.warning(f"Không thể tải dữ liệu: {str(e)}")
         
-        total_processed = 0
-        for batch in ticker_batches:
-            batch_data = {}
-            
-            for ticker in batch:
+        total_processed = len(tickers) - len(missing)
+        for ticker in missing:
+            df = fetched.get(ticker)
+            if df is None or df.empty:
+                failed_tickers.append(ticker)
+            else:
                 try:
-                    status_text.text(f"Đang tải dữ liệu cho {ticker}...")
+                    status_text.text(f"Đang tính chỉ báo cho {ticker}...")
                     
-                    # Check session state cache first
-                    cache_key = f"data_{ticker}_{cache_timestamp}_{periods}"
-                    if cache_key in st.session_state:
-                        batch_data[ticker] = st.session_state[cache_key]
-                    else:
-                        # Fetch historical data
-                        df = adapter.fetch_historical_data([ticker], timeframe='15m', period=periods)
-                        
-                        if not df.empty:
-                            # Add indicators
-                            df = TechnicalIndicators.calculate_all_indicators(df)
-                            batch_data[ticker] = df
-                            st.session_state[cache_key] = df  # Cache in session
-                        else:
-                            failed_tickers.append(ticker)
-                        
+                    # Add indicators
+                    df = TechnicalIndicators.calculate_all_indicators(df)
+                    data[ticker] = df
+                    st.session_state[cache_keys[ticker]] = df  # Cache in session
                 except Exception as e:
                     failed_tickers.append(ticker)
                     st.warning(f"Không thể tải dữ liệu cho {ticker}: {str(e)}")
-                    continue
-                
-                total_processed += 1
-                progress_bar.progress(total_processed / len(tickers))
-            
-            data.update(batch_data)
             
-            # Small delay between batches to prevent API rate limiting
-            if len(ticker_batches) > 1:
-                time.sleep(0.1)
+            total_processed += 1
+            progress_bar.progress(total_processed / len(tickers))
         
         # Clear progress indicators
         progress_bar.empty()
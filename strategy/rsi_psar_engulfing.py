@@ -6,9 +6,11 @@ Combines RSI, Parabolic SAR, and Engulfing patterns for signal generation.
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Tuple, Any
-from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple, Any, Union
+from dataclasses import dataclass, asdict, fields
 import logging
+import hashlib
+import json
 
 # Import cache manager
 try:
@@ -17,7 +19,7 @@ try:
 except ImportError:
     CACHE_AVAILABLE = False
 
-from utils.indicators import TechnicalIndicators
+from utils.indicators import TechnicalIndicators, StreamingIndicators
 from utils.helpers import DataCache
 from strategy.risk_management import RiskManager
 
@@ -54,6 +56,21 @@ class StrategyState:
     trailing_stop_price: Optional[float] = None
     last_signal_type: Optional[str] = None
     last_signal_time: Optional[datetime] = None
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-compatible dict (datetimes as ISO strings)."""
+        return {name: value.isoformat() if isinstance(value, datetime) else value
+                for name, value in asdict(self).items()}
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'StrategyState':
+        """Rebuild a state from to_dict() output (unknown keys are ignored)."""
+        known = {f.name for f in fields(cls)}
+        values = {name: value for name, value in data.items() if name in known}
+        for name in ('last_update', 'entry_date', 'last_signal_time'):
+            if values.get(name):
+                values[name] = datetime.fromisoformat(values[name])
+        return cls(**values)
 
 
 class RSIPSAREngulfingStrategy:
@@ -84,11 +101,18 @@ class RSIPSAREngulfingStrategy:
         self.ticker_states: Dict[str, StrategyState] = {}
         self.signal_history: List[TradingSignal] = []
         
+        # Per-ticker O(1) indicator state for bar/tick updates
+        self.streaming_indicators: Dict[str, StreamingIndicators] = {}
+        
         # Caching for performance
         self.data_cache = DataCache(default_ttl=300)  # 5 minutes
         
         self.logger = logging.getLogger(__name__)
     
+    def cache_key(self) -> str:
+        """Stable identity for cached methods: instances with the same config share entries."""
+        return hashlib.md5(json.dumps(self.config, sort_keys=True, default=str).encode()).hexdigest()
+    
     @cached(get_cache_manager(), prefix="strategy_analysis", ttl=300) if CACHE_AVAILABLE else lambda x: x
     def analyze_ticker(self, ticker: str, df: pd.DataFrame) -> List[TradingSignal]:
         """
@@ -106,8 +130,8 @@ class RSIPSAREngulfingStrategy:
             return []
         
         try:
-            # Calculate all indicators
-            df_with_indicators = self._calculate_indicators(df)
+            # Calculate all indicators (only the last row is read, skip the DataFrame)
+            df_with_indicators = self._calculate_indicators(df, as_arrays=True)
             
             # Generate signals
             signals = self._generate_signals(ticker, df_with_indicators)
@@ -124,24 +148,233 @@ class RSIPSAREngulfingStrategy:
             self.logger.error(f"Error analyzing {ticker}: {str(e)}")
             return []
     
+    def analyze_universe(self, market_data: Dict[str, pd.DataFrame],
+                         max_bars: Optional[int] = None) -> Dict[str, List[TradingSignal]]:
+        """
+        Analyze many tickers with one batched panel indicator calculation.
+        
+        Args:
+            market_data: Ticker -> OHLCV DataFrame
+            max_bars: Number of most recent bars used per ticker (None for all)
+            
+        Returns:
+            Dict[str, List[TradingSignal]]: Generated signals per ticker
+        """
+        results: Dict[str, List[TradingSignal]] = {}
+        
+        eligible = {}
+        for ticker, df in market_data.items():
+            if df is None or df.empty or len(df) < 50:  # Need sufficient history
+                self.logger.warning(f"Insufficient data for {ticker}: {0 if df is None else len(df)} rows")
+                results[ticker] = []
+            else:
+                eligible[ticker] = df
+        
+        if not eligible:
+            return results
+        
+        tickers, panel, lengths = TechnicalIndicators.stack_panel(eligible, max_bars=max_bars)
+        indicators = TechnicalIndicators.calculate_panel_indicators(
+            panel['open'], panel['high'], panel['low'], panel['close'], panel['volume'],
+            lengths=lengths, **self._indicator_params()
+        )
+        
+        for row, ticker in enumerate(tickers):
+            try:
+                current_row = {name: panel[name][row, -1]
+                               for name in ['open', 'high', 'low', 'close', 'volume']}
+                current_row.update({name: values[row, -1] for name, values in indicators.items()})
+                
+                signals = self._generate_row_signals(ticker, current_row)
+                self._update_ticker_state_from_row(ticker, current_row)
+                results[ticker] = self._apply_risk_management(ticker, signals)
+                
+            except Exception as e:
+                self.logger.error(f"Error analyzing {ticker}: {str(e)}")
+                results[ticker] = []
+        
+        return results
+    
     @cached(get_cache_manager(), prefix="indicators", ttl=600) if CACHE_AVAILABLE else lambda x: x
-    def _calculate_indicators(self, df: pd.DataFrame) -> pd.DataFrame:
+    def _calculate_indicators(self, df: pd.DataFrame,
+                              as_arrays: bool = False) -> Union[pd.DataFrame, Dict[str, np.ndarray]]:
         """Calculate all technical indicators."""
         return TechnicalIndicators.calculate_all_indicators(
-            df,
-            rsi_period=self.rsi_config.get('period', 14),
-            psar_af_init=self.psar_config.get('af_init', 0.02),
-            psar_af_step=self.psar_config.get('af_step', 0.02),
-            psar_af_max=self.psar_config.get('af_max', 0.20),
-            engulfing_min_body_ratio=self.engulfing_config.get('min_body_ratio', 0.5),
-            volume_avg_period=self.volume_config.get('avg_period', 20),
-            volume_anomaly_threshold=self.volume_config.get('anomaly_threshold', 1.0)
+            df, **self._indicator_params(), as_arrays=as_arrays
         )
     
-    def _generate_signals(self, ticker: str, df: pd.DataFrame) -> List[TradingSignal]:
+    def _indicator_params(self) -> Dict[str, Any]:
+        """Indicator parameters from the strategy configuration."""
+        return {
+            'rsi_period': self.rsi_config.get('period', 14),
+            'psar_af_init': self.psar_config.get('af_init', 0.02),
+            'psar_af_step': self.psar_config.get('af_step', 0.02),
+            'psar_af_max': self.psar_config.get('af_max', 0.20),
+            'engulfing_min_body_ratio': self.engulfing_config.get('min_body_ratio', 0.5),
+            'volume_avg_period': self.volume_config.get('avg_period', 20),
+            'volume_anomaly_threshold': self.volume_config.get('anomaly_threshold', 1.0)
+        }
+    
+    def get_streaming_indicators(self, ticker: str,
+                                 history: Optional[pd.DataFrame] = None) -> StreamingIndicators:
+        """
+        Get the streaming indicator engine for a ticker.
+        
+        Args:
+            ticker: Stock symbol
+            history: OHLCV history replayed once when the engine is created
+            
+        Returns:
+            StreamingIndicators: Engine for the ticker
+        """
+        engine = self.streaming_indicators.get(ticker)
+        if engine is None:
+            engine = StreamingIndicators(**self._indicator_params())
+            if history is not None and not history.empty:
+                engine.update_many(history)
+            self.streaming_indicators[ticker] = engine
+        return engine
+    
+    def seed_streaming_indicators(self, ticker: str, history: pd.DataFrame) -> StreamingIndicators:
+        """
+        Rebuild the streaming indicator engine for a ticker from history.
+        
+        Args:
+            ticker: Stock symbol
+            history: Closed OHLCV bars replayed into the new engine
+        
+        Returns:
+            StreamingIndicators: Engine for the ticker (replaces any existing one)
+        """
+        engine = StreamingIndicators(**self._indicator_params())
+        if not history.empty:
+            engine.update_many(history)
+        self.streaming_indicators[ticker] = engine
+        return engine
+    
+    def sync_streaming_indicators(self, ticker: str, history: pd.DataFrame) -> StreamingIndicators:
+        """
+        Bring the streaming indicator engine for a ticker up to date with history.
+        
+        An existing engine (e.g. restored from a snapshot) only applies the
+        bars newer than its last one, keeping the full history PSAR depends
+        on; it is rebuilt from history when there is none or the history
+        doesn't reach back to its last bar.
+        
+        Args:
+            ticker: Stock symbol
+            history: Closed OHLCV bars with a timestamp column
+            
+        Returns:
+            StreamingIndicators: Engine for the ticker
+        """
+        engine = self.streaming_indicators.get(ticker)
+        if engine is not None and engine.catch_up(history) is not None:
+            return engine
+        return self.seed_streaming_indicators(ticker, history)
+    
+    def snapshot_state(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Serialize per-ticker indicator engines and strategy states.
+        
+        Returns:
+            Dict[str, Dict[str, Any]]: Ticker -> {'indicators': engine state
+                or None, 'strategy': StrategyState dict or None}
+        """
+        snapshot = {}
+        for ticker in set(self.streaming_indicators) | set(self.ticker_states):
+            engine = self.streaming_indicators.get(ticker)
+            state = self.ticker_states.get(ticker)
+            snapshot[ticker] = {
+                'indicators': engine.to_state() if engine is not None else None,
+                'strategy': state.to_dict() if state is not None else None
+            }
+        return snapshot
+    
+    def restore_state(self, snapshot: Dict[str, Dict[str, Any]]) -> Dict[str, int]:
+        """
+        Restore per-ticker state from snapshot_state() output.
+        
+        Engines built with different indicator parameters are skipped (the
+        warm-up rebuilds them from history).
+        
+        Args:
+            snapshot: Ticker -> serialized state
+            
+        Returns:
+            Dict[str, int]: Number of restored 'indicators' and 'strategy' entries
+        """
+        params = self._indicator_params()
+        restored = {'indicators': 0, 'strategy': 0}
+        
+        for ticker, entry in snapshot.items():
+            try:
+                engine_state = entry.get('indicators')
+                if engine_state and engine_state.get('params') == params:
+                    self.streaming_indicators[ticker] = StreamingIndicators.from_state(engine_state)
+                    restored['indicators'] += 1
+                
+                if entry.get('strategy'):
+                    self.ticker_states[ticker] = StrategyState.from_dict(entry['strategy'])
+                    restored['strategy'] += 1
+                    
+            except Exception as e:
+                self.logger.error(f"Failed to restore state for {ticker}: {str(e)}")
+        
+        return restored
+    
+    def analyze_bar(self, ticker: str, open_price: float, high: float, low: float,
+                    close: float, volume: float, final: bool = True,
+                    timestamp: Optional[datetime] = None) -> List[TradingSignal]:
+        """
+        Analyze a ticker from a single new bar in O(1).
+        
+        Args:
+            ticker: Stock symbol
+            open_price, high, low, close, volume: Bar values
+            final: True for a closed bar (committed to the indicator state),
+                False for a bar that is still forming
+            timestamp: Bar start time (recorded with committed bars so a
+                restored engine can catch up from it)
+            
+        Returns:
+            List[TradingSignal]: Generated signals
+        """
+        engine = self.get_streaming_indicators(ticker)
+        
+        try:
+            if final:
+                row = engine.update(open_price, high, low, close, volume, timestamp=timestamp)
+            else:
+                row = engine.preview(open_price, high, low, close, volume)
+            
+            # Same history requirement as analyze_ticker
+            if engine.bar_count < 50:
+                return []
+            
+            signals = self._generate_row_signals(ticker, row)
+            self._update_ticker_state_from_row(ticker, row)
+            return self._apply_risk_management(ticker, signals)
+            
+        except Exception as e:
+            self.logger.error(f"Error analyzing bar for {ticker}: {str(e)}")
+            return []
+    
+    @staticmethod
+    def _latest_row(indicators: Union[pd.DataFrame, Dict[str, np.ndarray]]) -> Union[pd.Series, Dict[str, Any]]:
+        """Last row of an indicator DataFrame or dict of column arrays."""
+        if isinstance(indicators, pd.DataFrame):
+            return indicators.iloc[-1]
+        return {name: values[-1] for name, values in indicators.items()}
+    
+    def _generate_signals(self, ticker: str,
+                          df: Union[pd.DataFrame, Dict[str, np.ndarray]]) -> List[TradingSignal]:
         """Generate trading signals based on strategy rules."""
+        return self._generate_row_signals(ticker, self._latest_row(df))
+    
+    def _generate_row_signals(self, ticker: str, current_row: Union[pd.Series, Dict[str, Any]]) -> List[TradingSignal]:
+        """Generate trading signals for a single indicator row."""
         signals = []
-        current_row = df.iloc[-1]
         current_time = datetime.now()
         
         # Get current position state
@@ -448,9 +681,14 @@ class RSIPSAREngulfingStrategy:
         else:  # short
             return entry_price * (1 - tp_percent)
     
-    def _update_ticker_state(self, ticker: str, df: pd.DataFrame):
+    def _update_ticker_state(self, ticker: str,
+                             df: Union[pd.DataFrame, Dict[str, np.ndarray]]):
         """Update internal state for ticker."""
-        current_row = df.iloc[-1]
+        self._update_ticker_state_from_row(ticker, self._latest_row(df))
+    
+    def _update_ticker_state_from_row(self, ticker: str,
+                                      current_row: Union[pd.Series, Dict[str, Any]]):
+        """Update internal state for ticker from a single indicator row."""
         current_time = datetime.now()
         
         if ticker not in self.ticker_states:
@@ -0,0 +1,125 @@
+import pytest
+from datetime import datetime, timedelta
+import pytz
+from utils.bar_builder import BarBuilder, SyntheticTickReplayer, Tick, parse_timeframe
+from utils.indicators import StreamingIndicators
+
+VN_TZ = pytz.timezone('Asia/Ho_Chi_Minh')
+
+
+def _at(hour, minute, second=0, day=2):
+    """Exchange-time timestamp on January 2024."""
+    return VN_TZ.localize(datetime(2024, 1, day, hour, minute, second))
+
+
+class TestBarBuilder:
+    """Test cases for tick-to-bar aggregation."""
+    
+    def test_parse_timeframe(self):
+        """Timeframe strings map to bar lengths."""
+        assert parse_timeframe('5m') == timedelta(minutes=5)
+        assert parse_timeframe('1h') == timedelta(hours=1)
+        assert parse_timeframe('1d') == timedelta(days=1)
+        with pytest.raises(ValueError):
+            parse_timeframe('5x')
+    
+    def test_ohlcv_from_cumulative_volume(self):
+        """Bars align to boundaries and take volume from cumulative volume growth."""
+        bars = []
+        builder = BarBuilder('5m', bars.append, emit_partial=False)
+        
+        builder.add_tick('VCB', _at(9, 15, 10), 100.0, 1000, match_volume=1000)
+        builder.add_tick('VCB', _at(9, 16), 103.0, 1500)
+        builder.add_tick('VCB', _at(9, 19, 59), 99.0, 1700)
+        builder.add_tick('VCB', _at(9, 20), 101.0, 2000)
+        
+        assert len(bars) == 1
+        bar = bars[0]
+        assert bar.final
+        assert (bar.start, bar.end) == (_at(9, 15), _at(9, 20))
+        assert (bar.open, bar.high, bar.low, bar.close) == (100.0, 103.0, 99.0, 99.0)
+        assert bar.volume == 1700
+        assert bar.tick_count == 3
+        
+        current = builder.current_bar('VCB')
+        assert current.start == _at(9, 20)
+        assert current.volume == 300
+        assert not current.final
+    
+    def test_partial_bars_and_timer_close(self):
+        """Partial bars are throttled; close_due finalizes bars with no later tick."""
+        bars = []
+        builder = BarBuilder('1m', bars.append, partial_interval=10)
+        
+        for second in range(0, 30, 5):
+            builder.add_tick('FPT', _at(10, 0, second), 90.0 + second, 100 * (second + 1))
+        
+        partials = [bar for bar in bars if not bar.final]
+        assert len(partials) == 3  # 0s, 10s, 20s
+        assert partials[-1].close == 110.0
+        
+        assert builder.close_due(_at(10, 0, 59)) == []
+        closed = builder.close_due(_at(10, 1))
+        assert len(closed) == 1 and closed[0].final and closed[0].close == 115.0
+        assert bars[-1] is closed[0]
+        assert builder.current_bar('FPT') is None
+    
+    def test_stale_ticks_and_session_reset(self):
+        """Older snapshots are dropped; a new session restarts the volume counter."""
+        bars = []
+        builder = BarBuilder('1m', bars.append, emit_partial=False)
+        
+        builder.add_tick('HPG', _at(14, 44), 25.0, 5000, match_volume=100)
+        builder.add_tick('HPG', _at(14, 44, 30), 24.0, 4000)  # Stale
+        builder.add_tick('HPG', _at(14, 44, 40), 25.5, 5200)
+        assert builder.get_stats()['stale_ticks'] == 1
+        
+        builder.add_tick('HPG', _at(9, 15, day=3), 26.0, 300)
+        assert bars[-1].volume == 300
+        assert bars[-1].low == 25.0
+        assert builder.current_bar('HPG').volume == 300
+    
+    def test_timestamps_aligned_in_exchange_time(self):
+        """Bars of UTC ticks are aligned in exchange time."""
+        bars = []
+        builder = BarBuilder('1h', bars.append)
+        builder.add_tick('VNM', datetime(2024, 1, 2, 2, 30, tzinfo=pytz.utc), 70.0, 100)
+        assert bars[-1].start == _at(9, 0)
+
+
+class TestSyntheticTickReplayer:
+    """Test cases for the synthetic tick stream."""
+    
+    def test_replay_builds_consistent_bars(self):
+        """Replayed ticks produce one bar per minute whose volumes add up."""
+        replayer = SyntheticTickReplayer(['VCB', 'FPT'], _at(9, 15), ticks_per_minute=20, seed=7)
+        ticks = list(replayer.ticks(timedelta(minutes=10)))
+        assert len(ticks) == 400
+        assert all(isinstance(tick, Tick) for tick in ticks)
+        
+        bars = []
+        builder = BarBuilder('1m', bars.append, emit_partial=False)
+        assert replayer.replay(builder.on_tick, timedelta(minutes=10)) == 400
+        builder.close_due(_at(9, 25))
+        
+        vcb = [bar for bar in bars if bar.ticker == 'VCB']
+        assert [bar.start for bar in vcb] == [_at(9, 15 + i) for i in range(10)]
+        assert all(bar.low <= min(bar.open, bar.close) <= max(bar.open, bar.close) <= bar.high for bar in vcb)
+        assert sum(bar.volume for bar in vcb) == [t for t in ticks if t.ticker == 'VCB'][-1].total_volume
+    
+    def test_streaming_indicators_from_replayed_bars(self):
+        """Final bars advance the indicator engine, partial bars only preview."""
+        engine = StreamingIndicators()
+        
+        def on_bar(bar):
+            if bar.final:
+                engine.update(bar.open, bar.high, bar.low, bar.close, bar.volume)
+            else:
+                engine.preview(bar.open, bar.high, bar.low, bar.close, bar.volume)
+        
+        builder = BarBuilder('1m', on_bar)
+        replayer = SyntheticTickReplayer(['VCB'], _at(9, 15), ticks_per_minute=6)
+        replayer.replay(builder.on_tick, timedelta(minutes=60))
+        builder.close_due(_at(10, 15))
+        
+        assert engine.bar_count == 60
@@ -0,0 +1,88 @@
+import pytest
+import numpy as np
+import pandas as pd
+from utils.bar_store import BarStore
+
+
+def _bars(start, periods, base=0.0, tz=None):
+    """15-minute bars with a 'timestamp' column."""
+    timestamps = pd.date_range(start, periods=periods, freq='15min', tz=tz)
+    values = base + np.arange(periods, dtype=float)
+    return pd.DataFrame({
+        'ticker': 'VCB',
+        'timestamp': timestamps,
+        'open': values,
+        'high': values + 1,
+        'low': values - 1,
+        'close': values + 0.5,
+        'volume': np.arange(periods, dtype=np.int64) * 100
+    })
+
+
+class TestBarStore:
+    """Test cases for the columnar bar store."""
+    
+    def test_append_and_read(self, tmp_path):
+        """Bars round-trip with their dtypes; reads slice by count or range."""
+        store = BarStore(tmp_path)
+        bars = _bars('2024-01-02 09:15', 20)
+        
+        assert store.append('VCB', '15m', bars) == 20
+        
+        frame = store.read('VCB', '15m')
+        pd.testing.assert_frame_equal(frame, bars, check_dtype=False)
+        assert frame['volume'].dtype == np.int64
+        assert store.last_timestamp('VCB', '15m') == bars['timestamp'].iloc[-1]
+        assert len(store.read('VCB', '15m', last_n=5)) == 5
+        assert store.read('VCB', '15m', last_n=5)['timestamp'].iloc[-1] == bars['timestamp'].iloc[-1]
+        
+        window = store.read('VCB', '15m', start='2024-01-02 10:00', end='2024-01-02 10:30')
+        assert list(window['open']) == [3.0, 4.0, 5.0]
+        assert store.read('FPT', '15m').empty
+        assert store.tickers('15m') == ['VCB']
+    
+    def test_delta_merge(self, tmp_path):
+        """Overlapping fetches only append newer bars and revise the last one."""
+        store = BarStore(tmp_path)
+        store.append('VCB', '15m', _bars('2024-01-02 09:15', 10))
+        
+        # Re-fetch from earlier: old bars are ignored, the last one is revised
+        update = _bars('2024-01-02 10:30', 8, base=100.0)
+        written = store.append('VCB', '15m', update)
+        
+        frame = store.read('VCB', '15m')
+        assert written == 4
+        assert len(frame) == 13
+        assert frame['timestamp'].is_monotonic_increasing
+        assert frame['open'].iloc[8] == 8.0
+        assert frame['open'].iloc[9] == 104.0
+        assert frame['open'].iloc[-1] == 107.0
+        assert store.append('VCB', '15m', update) == 1
+        assert len(store.read('VCB', '15m')) == 13
+    
+    def test_uncommitted_rows_ignored(self, tmp_path):
+        """Rows written past the committed count are invisible and overwritten."""
+        store = BarStore(tmp_path)
+        store.append('VCB', '15m', _bars('2024-01-02 09:15', 5))
+        
+        # Simulate an interrupted append
+        with open(tmp_path / '15m' / 'VCB' / 'open.bin', 'ab') as f:
+            f.write(np.array([999.0, 999.0]).tobytes())
+        assert len(store.read('VCB', '15m')) == 5
+        
+        store.append('VCB', '15m', _bars('2024-01-02 10:30', 2, base=50.0))
+        assert list(store.read('VCB', '15m')['open']) == [0.0, 1.0, 2.0, 3.0, 4.0, 50.0, 51.0]
+    
+    def test_timezone_and_delete(self, tmp_path):
+        """Timezone-aware bars keep their zone; series can be deleted."""
+        store = BarStore(tmp_path)
+        bars = _bars('2024-01-02 09:15', 4, tz='Asia/Ho_Chi_Minh')
+        store.append('VCB', '15m', bars)
+        
+        frame = store.read('VCB', '15m', start='2024-01-02 09:30')
+        assert str(frame['timestamp'].dt.tz) == 'Asia/Ho_Chi_Minh'
+        assert frame['timestamp'].iloc[0] == bars['timestamp'].iloc[1]
+        
+        assert store.delete('VCB', '15m')
+        assert store.read('VCB', '15m').empty
+        assert not store.delete('VCB', '15m')
@@ -1,3 +1,4 @@
+import asyncio
 import pytest
 import time
 import json
@@ -524,4 +525,873 @@ class TestCacheIntegration:
         
         # Should have all results
         assert len(results) == 50
-        assert all(result is not None for result in results)
\ No newline at end of file
+        assert all(result is not None for result in results)
+
+class TestCacheKeyFingerprint:
+    """Test cases for content-based cache keys."""
+    
+    def test_dataframe_key_uses_content(self):
+        """Frames differing only in rows hidden from repr get different keys."""
+        import numpy as np
+        import pandas as pd
+        
+        cache_manager = CacheManager(use_redis=False)
+        df = pd.DataFrame({'close': np.arange(1000, dtype=float)})
+        changed = df.copy()
+        changed.loc[500, 'close'] = -1.0
+        
+        assert str(df) == str(changed)  # Truncated repr hides the change
+        assert cache_manager._generate_key("f", df) != cache_manager._generate_key("f", changed)
+        assert cache_manager._generate_key("f", df) == cache_manager._generate_key("f", df.copy())
+    
+    def test_dataframe_key_includes_shape_and_index(self):
+        """Shape and index contents are part of the fingerprint."""
+        import pandas as pd
+        
+        cache_manager = CacheManager(use_redis=False)
+        df = pd.DataFrame({'close': [1.0, 2.0, 3.0]})
+        shifted = df.set_index(pd.Index([10, 11, 12]))
+        
+        assert cache_manager._generate_key("f", df) != cache_manager._generate_key("f", shifted)
+        assert cache_manager._generate_key("f", df) != cache_manager._generate_key("f", df.head(2))
+        
+        # Same length and first/last timestamps, different interior bars
+        bars = pd.DataFrame({'close': [1.0, 2.0, 3.0]},
+                            index=pd.to_datetime(['2024-01-02 09:00', '2024-01-02 09:15', '2024-01-02 10:00']))
+        gapped = bars.set_index(pd.to_datetime(['2024-01-02 09:00', '2024-01-02 09:45', '2024-01-02 10:00']))
+        assert cache_manager._generate_key("f", bars) != cache_manager._generate_key("f", gapped)
+        assert cache_manager._generate_key("f", bars) == cache_manager._generate_key("f", bars.copy())
+        assert cache_manager._generate_key("f", bars['close']) != cache_manager._generate_key("f", gapped['close'])
+    
+    def test_ndarray_and_object_columns(self):
+        """Arrays and non-numeric columns are fingerprinted by value."""
+        import numpy as np
+        import pandas as pd
+        
+        cache_manager = CacheManager(use_redis=False)
+        a = np.arange(10)
+        frame = pd.DataFrame({'ticker': ['VIC', 'VHM'], 'close': [1.0, 2.0]})
+        other = pd.DataFrame({'ticker': ['VIC', 'FPT'], 'close': [1.0, 2.0]})
+        
+        assert cache_manager._generate_key("f", a) == cache_manager._generate_key("f", a.copy())
+        assert cache_manager._generate_key("f", a) != cache_manager._generate_key("f", a[::-1].copy())
+        assert cache_manager._generate_key("f", frame) != cache_manager._generate_key("f", other)
+    
+    def test_cached_method_hits_across_instances(self):
+        """Bound methods share entries across instances with the same identity."""
+        import pandas as pd
+        
+        cache_manager = CacheManager(use_redis=False)
+        calls = []
+        
+        class Analyzer:
+            def __init__(self, period):
+                self.period = period
+            
+            def cache_key(self):
+                return str(self.period)
+            
+            @cached(cache_manager, prefix="test")
+            def total(self, df):
+                calls.append(1)
+                return float(df['close'].sum())
+        
+        class Plain:
+            @cached(cache_manager, prefix="test")
+            def total(self, df):
+                calls.append(1)
+                return float(df['close'].sum())
+        
+        df = pd.DataFrame({'close': [1.0, 2.0, 3.0]})
+        
+        assert Analyzer(14).total(df) == 6.0
+        assert Analyzer(14).total(df.copy()) == 6.0
+        assert len(calls) == 1
+        
+        Analyzer(20).total(df)
+        assert len(calls) == 2
+        
+        Plain().total(df)
+        Plain().total(df)
+        assert len(calls) == 3
+
+    def test_plain_object_arguments_are_not_shared(self):
+        """Objects without a stable identity are never keyed by their class."""
+        from utils.cache_manager import _fingerprint
+        
+        cache_manager = CacheManager(use_redis=False)
+        calls = []
+        
+        class Cfg:
+            def __init__(self, period):
+                self.period = period
+        
+        @cached(cache_manager, prefix="test")
+        def period_of(cfg):
+            calls.append(1)
+            return cfg.period
+        
+        with pytest.raises(TypeError):
+            _fingerprint(Cfg(1))
+        
+        assert period_of(Cfg(1)) == 1
+        assert period_of(Cfg(2)) == 2
+        assert period_of(Cfg(2)) == 2
+        assert len(calls) == 3
+        assert cache_manager.get_stats()['memory_cache']['entries'] == 0
+
+
+class TestMemoryCacheEviction:
+    """Test LRU/TTL bookkeeping of the in-memory tier."""
+    
+    def test_lru_eviction_keeps_recently_used(self):
+        """Reading an entry protects it from the next eviction."""
+        cache_manager = CacheManager(use_redis=False, memory_cache_size=3)
+        
+        for key in ("a", "b", "c"):
+            cache_manager.set(key, key)
+        cache_manager.get("a")
+        cache_manager.set("d", "d")
+        
+        assert cache_manager.get("a") == "a"
+        assert cache_manager.get("b") is None
+        assert len(cache_manager._memory_cache) == 3
+    
+    def test_expired_entries_removed_on_set(self):
+        """Expired entries are dropped without waiting for a periodic sweep."""
+        cache_manager = CacheManager(use_redis=False)
+        
+        cache_manager.set("short", 1, ttl=1)
+        cache_manager.set("long", 2, ttl=300)
+        for key in list(cache_manager._memory_cache):
+            entry = cache_manager._memory_cache[key]
+            if key == "short":
+                entry.expires_at = datetime.now() - timedelta(seconds=1)
+        cache_manager._expiry_heap = [
+            (entry.expires_at.timestamp(), key)
+            for key, entry in cache_manager._memory_cache.items()
+        ]
+        
+        cache_manager.set("other", 3)
+        
+        assert "short" not in cache_manager._memory_cache
+        assert cache_manager.get("long") == 2
+    
+    def test_byte_budget(self):
+        """Total stored bytes stay under memory_cache_max_bytes."""
+        cache_manager = CacheManager(use_redis=False, memory_cache_max_bytes=2000)
+        
+        for i in range(50):
+            cache_manager.set(f"key_{i}", "x" * 100)
+        
+        stats = cache_manager.get_stats()['memory_cache']
+        assert 0 < stats['total_size_bytes'] <= 2000
+        assert stats['total_size_bytes'] == sum(
+            entry.size_bytes for entry in cache_manager._memory_cache.values()
+        )
+        assert cache_manager.get("key_49") == "x" * 100
+        assert cache_manager.get("key_0") is None
+    
+    def test_overwrite_and_delete_keep_accounting(self):
+        """Replacing and deleting entries keeps byte totals and heap bounded."""
+        cache_manager = CacheManager(use_redis=False)
+        
+        for i in range(1000):
+            cache_manager.set("hot", i)
+        cache_manager.delete("hot")
+        
+        assert cache_manager._memory_bytes == 0
+        assert len(cache_manager._expiry_heap) < 100
+    
+    def test_dataframe_sizes_without_serialization(self):
+        """Memory-only entries are sized from memory_usage and never pickled."""
+        import pandas as pd
+        import numpy as np
+        
+        cache_manager = CacheManager(use_redis=False)
+        df = pd.DataFrame({'close': np.arange(200, dtype=float), 'ticker': ['VCB'] * 200})
+        
+        with patch.object(cache_manager, '_serialize_value') as serialize:
+            cache_manager.set("indicators:abc", df)
+            cache_manager.set("indicators:def", np.zeros(1000))
+            cache_manager.set("latest_data:abc", {'VCB': 1.0})
+            serialize.assert_not_called()
+        
+        assert cache_manager._memory_cache["indicators:abc"].size_bytes == \
+            df.memory_usage(index=True, deep=True).sum()
+        assert cache_manager._memory_cache["indicators:def"].size_bytes == 8000
+        
+        prefixes = cache_manager.get_stats()['memory_cache']['prefixes']
+        assert list(prefixes) == ['indicators', 'latest_data']
+        assert prefixes['indicators']['entries'] == 2
+        
+        cache_manager.delete("latest_data:abc")
+        assert 'latest_data' not in cache_manager.get_stats()['memory_cache']['prefixes']
+    
+    def test_size_estimate_handles_cycles_and_large_graphs(self):
+        """Back-references don't recurse forever and arbitrary objects are sized shallowly."""
+        import sys
+        from utils.cache_manager import _estimate_size
+        
+        class Node:
+            pass
+        
+        node = Node()
+        node.self = node
+        holder = Node()
+        holder.graph = {i: list(range(100)) for i in range(1000)}
+        nested = []
+        for _ in range(5000):
+            nested = [nested]
+        
+        cache_manager = CacheManager(use_redis=False)
+        assert cache_manager.set("objects:node", node)
+        assert cache_manager.get("objects:node") is node
+        assert _estimate_size(holder) == sys.getsizeof(holder)
+        assert 0 < _estimate_size(nested) < 1000
+        
+        looped = {'a': [1.0]}
+        looped['self'] = looped
+        assert _estimate_size(looped) > sys.getsizeof(looped)
+
+
+class TestSingleFlight:
+    """Test request coalescing and refresh-ahead in get_or_compute/cached."""
+    
+    def test_concurrent_misses_compute_once(self):
+        """Threads missing the same key share one computation."""
+        import threading
+        from concurrent.futures import ThreadPoolExecutor
+        
+        cache_manager = CacheManager(use_redis=False)
+        calls = []
+        barrier = threading.Barrier(8)
+        
+        @cached(cache_manager, prefix="latest_data", ttl=60)
+        def fetch(ticker):
+            calls.append(ticker)
+            time.sleep(0.1)
+            return {'ticker': ticker}
+        
+        def worker():
+            barrier.wait()
+            return fetch("VCB")
+        
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(executor.map(lambda _: worker(), range(8)))
+        
+        assert calls == ["VCB"]
+        assert all(result == {'ticker': "VCB"} for result in results)
+    
+    def test_errors_propagate_to_waiters(self):
+        """A failed computation raises in every waiting caller and is not cached."""
+        import threading
+        
+        cache_manager = CacheManager(use_redis=False)
+        started = threading.Event()
+        errors = []
+        
+        def failing():
+            started.set()
+            time.sleep(0.05)
+            raise RuntimeError("api down")
+        
+        def waiter():
+            started.wait()
+            try:
+                cache_manager.get_or_compute("key", failing)
+            except RuntimeError as e:
+                errors.append(e)
+        
+        thread = threading.Thread(target=waiter)
+        thread.start()
+        with pytest.raises(RuntimeError):
+            cache_manager.get_or_compute("key", failing)
+        thread.join()
+        
+        assert len(errors) == 1
+        assert cache_manager._inflight == {}
+        assert cache_manager.get_or_compute("key", lambda: 1) == 1
+    
+    def test_refresh_ahead(self):
+        """Entries past the refresh fraction are served stale and refreshed."""
+        cache_manager = CacheManager(use_redis=False, refresh_ahead_fraction=0.5)
+        values = iter([1, 2])
+        
+        assert cache_manager.get_or_compute("key", lambda: next(values), ttl=60) == 1
+        entry = cache_manager._memory_cache["key"]
+        entry.created_at -= timedelta(seconds=40)
+        entry.expires_at -= timedelta(seconds=40)
+        
+        assert cache_manager.get_or_compute("key", lambda: next(values), ttl=60) == 1
+        
+        deadline = time.time() + 2
+        while cache_manager.get("key") != 2 and time.time() < deadline:
+            time.sleep(0.01)
+        assert cache_manager.get("key") == 2
+
+
+def _fake_redis_cache_manager(**kwargs):
+    """CacheManager whose Redis tier is an in-process fakeredis server."""
+    fakeredis = pytest.importorskip("fakeredis")
+    server = fakeredis.FakeServer()
+    
+    def make_client(*args, **client_kwargs):
+        return fakeredis.FakeRedis(server=server)
+    
+    with patch('utils.cache_manager.redis.Redis', make_client):
+        cache_manager = CacheManager(use_redis=True, **kwargs)
+    cache_manager._async_redis = fakeredis.FakeAsyncRedis(server=server)
+    return cache_manager
+
+
+def _indicator_frame(n_bars=200):
+    """Indicator-shaped frame: float columns, an int column and a text column."""
+    import numpy as np
+    import pandas as pd
+    
+    rng = np.random.default_rng(3)
+    index = pd.date_range('2024-01-01', periods=n_bars, freq='D', name='time')
+    frame = pd.DataFrame({
+        column: rng.random(n_bars)
+        for column in ('open', 'high', 'low', 'close', 'rsi', 'psar', 'avg_volume_20', 'body_size')
+    }, index=index)
+    frame['volume'] = rng.integers(1_000, 1_000_000, n_bars)
+    frame['engulfing_signal'] = rng.integers(-1, 2, n_bars)
+    frame['rsi_state'] = np.where(frame['rsi'] > 0.5, 'overbought', 'neutral')
+    return frame
+
+
+class TestSerializationEnvelope:
+    """Test the typed serialization envelope used for the Redis tier."""
+    
+    @pytest.mark.parametrize('compression', [None, 'zlib'])
+    def test_round_trip_through_redis(self, compression):
+        """Values read back from Redis match what was stored."""
+        import numpy as np
+        import pandas as pd
+        from utils.cache_manager import FORMAT_BUFFERS, FORMAT_JSON, FORMAT_PICKLE
+        
+        cache_manager = _fake_redis_cache_manager(compression=compression, compression_min_bytes=0)
+        frame = _indicator_frame()
+        values = {
+            'frame': (frame, FORMAT_BUFFERS),
+            'array': (np.arange(12, dtype=np.float32).reshape(3, 4), FORMAT_BUFFERS),
+            'json': ({'VCB': [1, 2.5, None]}, FORMAT_JSON),
+            'pickle': ((1, 'tuple'), FORMAT_PICKLE),
+            'mixed': ({'time': pd.Timestamp('2024-01-01')}, FORMAT_PICKLE),
+        }
+        
+        for key, (value, fmt) in values.items():
+            cache_manager.set(key, value)
+            assert cache_manager.redis_client.get(key)[0] == fmt
+        cache_manager._memory_cache.clear()
+        
+        result = cache_manager.get('frame')
+        pd.testing.assert_frame_equal(result, frame)
+        result.iloc[0, 0] = 0.0  # Reconstructed frames are writable
+        np.testing.assert_array_equal(cache_manager.get('array'), values['array'][0])
+        assert cache_manager.get('json') == {'VCB': [1, 2.5, None]}
+        assert cache_manager.get('pickle') == (1, 'tuple')
+        assert cache_manager.get('mixed') == values['mixed'][0]
+    
+    def test_reads_legacy_payloads(self):
+        """Payloads written before the envelope still deserialize."""
+        import pickle
+        import pandas as pd
+        
+        cache_manager = CacheManager(use_redis=False)
+        frame = _indicator_frame(10)
+        
+        assert cache_manager._deserialize_value(json.dumps({'a': 1}).encode()) == {'a': 1}
+        pd.testing.assert_frame_equal(cache_manager._deserialize_value(pickle.dumps(frame)), frame)
+    
+    def test_buffers_handle_extension_dtypes(self):
+        """Series, categoricals and tz-aware indexes survive the buffer format."""
+        import pandas as pd
+        
+        cache_manager = CacheManager(use_redis=False)
+        index = pd.date_range('2024-01-01', periods=3, tz='Asia/Ho_Chi_Minh')
+        frame = pd.DataFrame({'state': pd.Categorical(['a', 'b', 'a']), 1: [1.0, 2.0, 3.0]}, index=index)
+        
+        pd.testing.assert_frame_equal(
+            cache_manager._deserialize_value(cache_manager._serialize_value(frame)), frame
+        )
+        pd.testing.assert_series_equal(
+            cache_manager._deserialize_value(cache_manager._serialize_value(frame[1])), frame[1]
+        )
+    
+    @pytest.mark.benchmark
+    def test_serialization_performance_benchmark(self):
+        """Benchmark Redis round trips of indicator frames against plain pickle."""
+        import pickle
+        
+        cache_manager = _fake_redis_cache_manager()
+        frame = _indicator_frame()
+        n_rounds = 500
+        
+        def legacy_loads(data):
+            try:
+                return json.loads(data.decode('utf-8'))
+            except (json.JSONDecodeError, UnicodeDecodeError):
+                return pickle.loads(data)
+        
+        client = cache_manager.redis_client
+        start_time = time.time()
+        for i in range(n_rounds):
+            client.set(f"legacy_{i}", pickle.dumps(frame))
+            legacy_loads(client.get(f"legacy_{i}"))
+        legacy_time = time.time() - start_time
+        
+        start_time = time.time()
+        for i in range(n_rounds):
+            client.set(f"envelope_{i}", cache_manager._serialize_value(frame))
+            cache_manager._deserialize_value(client.get(f"envelope_{i}"))
+        envelope_time = time.time() - start_time
+        
+        # The envelope adds no meaningful cost over plain pickle
+        assert envelope_time < 2 * legacy_time
+        assert envelope_time < 5.0
+
+
+class TestBulkOperations:
+    """Test get_many/set_many/delete_many."""
+    
+    def test_bulk_round_trip_through_redis(self):
+        """Bulk writes land in Redis and misses are read with a single MGET."""
+        cache_manager = _fake_redis_cache_manager()
+        items = {f"latest_data:{ticker}": {'close': i} for i, ticker in enumerate(['VCB', 'FPT', 'HPG'])}
+        
+        assert cache_manager.set_many(items, ttl=60)
+        assert cache_manager.redis_client.ttl("latest_data:VCB") > 0
+        
+        cache_manager._memory_cache.clear()
+        cache_manager.get("latest_data:VCB")  # One key back in memory
+        with patch.object(cache_manager.redis_client, 'pipeline',
+                          wraps=cache_manager.redis_client.pipeline) as pipeline:
+            results = cache_manager.get_many(list(items) + ["latest_data:MISSING"])
+        
+        assert results == items
+        pipeline.assert_called_once()  # One round trip for the two Redis misses
+        assert 0 < (cache_manager._memory_cache["latest_data:FPT"].expires_at - datetime.now()).total_seconds() <= 60
+        
+        assert cache_manager.delete_many(["latest_data:VCB", "latest_data:FPT"])
+        assert cache_manager.get_many(list(items)) == {"latest_data:HPG": {'close': 2}}
+        assert cache_manager.redis_client.exists("latest_data:VCB") == 0
+    
+    def test_bulk_falls_back_to_memory_when_redis_down(self):
+        """Redis errors leave the memory tier working."""
+        cache_manager = _fake_redis_cache_manager()
+        broken = MagicMock()
+        broken.pipeline.side_effect = ConnectionError("redis down")
+        broken.delete.side_effect = ConnectionError("redis down")
+        cache_manager.redis_client = broken
+        
+        assert cache_manager.set_many({"a": 1, "b": 2})
+        assert cache_manager.get_many(["a", "b", "c"]) == {"a": 1, "b": 2}
+        assert cache_manager.delete_many(["a"])
+        assert cache_manager.get_many(["a", "b"]) == {"b": 2}
+    
+    def test_get_many_drops_expired_entries(self):
+        """Expired memory entries are not returned."""
+        cache_manager = CacheManager(use_redis=False)
+        cache_manager.set_many({"a": 1, "b": 2}, ttl=60)
+        cache_manager._memory_cache["a"].expires_at = datetime.now() - timedelta(seconds=1)
+        
+        assert cache_manager.get_many(["a", "b"]) == {"b": 2}
+        assert "a" not in cache_manager._memory_cache
+
+
+class TestNamespaceInvalidation:
+    """Test generation-counter namespaces and SCAN-based deletion."""
+    
+    def test_invalidate_namespace_bumps_generation(self):
+        """Bumping a namespace hides its keys without touching others."""
+        cache_manager = _fake_redis_cache_manager()
+        
+        old_key = cache_manager.namespaced_key("historical_data", "VCB", "1d")
+        cache_manager.set(old_key, [1, 2])
+        cache_manager.set(cache_manager.namespaced_key("latest_data", "VCB"), 3)
+        
+        assert cache_manager.invalidate_namespace("historical_data") == 1
+        new_key = cache_manager.namespaced_key("historical_data", "VCB", "1d")
+        
+        assert new_key != old_key
+        assert cache_manager.get(new_key) is None
+        assert old_key not in cache_manager._memory_cache
+        assert cache_manager.get(cache_manager.namespaced_key("latest_data", "VCB")) == 3
+    
+    def test_generation_shared_through_redis(self):
+        """A second process picks up the generation stored in Redis."""
+        fakeredis = pytest.importorskip("fakeredis")
+        server = fakeredis.FakeServer()
+        
+        def make_client(*args, **kwargs):
+            return fakeredis.FakeRedis(server=server)
+        
+        with patch('utils.cache_manager.redis.Redis', make_client):
+            writer = CacheManager(use_redis=True)
+            writer.invalidate_namespace("historical_data")
+            writer.invalidate_namespace("historical_data")
+            reader = CacheManager(use_redis=True)
+        
+        assert reader.get_generation("historical_data") == 2
+        assert reader.namespaced_key("historical_data", "VCB") == "historical_data:g2:VCB"
+    
+    def test_cached_decorator_cache_clear(self):
+        """cache_clear() invalidates a decorated function's namespace."""
+        cache_manager = CacheManager(use_redis=False)
+        calls = []
+        
+        @cached(cache_manager, prefix="test")
+        def compute(x):
+            calls.append(x)
+            return x * 2
+        
+        compute(1)
+        compute(1)
+        compute.cache_clear()
+        compute(1)
+        
+        assert calls == [1, 1]
+    
+    def test_reclaim_namespace_keys(self):
+        """Only keys from older generations are reclaimed."""
+        cache_manager = _fake_redis_cache_manager()
+        
+        for i in range(30):
+            cache_manager.set(cache_manager.namespaced_key("ns", i), i)
+        cache_manager.invalidate_namespace("ns")
+        cache_manager.set(cache_manager.namespaced_key("ns", "fresh"), 1)
+        cache_manager.set("ns_other:g0:1", 1)
+        
+        assert cache_manager.reclaim_namespace_keys("ns", batch_size=7) == 30
+        remaining = sorted(key.decode() for key in cache_manager.redis_client.scan_iter())
+        assert remaining == ["cache_gen:ns", "ns:g1:fresh", "ns_other:g0:1"]
+    
+    def test_clear_uses_scan_not_keys(self):
+        """clear() never calls KEYS or FLUSHDB and keeps generation counters."""
+        cache_manager = _fake_redis_cache_manager()
+        client = cache_manager.redis_client
+        
+        cache_manager.invalidate_namespace("ns")
+        for i in range(20):
+            cache_manager.set(f"latest_data:{i}", i)
+        cache_manager.set("other:1", 1)
+        
+        with patch.object(client, 'keys') as keys, patch.object(client, 'flushdb') as flushdb:
+            assert cache_manager.clear("latest_data")
+            assert sorted(key.decode() for key in client.scan_iter()) == ["cache_gen:ns", "other:1"]
+            assert cache_manager.clear()
+            keys.assert_not_called()
+            flushdb.assert_not_called()
+        
+        assert [key.decode() for key in client.scan_iter()] == ["cache_gen:ns"]
+        assert cache_manager._memory_cache == {}
+    
+    def test_delete_pattern(self):
+        """Glob patterns delete matching entries from both tiers."""
+        cache_manager = _fake_redis_cache_manager()
+        for ticker in ("VCB", "FPT"):
+            cache_manager.set(f"latest_data:{ticker}", 1)
+        cache_manager.set("historical_data:VCB", 1)
+        
+        assert cache_manager.delete_pattern("latest_data:*") == 4  # 2 memory + 2 Redis
+        assert cache_manager.get("latest_data:VCB") is None
+        assert cache_manager.get("historical_data:VCB") == 1
+
+
+class TestCrossProcessInvalidation:
+    """Test pub/sub invalidation between cache managers sharing one Redis."""
+    
+    @pytest.fixture
+    def managers(self):
+        """Two cache managers ("processes") on the same fake Redis server."""
+        fakeredis = pytest.importorskip("fakeredis")
+        server = fakeredis.FakeServer()
+        
+        def make_client(*args, **kwargs):
+            return fakeredis.FakeRedis(server=server)
+        
+        with patch('utils.cache_manager.redis.Redis', make_client):
+            first = CacheManager(use_redis=True, invalidation_channel="test_invalidation")
+            second = CacheManager(use_redis=True, invalidation_channel="test_invalidation")
+        yield first, second
+        first.close()
+        second.close()
+    
+    @staticmethod
+    def _wait_for(condition, timeout=2.0):
+        deadline = time.time() + timeout
+        while not condition() and time.time() < deadline:
+            time.sleep(0.01)
+        return condition()
+    
+    def test_set_evicts_remote_copies(self, managers):
+        """A write in one process evicts the other's stale local copy."""
+        first, second = managers
+        first.set("latest_data:VCB", 1)
+        assert second.get("latest_data:VCB") == 1
+        assert "latest_data:VCB" in second._memory_cache
+        
+        first.set("latest_data:VCB", 2)
+        
+        assert self._wait_for(lambda: "latest_data:VCB" not in second._memory_cache)
+        assert second.get("latest_data:VCB") == 2
+        assert "latest_data:VCB" in first._memory_cache  # Own events are ignored
+    
+    def test_delete_and_namespace_events(self, managers):
+        """Deletes, patterns and namespace bumps propagate."""
+        first, second = managers
+        key = first.namespaced_key("historical_data", "VCB")
+        first.set_many({key: 1, "latest_data:VCB": 2, "latest_data:FPT": 3})
+        second.get_many([key, "latest_data:VCB", "latest_data:FPT"])
+        
+        first.delete("latest_data:VCB")
+        first.delete_pattern("latest_data:F*")
+        first.invalidate_namespace("historical_data")
+        
+        assert self._wait_for(lambda: len(second._memory_cache) == 0)
+        assert self._wait_for(lambda: second.get_generation("historical_data") == 1)
+        assert second.namespaced_key("historical_data", "VCB") != key
+    
+    def test_events_evict_remote_disk_copies(self, tmp_path):
+        """Writes, deletes, patterns, namespace bumps and clears reach the other process's disk tier."""
+        fakeredis = pytest.importorskip("fakeredis")
+        server = fakeredis.FakeServer()
+        
+        def make_client(*args, **kwargs):
+            return fakeredis.FakeRedis(server=server)
+        
+        with patch('utils.cache_manager.redis.Redis', make_client):
+            first = CacheManager(use_redis=True, invalidation_channel="test_invalidation",
+                                 disk_cache_path=str(tmp_path / "first.db"))
+            second = CacheManager(use_redis=True, invalidation_channel="test_invalidation",
+                                  disk_cache_path=str(tmp_path / "second.db"))
+        
+        def on_disk(key):
+            return key in second.disk_cache.get_many([key])
+        
+        try:
+            key = first.namespaced_key("historical_data", "VCB")
+            first.set_many({key: 1, "latest_data:VCB": 1, "latest_data:FPT": 1, "signal:VCB": 1})
+            second.get_many([key, "latest_data:VCB", "latest_data:FPT", "signal:VCB"])
+            assert all(on_disk(k) for k in [key, "latest_data:VCB", "latest_data:FPT", "signal:VCB"])
+            
+            first.set("latest_data:VCB", 2)
+            assert self._wait_for(lambda: not on_disk("latest_data:VCB"))
+            assert second.get("latest_data:VCB") == 2
+            
+            first.delete_pattern("latest_data:F*")
+            assert self._wait_for(lambda: not on_disk("latest_data:FPT"))
+            assert second.get("latest_data:FPT") is None
+            
+            first.invalidate_namespace("historical_data")
+            assert self._wait_for(lambda: not on_disk(key))
+            assert second.disk_cache.get_generation("historical_data") == 1
+            
+            first.clear()
+            assert self._wait_for(lambda: not on_disk("signal:VCB"))
+            assert second.get("signal:VCB") is None
+        finally:
+            first.close()
+            second.close()
+    
+    def test_shared_disk_file_keeps_fresh_writes(self, tmp_path):
+        """Peers sharing one disk file keep the publisher's freshly written rows."""
+        fakeredis = pytest.importorskip("fakeredis")
+        server = fakeredis.FakeServer()
+        path = str(tmp_path / "shared.db")
+        
+        def make_client(*args, **kwargs):
+            return fakeredis.FakeRedis(server=server)
+        
+        with patch('utils.cache_manager.redis.Redis', make_client):
+            first = CacheManager(use_redis=True, invalidation_channel="test_invalidation",
+                                 disk_cache_path=path)
+            second = CacheManager(use_redis=True, invalidation_channel="test_invalidation",
+                                  disk_cache_path=path)
+        
+        try:
+            first.set("latest_data:VCB", 1)
+            assert second.get("latest_data:VCB") == 1
+            
+            for value in range(2, 12):
+                first.set("latest_data:VCB", value)
+                assert self._wait_for(lambda: "latest_data:VCB" not in second._memory_cache)
+                assert second.disk_cache.get("latest_data:VCB") is not None
+                assert second.get("latest_data:VCB") == value
+            
+            # Namespace bumps only drop entries of older generations
+            first.namespaced_key("historical_data")
+            first.invalidate_namespace("historical_data")
+            fresh = first.namespaced_key("historical_data", "VCB")
+            first.set(fresh, 1)
+            assert self._wait_for(lambda: second.get_generation("historical_data") == 1)
+            assert second.get(fresh) == 1
+        finally:
+            first.close()
+            second.close()
+    
+    def test_local_copy_keeps_remaining_ttl(self, managers):
+        """Copies of Redis hits expire with the Redis key."""
+        first, second = managers
+        first.set("latest_data:VCB", 1, ttl=30)
+        second.get("latest_data:VCB")
+        
+        expires_at = second._memory_cache["latest_data:VCB"].expires_at
+        assert expires_at is not None
+        assert 25 < (expires_at - datetime.now()).total_seconds() <= 30
+
+
+class TestCacheTelemetry:
+    """Test per-prefix hit, miss, latency and eviction telemetry."""
+    
+    def test_hits_and_misses_per_prefix(self):
+        """Lookups are counted per key prefix and source tier."""
+        cache_manager = CacheManager(use_redis=False)
+        cache_manager.set_many({"latest_data:VCB": 1, "latest_data:FPT": 2})
+        
+        cache_manager.get("latest_data:VCB")
+        cache_manager.get_many(["latest_data:VCB", "latest_data:FPT", "latest_data:HPG"])
+        cache_manager.get("indicators:VCB")
+        
+        telemetry = cache_manager.get_stats()['telemetry']
+        latest = telemetry['prefixes']['latest_data']
+        assert latest['hits_by_tier'] == {'memory': 3}
+        assert latest['misses'] == 1
+        assert latest['hit_ratio'] == 0.75
+        assert sum(latest['get_latency_ms'].values()) == 2
+        assert telemetry['prefixes']['indicators']['misses'] == 1
+        assert telemetry['overall']['hit_ratio'] == 0.6
+    
+    def test_redis_hits_and_serialized_bytes(self):
+        """Hits served by Redis are attributed to it; writes count payload bytes."""
+        cache_manager = _fake_redis_cache_manager()
+        cache_manager.set("ohlcv:1m:VCB", _indicator_frame())
+        cache_manager._clear_memory()
+        
+        cache_manager.get("ohlcv:1m:VCB")
+        cache_manager.get("ohlcv:1m:VCB")
+        
+        ohlcv = cache_manager.get_stats()['telemetry']['prefixes']['ohlcv']
+        assert ohlcv['hits_by_tier'] == {'redis': 1, 'memory': 1}
+        assert ohlcv['sets'] == 1
+        assert ohlcv['serialized_bytes'] > 10_000
+    
+    def test_eviction_reasons(self):
+        """Evictions are classified as capacity, bytes, expired or invalidated."""
+        cache_manager = CacheManager(use_redis=False, memory_cache_size=2,
+                                     memory_cache_max_bytes=10_000)
+        cache_manager.set("big:0", "x" * 20_000)
+        for i in range(3):
+            cache_manager.set(f"latest_data:{i}", i)
+        
+        key = cache_manager.namespaced_key("historical_data", "VCB")
+        cache_manager.set(key, 1)
+        cache_manager.invalidate_namespace("historical_data")
+        
+        cache_manager.set("short:0", 1)
+        cache_manager._memory_cache["short:0"].expires_at = datetime.now() - timedelta(seconds=1)
+        cache_manager.get("short:0")
+        
+        prefixes = cache_manager.get_stats()['telemetry']['prefixes']
+        assert prefixes['latest_data']['evictions'] == {'capacity': 2}
+        assert prefixes['big']['evictions'] == {'bytes': 1}
+        assert prefixes['historical_data']['evictions'] == {'invalidated': 1}
+        assert prefixes['short']['evictions'] == {'expired': 1}
+    
+    def test_snapshot_reports_window_deltas(self):
+        """Each snapshot covers only traffic since the previous one."""
+        cache_manager = CacheManager(use_redis=False)
+        cache_manager.set("latest_data:VCB", 1)
+        for _ in range(3):
+            cache_manager.get("latest_data:VCB")
+        
+        first = cache_manager.snapshot_stats()
+        cache_manager.get("latest_data:FPT")
+        second = cache_manager.snapshot_stats()
+        
+        assert first['overall']['hits'] == 3
+        assert first['overall']['hit_ratio'] == 1.0
+        assert second['overall']['hits'] == 0
+        assert second['overall']['misses'] == 1
+        assert second['overall']['hit_ratio'] == 0.0
+        assert second['prefixes']['latest_data']['sets'] == 0
+        assert cache_manager.get_stats()['telemetry']['overall']['hits'] == 3
+
+
+class TestAsyncCacheManager:
+    """Test the asyncio API (aget/aset/aget_many and async @cached)."""
+    
+    @pytest.mark.asyncio
+    async def test_async_and_sync_share_tiers(self):
+        """Values written by aset are visible to get and vice versa."""
+        cache_manager = _fake_redis_cache_manager()
+        frame = _indicator_frame()
+        
+        assert await cache_manager.aset("ohlcv:1m:VCB", frame)
+        cache_manager.set("ohlcv:1m:FPT", 42)
+        
+        assert cache_manager.get("ohlcv:1m:VCB").equals(frame)
+        assert await cache_manager.aget("ohlcv:1m:FPT") == 42
+        
+        # Served by the asyncio Redis client once memory is gone
+        cache_manager._clear_memory()
+        found = await cache_manager.aget_many(["ohlcv:1m:VCB", "ohlcv:1m:FPT", "ohlcv:1m:HPG"])
+        assert set(found) == {"ohlcv:1m:VCB", "ohlcv:1m:FPT"}
+        assert found["ohlcv:1m:VCB"].equals(frame)
+        assert "ohlcv:1m:VCB" in cache_manager._memory_cache
+        assert cache_manager.get_stats()['telemetry']['prefixes']['ohlcv']['hits_by_tier']['redis'] == 2
+        await cache_manager.aclose()
+    
+    @pytest.mark.asyncio
+    async def test_memory_only_and_default(self):
+        """Without Redis the async API uses the memory tier alone."""
+        cache_manager = CacheManager(use_redis=False)
+        
+        assert await cache_manager.aset("key", {"a": 1}, ttl=60)
+        assert await cache_manager.aget("key") == {"a": 1}
+        assert await cache_manager.aget("missing", "default") == "default"
+        assert cache_manager._get_async_redis() is None
+    
+    @pytest.mark.asyncio
+    async def test_async_cached_single_flight(self):
+        """Concurrent awaits of a cached coroutine share one execution."""
+        cache_manager = CacheManager(use_redis=False)
+        calls = []
+        
+        @cached(cache_manager, prefix="test", ttl=60)
+        async def fetch(ticker):
+            calls.append(ticker)
+            await asyncio.sleep(0.05)
+            return f"data:{ticker}"
+        
+        results = await asyncio.gather(*(fetch("VCB") for _ in range(10)))
+        
+        assert results == ["data:VCB"] * 10
+        assert calls == ["VCB"]
+        assert await fetch("VCB") == "data:VCB"
+        assert calls == ["VCB"]
+        
+        fetch.cache_clear()
+        await fetch("VCB")
+        assert calls == ["VCB", "VCB"]
+    
+    @pytest.mark.asyncio
+    async def test_async_compute_error_reaches_waiters(self):
+        """A failing computation raises in every waiter and is not cached."""
+        cache_manager = CacheManager(use_redis=False)
+        
+        async def failing():
+            await asyncio.sleep(0.02)
+            raise ValueError("boom")
+        
+        results = await asyncio.gather(
+            *(cache_manager.aget_or_compute("key", failing) for _ in range(3)),
+            return_exceptions=True
+        )
+        
+        assert all(isinstance(result, ValueError) for result in results)
+        assert await cache_manager.aget("key") is None
+        assert cache_manager._async_inflight == {}
@@ -0,0 +1,104 @@
+import pytest
+import time
+from utils.disk_cache import DiskCache
+from utils.cache_manager import CacheManager
+
+
+class TestDiskCache:
+    """Test cases for the SQLite disk tier."""
+    
+    def test_set_get_delete(self, tmp_path):
+        """Payloads round-trip and can be deleted by key or pattern."""
+        disk = DiskCache(str(tmp_path / "cache.db"))
+        
+        disk.set_many({"ohlcv:1d:VCB": b"a", "ohlcv:1d:FPT": b"bb", "latest_data:VCB": b"c"}, time.time() + 60)
+        
+        assert disk.get("ohlcv:1d:VCB")[0] == b"a"
+        assert set(disk.get_many(["ohlcv:1d:VCB", "ohlcv:1d:FPT", "missing"])) == {"ohlcv:1d:VCB", "ohlcv:1d:FPT"}
+        assert disk.delete_pattern("ohlcv:*") == 2
+        assert disk.delete_many(["latest_data:VCB"]) == 1
+        assert disk.get_stats()['entries'] == 0
+        assert disk.get_stats()['total_size_bytes'] == 0
+    
+    def test_expired_entries(self, tmp_path):
+        """Expired payloads are not returned and are removed by cleanup."""
+        disk = DiskCache(str(tmp_path / "cache.db"))
+        
+        disk.set("old", b"x", time.time() - 1)
+        disk.set("forever", b"y")
+        
+        assert disk.get("old") is None
+        assert disk.get("forever") == (b"y", None)
+        assert disk.cleanup() == 1
+        assert disk.get_stats()['total_size_bytes'] == 1
+    
+    def test_size_cap_evicts_least_recently_used(self, tmp_path):
+        """Writes past max_bytes evict the least recently read entries."""
+        disk = DiskCache(str(tmp_path / "cache.db"), max_bytes=1000)
+        
+        for i in range(5):
+            disk.set(f"key_{i}", b"x" * 200)
+            time.sleep(0.01)
+        disk.get("key_0")
+        disk.set("key_5", b"x" * 200)
+        
+        assert disk.get_stats()['total_size_bytes'] <= 1000
+        assert disk.get("key_0") is not None
+        assert disk.get("key_1") is None
+    
+    def test_persists_across_instances(self, tmp_path):
+        """Entries and generations survive reopening the file."""
+        path = str(tmp_path / "cache.db")
+        disk = DiskCache(path)
+        disk.set("key", b"payload", time.time() + 60)
+        disk.set_generation("historical_data", 3)
+        disk.close()
+        
+        reopened = DiskCache(path)
+        assert reopened.get("key")[0] == b"payload"
+        assert reopened.get_generation("historical_data") == 3
+        assert reopened.get_stats()['total_size_bytes'] == len(b"payload")
+
+
+class TestCacheManagerDiskTier:
+    """Test the disk tier inside CacheManager."""
+    
+    def test_warm_restart_without_redis(self, tmp_path, sample_ohlcv_data):
+        """A new manager on the same file serves frames without recomputing."""
+        import pandas as pd
+        
+        path = str(tmp_path / "cache.db")
+        first = CacheManager(use_redis=False, disk_cache_path=path)
+        first.set("ohlcv:1d:VCB", sample_ohlcv_data, ttl=600)
+        
+        restarted = CacheManager(use_redis=False, disk_cache_path=path)
+        
+        pd.testing.assert_frame_equal(restarted.get("ohlcv:1d:VCB"), sample_ohlcv_data)
+        assert "ohlcv:1d:VCB" in restarted._memory_cache
+        remaining = (restarted._memory_cache["ohlcv:1d:VCB"].expires_at - first._memory_cache["ohlcv:1d:VCB"].expires_at)
+        assert abs(remaining.total_seconds()) < 1
+    
+    def test_namespace_generation_survives_restart(self, tmp_path):
+        """Invalidated namespaces stay invalidated after a restart."""
+        path = str(tmp_path / "cache.db")
+        first = CacheManager(use_redis=False, disk_cache_path=path)
+        old_key = first.namespaced_key("historical_data", "VCB")
+        first.set(old_key, 1)
+        first.invalidate_namespace("historical_data")
+        
+        restarted = CacheManager(use_redis=False, disk_cache_path=path)
+        
+        assert restarted.namespaced_key("historical_data", "VCB") != old_key
+    
+    def test_delete_and_clear_reach_disk(self, tmp_path):
+        """Deletes, patterns and clear() remove disk entries too."""
+        path = str(tmp_path / "cache.db")
+        cache_manager = CacheManager(use_redis=False, disk_cache_path=path)
+        cache_manager.set_many({"a:1": 1, "a:2": 2, "b:1": 3})
+        
+        cache_manager.delete("a:1")
+        cache_manager.delete_pattern("a:*")
+        assert CacheManager(use_redis=False, disk_cache_path=path).get_many(["a:1", "a:2", "b:1"]) == {"b:1": 3}
+        
+        cache_manager.clear()
+        assert cache_manager.get_stats()['disk_cache']['entries'] == 0
@@ -1,4 +1,5 @@
 import pytest
+import time
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
@@ -300,6 +301,237 @@ class TestFiinQuantAdapter:
         # Should stop streaming
         assert not adapter.stream_active
 
+    
+    def test_fetch_historical_data_batch(self, mock_config, sample_ohlcv_data):
+        """Batch fetch issues one API call per chunk and caches frames per ticker."""
+        from utils.cache_manager import CacheManager
+        
+        adapter = FiinQuantAdapter(
+            username=mock_config['fiinquant']['username'],
+            password=mock_config['fiinquant']['password'],
+            batch_size=2
+        )
+        adapter.cache_manager = CacheManager(use_redis=False)
+        adapter.client = Mock()
+        
+        def fetch_trading_data(tickers, **kwargs):
+            frames = [sample_ohlcv_data.assign(ticker=ticker) for ticker in tickers]
+            return Mock(get_data=Mock(return_value=pd.concat(frames, ignore_index=True)))
+        
+        adapter.client.Fetch_Trading_Data.side_effect = fetch_trading_data
+        tickers = ['VIC', 'VHM', 'VCB', 'FPT', 'HPG']
+        
+        with patch.object(adapter, 'login', return_value=True):
+            frames = adapter.fetch_historical_data_batch(tickers, timeframe='15m', period=100)
+            
+            assert set(frames) == set(tickers)
+            assert adapter.client.Fetch_Trading_Data.call_count == 3
+            assert (frames['VCB']['ticker'] == 'VCB').all()
+            assert len(frames['VCB']) == len(sample_ohlcv_data)
+            
+            # Later single-ticker and batch lookups are served from the cache
+            single = adapter.fetch_historical_data(['FPT'], timeframe='15m', period=100)
+            again = adapter.fetch_historical_data_batch(tickers, timeframe='15m', period=100)
+        
+        assert single.equals(frames['FPT'])
+        assert set(again) == set(tickers)
+        assert adapter.client.Fetch_Trading_Data.call_count == 3
+    
+    def test_single_and_batch_fetches_share_frames(self, mock_config, sample_ohlcv_data):
+        """A single-ticker fetch caches the same frame shape the batch path reads."""
+        from utils.cache_manager import CacheManager
+        
+        adapter = FiinQuantAdapter(
+            username=mock_config['fiinquant']['username'],
+            password=mock_config['fiinquant']['password']
+        )
+        adapter.cache_manager = CacheManager(use_redis=False)
+        adapter.client = Mock()
+        raw = sample_ohlcv_data.assign(ticker='FPT').set_index(sample_ohlcv_data.index + 1000)
+        adapter.client.Fetch_Trading_Data.return_value = Mock(get_data=Mock(return_value=raw))
+        
+        with patch.object(adapter, 'login', return_value=True):
+            single = adapter.fetch_historical_data(['FPT'], timeframe='15m', period=100)
+            batch = adapter.fetch_historical_data_batch(['FPT'], timeframe='15m', period=100)
+        
+        assert adapter.client.Fetch_Trading_Data.call_count == 1
+        assert single.index.equals(pd.RangeIndex(len(raw)))
+        assert batch['FPT'].equals(single)
+    
+    def test_fetch_historical_data_batch_chunk_failure(self, mock_config, sample_ohlcv_data):
+        """A failed chunk only drops its own tickers."""
+        adapter = FiinQuantAdapter(
+            username=mock_config['fiinquant']['username'],
+            password=mock_config['fiinquant']['password'],
+            batch_size=2
+        )
+        adapter.cache_manager = None
+        adapter.client = Mock()
+        
+        def fetch_trading_data(tickers, **kwargs):
+            if 'VCB' in tickers:
+                raise Exception("API error")
+            frames = [sample_ohlcv_data.assign(ticker=ticker) for ticker in tickers]
+            return Mock(get_data=Mock(return_value=pd.concat(frames, ignore_index=True)))
+        
+        adapter.client.Fetch_Trading_Data.side_effect = fetch_trading_data
+        
+        with patch.object(adapter, 'login', return_value=True):
+            frames = adapter.fetch_historical_data_batch(['VIC', 'VHM', 'VCB', 'FPT', 'HPG'])
+        
+        assert set(frames) == {'VIC', 'VHM', 'HPG'}
+
+    
+    def test_fetch_historical_data_batch_with_bar_store(self, mock_config, tmp_path):
+        """With a bar store, refreshes only request bars from the last stored date."""
+        adapter = FiinQuantAdapter(
+            username=mock_config['fiinquant']['username'],
+            password=mock_config['fiinquant']['password'],
+            bar_store_path=str(tmp_path / "bars")
+        )
+        adapter.cache_manager = None
+        adapter.client = Mock()
+        history = pd.date_range('2024-01-01', periods=60, freq='D')
+        
+        def fetch_trading_data(tickers, **kwargs):
+            dates = history[:50] if 'period' in kwargs else history[history >= kwargs['from_date']]
+            frames = [
+                pd.DataFrame({'ticker': ticker, 'timestamp': dates, 'open': 1.0, 'high': 2.0,
+                              'low': 0.5, 'close': 1.5, 'volume': 1000})
+                for ticker in tickers
+            ]
+            return Mock(get_data=Mock(return_value=pd.concat(frames, ignore_index=True)))
+        
+        adapter.client.Fetch_Trading_Data.side_effect = fetch_trading_data
+        
+        with patch.object(adapter, 'login', return_value=True):
+            first = adapter.fetch_historical_data_batch(['VIC', 'VCB'], timeframe='1d', period=30)
+            second = adapter.fetch_historical_data_batch(['VIC', 'VCB'], timeframe='1d', period=30)
+        
+        assert len(first['VIC']) == 30
+        assert first['VIC']['timestamp'].iloc[-1] == history[49]
+        assert second['VCB']['timestamp'].iloc[-1] == history[-1]
+        assert len(adapter.bar_store.read('VCB', '1d')) == 60
+        
+        refresh_kwargs = adapter.client.Fetch_Trading_Data.call_args_list[1].kwargs
+        assert refresh_kwargs['from_date'] == history[49].strftime('%Y-%m-%d')
+        assert 'period' not in refresh_kwargs
+        assert adapter._get_latest_data_date(['VIC'], '1d') == history[-1].strftime('%Y-%m-%d')
+    
+    def test_concurrent_fetches_are_rate_limited(self, mock_config, sample_ohlcv_data):
+        """Concurrent batch fetches share the fetch_trading_data concurrency limit and retry 429s."""
+        import threading
+        from concurrent.futures import ThreadPoolExecutor
+        
+        adapter = FiinQuantAdapter(
+            username=mock_config['fiinquant']['username'],
+            password=mock_config['fiinquant']['password'],
+            rate_limits={'fetch_trading_data': {'rate': 100.0, 'burst': 5, 'max_concurrent': 2,
+                                                'backoff_base': 0.01, 'backoff_max': 0.02}}
+        )
+        adapter.cache_manager = None
+        adapter.client = Mock()
+        lock = threading.Lock()
+        state = {'calls': 0, 'in_flight': 0, 'max_in_flight': 0}
+        
+        def fetch_trading_data(tickers, **kwargs):
+            with lock:
+                state['calls'] += 1
+                state['in_flight'] += 1
+                state['max_in_flight'] = max(state['max_in_flight'], state['in_flight'])
+                throttled = state['calls'] == 1
+            try:
+                time.sleep(0.01)
+                if throttled:
+                    raise Exception("429 Too Many Requests")
+                return Mock(get_data=Mock(return_value=sample_ohlcv_data.assign(ticker=tickers[0])))
+            finally:
+                with lock:
+                    state['in_flight'] -= 1
+        
+        adapter.client.Fetch_Trading_Data.side_effect = fetch_trading_data
+        tickers = [f"T{i}" for i in range(12)]
+        
+        with patch.object(adapter, 'login', return_value=True):
+            with ThreadPoolExecutor(max_workers=12) as pool:
+                results = list(pool.map(lambda t: adapter.fetch_historical_data_batch([t]), tickers))
+        
+        assert all(t in result for t, result in zip(tickers, results))
+        assert state['max_in_flight'] <= 2
+        
+        stats = adapter.health_check()['rate_limits']['fetch_trading_data']
+        assert stats['calls'] == 13
+        assert stats['rate_limited'] == 1
+    
+    @pytest.mark.asyncio
+    async def test_afetch_many_times_out_hung_chunk(self, mock_config, sample_ohlcv_data):
+        """A hung chunk times out without holding back the other chunks."""
+        import asyncio
+        import threading
+        
+        adapter = FiinQuantAdapter(
+            username=mock_config['fiinquant']['username'],
+            password=mock_config['fiinquant']['password'],
+            batch_size=2,
+            io_workers=4
+        )
+        adapter.cache_manager = None
+        adapter.client = Mock()
+        release = threading.Event()
+        
+        def fetch_trading_data(tickers, **kwargs):
+            if 'HUNG' in tickers:
+                release.wait(5)
+            frames = [sample_ohlcv_data.assign(ticker=ticker) for ticker in tickers]
+            return Mock(get_data=Mock(return_value=pd.concat(frames, ignore_index=True)))
+        
+        adapter.client.Fetch_Trading_Data.side_effect = fetch_trading_data
+        
+        try:
+            with patch.object(adapter, 'login', return_value=True):
+                started = time.monotonic()
+                frames = await adapter.afetch_many(['VIC', 'VHM', 'HUNG', 'FPT', 'HPG'], timeout=0.3)
+                elapsed = time.monotonic() - started
+        finally:
+            release.set()
+            adapter.close()
+        
+        assert set(frames) == {'VIC', 'VHM', 'HPG'}
+        assert elapsed < 2
+        assert adapter.io_timeouts == 1
+    
+    @pytest.mark.asyncio
+    async def test_async_api_runs_on_shared_executor(self, mock_config, sample_ohlcv_data):
+        """alogin and afetch_historical_data run off the loop on one long-lived executor."""
+        import threading
+        
+        adapter = FiinQuantAdapter(
+            username=mock_config['fiinquant']['username'],
+            password=mock_config['fiinquant']['password']
+        )
+        adapter.cache_manager = None
+        adapter.client = Mock()
+        threads = []
+        
+        def fetch_trading_data(tickers, **kwargs):
+            threads.append(threading.current_thread().name)
+            return Mock(get_data=Mock(return_value=sample_ohlcv_data))
+        
+        adapter.client.Fetch_Trading_Data.side_effect = fetch_trading_data
+        
+        with patch.object(adapter, 'login', return_value=True):
+            assert await adapter.alogin() is True
+            executor = adapter._io_executor
+            data = await adapter.afetch_historical_data(['VCB'], use_cache=False)
+            await adapter.afetch_historical_data(['FPT'], use_cache=False)
+        
+        assert data.equals(sample_ohlcv_data)
+        assert adapter._io_executor is executor
+        assert all(name.startswith('fiinquant-io') for name in threads)
+        
+        adapter.close()
+        assert adapter._io_executor is None
+
 
 @pytest.mark.integration
 class TestFiinQuantAdapterIntegration:
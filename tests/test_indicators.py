@@ -0,0 +1,432 @@
+import json
+import time
+import pytest
+import pandas as pd
+import numpy as np
+from utils.indicators import TechnicalIndicators, StreamingIndicators
+
+
+def _reference_engulfing(open_prices: pd.Series, close: pd.Series,
+                         min_body_ratio: float = 0.5) -> np.ndarray:
+    """Row-by-row engulfing detection (the original implementation)."""
+    signals = np.full(len(close), 0)
+    for i in range(1, len(close)):
+        prev_open, prev_close = open_prices.iloc[i-1], close.iloc[i-1]
+        curr_open, curr_close = open_prices.iloc[i], close.iloc[i]
+        prev_body = abs(prev_close - prev_open)
+        curr_body = abs(curr_close - curr_open)
+        if curr_body < min_body_ratio * prev_body:
+            continue
+        if (prev_close < prev_open and curr_close > curr_open and
+                curr_close > prev_open and curr_open < prev_close):
+            signals[i] = 1
+        elif (prev_close > prev_open and curr_close < curr_open and
+              curr_close < prev_open and curr_open > prev_close):
+            signals[i] = -1
+    return signals
+
+
+def _reference_volume_analysis(volume: pd.Series, avg_period: int = 20,
+                               anomaly_threshold: float = 1.0):
+    """Row-by-row volume average and anomaly flags (the original implementation)."""
+    values = volume.to_numpy(dtype=float)
+    if len(volume) < avg_period:
+        avg_volume = np.full(len(volume), np.nan)
+        for i in range(len(volume)):
+            start_idx = max(0, i - avg_period + 1)
+            avg_volume[i] = volume.iloc[start_idx:i+1].mean()
+    else:
+        avg_volume = np.full(len(volume), np.nan)
+        for i in range(avg_period - 1, len(volume)):
+            avg_volume[i] = values[i - avg_period + 1:i + 1].mean()
+    volume_anomaly = np.full(len(volume), 0)
+    for i in range(len(volume)):
+        if not np.isnan(avg_volume[i]) and avg_volume[i] > 0:
+            if volume.iloc[i] > anomaly_threshold * avg_volume[i]:
+                volume_anomaly[i] = 1
+    return avg_volume, volume_anomaly
+
+
+def _random_ohlcv(n_bars: int, seed: int = 7) -> pd.DataFrame:
+    """Random walk OHLCV frame with plenty of engulfing candles."""
+    rng = np.random.default_rng(seed)
+    close = 20000 + np.cumsum(rng.normal(0, 150, n_bars))
+    open_prices = close + rng.normal(0, 200, n_bars)
+    high = np.maximum(open_prices, close) + rng.uniform(0, 100, n_bars)
+    low = np.minimum(open_prices, close) - rng.uniform(0, 100, n_bars)
+    volume = rng.integers(10000, 2000000, n_bars)
+    return pd.DataFrame({
+        'open': open_prices.round(-1),
+        'high': high.round(-1),
+        'low': low.round(-1),
+        'close': close.round(-1),
+        'volume': volume
+    })
+
+
+class TestEngulfingPattern:
+    """Test cases for the array-based engulfing detection."""
+
+    @pytest.mark.parametrize('min_body_ratio', [0.0, 0.5, 1.0, 2.0])
+    def test_matches_reference_implementation(self, min_body_ratio):
+        """Signals are identical to the row-by-row implementation."""
+        df = _random_ohlcv(2000)
+
+        result = TechnicalIndicators.engulfing_pattern(
+            df['open'], df['high'], df['low'], df['close'],
+            min_body_ratio=min_body_ratio
+        )
+        expected = _reference_engulfing(df['open'], df['close'], min_body_ratio)
+
+        np.testing.assert_array_equal(result.signals, expected)
+        np.testing.assert_array_equal(result.values, expected.astype(float))
+        assert result.signals.dtype == expected.dtype
+        assert result.metadata['bullish_count'] == int(np.sum(expected == 1))
+        assert result.metadata['bearish_count'] == int(np.sum(expected == -1))
+        assert result.metadata['last_signal'] == expected[-1]
+
+    def test_known_patterns(self):
+        """Detect a textbook bullish and bearish engulfing pair."""
+        open_prices = pd.Series([105.0, 99.0, 96.0, 108.0])
+        close = pd.Series([100.0, 106.0, 104.0, 95.0])
+
+        result = TechnicalIndicators.engulfing_pattern(
+            open_prices, close, close, close
+        )
+
+        assert list(result.signals) == [0, 1, 0, -1]
+        assert result.metadata['recent_bullish_engulfing']
+        assert result.metadata['recent_bearish_engulfing']
+
+    def test_nan_and_short_input(self):
+        """NaN candles never produce a signal and short input is handled."""
+        df = _random_ohlcv(50)
+        df.loc[10:12, ['open', 'close']] = np.nan
+
+        result = TechnicalIndicators.engulfing_pattern(
+            df['open'], df['high'], df['low'], df['close']
+        )
+        expected = _reference_engulfing(df['open'], df['close'])
+        np.testing.assert_array_equal(result.signals, expected)
+
+        single = TechnicalIndicators.engulfing_pattern(
+            df['open'][:1], df['high'][:1], df['low'][:1], df['close'][:1]
+        )
+        assert list(single.signals) == [0]
+
+    @pytest.mark.benchmark
+    @pytest.mark.parametrize('n_bars', [100, 10_000, 1_000_000])
+    def test_engulfing_performance_benchmark(self, n_bars):
+        """Benchmark the array kernel against the row-by-row loop."""
+        df = _random_ohlcv(n_bars)
+
+        start_time = time.time()
+        result = TechnicalIndicators.engulfing_pattern(
+            df['open'], df['high'], df['low'], df['close']
+        )
+        vectorized_time = time.time() - start_time
+
+        # The loop costs ~10us per bar, sample it on 1M bars
+        sample = min(n_bars, 20_000)
+        start_time = time.time()
+        expected = _reference_engulfing(df['open'][:sample], df['close'][:sample])
+        loop_time = (time.time() - start_time) * n_bars / sample
+
+        np.testing.assert_array_equal(result.signals[:sample], expected)
+
+        if n_bars >= 10_000:
+            assert vectorized_time < loop_time
+
+
+class TestVolumeAnalysis:
+    """Test cases for the array-based volume analysis."""
+
+    @pytest.mark.parametrize('n_bars', [1, 7, 19, 20, 500])
+    @pytest.mark.parametrize('anomaly_threshold', [1.0, 1.5])
+    def test_matches_reference_implementation(self, n_bars, anomaly_threshold):
+        """Averages and anomaly flags match the row-by-row implementation."""
+        volume = _random_ohlcv(n_bars)['volume'].astype(float)
+
+        result = TechnicalIndicators.volume_analysis(
+            volume, avg_period=20, anomaly_threshold=anomaly_threshold
+        )
+        expected_avg, expected_anomaly = _reference_volume_analysis(
+            volume, 20, anomaly_threshold
+        )
+
+        np.testing.assert_allclose(result.values, expected_avg, rtol=1e-12)
+        np.testing.assert_array_equal(result.signals, expected_anomaly)
+        assert result.metadata['volume_anomaly_count'] == expected_anomaly.sum()
+        assert result.metadata['current_anomaly'] == bool(expected_anomaly[-1])
+
+    def test_integer_volume(self):
+        """Integer volume columns are accepted by the talib path."""
+        volume = _random_ohlcv(100)['volume']
+        assert volume.dtype.kind == 'i'
+
+        result = TechnicalIndicators.volume_analysis(volume)
+        expected_avg, expected_anomaly = _reference_volume_analysis(volume)
+
+        np.testing.assert_allclose(result.values, expected_avg, rtol=1e-12)
+        np.testing.assert_array_equal(result.signals, expected_anomaly)
+
+    def test_short_history_with_gaps(self):
+        """Short-history averages skip missing volume like Series.mean."""
+        volume = pd.Series([1000.0, np.nan, 3000.0, 500.0, 8000.0])
+
+        result = TechnicalIndicators.volume_analysis(volume, avg_period=20)
+        expected_avg, expected_anomaly = _reference_volume_analysis(volume)
+
+        np.testing.assert_allclose(result.values, expected_avg)
+        np.testing.assert_array_equal(result.signals, expected_anomaly)
+
+
+class TestCalculateAllIndicators:
+    """Test cases for the fused calculate_all_indicators kernel."""
+
+    def test_matches_per_indicator_results(self):
+        """Fused columns agree with the individual indicator functions."""
+        df = _random_ohlcv(300)
+        df['volume'] = df['volume'].astype(float)
+        df.index = pd.date_range('2024-01-01 09:00', periods=len(df), freq='15min')
+
+        result = TechnicalIndicators.calculate_all_indicators(df)
+
+        rsi = TechnicalIndicators.rsi(df['close'])
+        psar = TechnicalIndicators.parabolic_sar(df['high'], df['low'], df['close'])
+        engulfing = TechnicalIndicators.engulfing_pattern(
+            df['open'], df['high'], df['low'], df['close']
+        )
+        volume = TechnicalIndicators.volume_analysis(df['volume'])
+
+        assert list(result.columns[:5]) == ['open', 'high', 'low', 'close', 'volume']
+        assert result.index.equals(df.index)
+        np.testing.assert_array_equal(result['rsi'], rsi.values)
+        np.testing.assert_array_equal(result['rsi_signal'], rsi.signals)
+        np.testing.assert_array_equal(result['psar'], psar.values)
+        np.testing.assert_array_equal(result['psar_trend'], psar.signals)
+        np.testing.assert_array_equal(result['engulfing_signal'], engulfing.values)
+        np.testing.assert_array_equal(result['avg_volume_20'], volume.values)
+        np.testing.assert_array_equal(result['volume_anomaly'], volume.signals)
+
+        # Derived columns, row by row
+        body = (df['close'] - df['open']).abs().to_numpy()
+        for i in range(len(df)):
+            window = engulfing.values[max(0, i - 2):i + 1]
+            assert result['engulfing_in_3_candles'].iloc[i] == int(np.any(window == 1))
+            ratio = body[i] / body[i - 1] if i > 0 and body[i - 1] > 0 else 0.0
+            assert result['engulfing_body_size_ratio'].iloc[i] == ratio
+            rsi_value = rsi.values[i]
+            state = ('trending_up' if rsi_value > 50 else
+                     'trending_down' if rsi_value < 50 else 'neutral')
+            assert result['rsi_state'].iloc[i] == state
+
+    def test_as_arrays_matches_dataframe(self):
+        """The dict-of-arrays mode carries the same columns and values."""
+        df = _random_ohlcv(120)
+
+        frame = TechnicalIndicators.calculate_all_indicators(df)
+        arrays = TechnicalIndicators.calculate_all_indicators(df, as_arrays=True)
+
+        assert list(arrays) == list(frame.columns)
+        for column, values in arrays.items():
+            np.testing.assert_array_equal(values, frame[column].to_numpy())
+
+    def test_does_not_modify_input(self):
+        """The input frame is left untouched."""
+        df = _random_ohlcv(60)
+        snapshot = df.copy()
+
+        TechnicalIndicators.calculate_all_indicators(df)
+
+        pd.testing.assert_frame_equal(df, snapshot)
+
+    def test_missing_columns(self):
+        """Missing OHLCV columns raise ValueError."""
+        df = _random_ohlcv(30).drop(columns=['volume'])
+
+        with pytest.raises(ValueError, match='volume'):
+            TechnicalIndicators.calculate_all_indicators(df)
+
+
+def _assert_row_matches(row: dict, expected: pd.Series):
+    """Compare a streaming row with a calculate_all_indicators row."""
+    for column, value in expected.items():
+        if isinstance(value, str):
+            assert row[column] == value, column
+        else:
+            np.testing.assert_allclose(row[column], value, rtol=1e-9,
+                                       err_msg=column)
+
+
+class TestStreamingIndicators:
+    """Test cases for the O(1) streaming indicator engine."""
+
+    def test_matches_batch_after_warm_up(self):
+        """Streaming rows equal the batch columns once the windows are full."""
+        df = _random_ohlcv(600)
+        batch = TechnicalIndicators.calculate_all_indicators(df)
+
+        engine = StreamingIndicators()
+        rows = [engine.update(*bar) for bar in
+                df[['open', 'high', 'low', 'close', 'volume']].to_numpy(dtype=float)]
+
+        for i in range(19, len(df)):
+            _assert_row_matches(rows[i], batch.iloc[i])
+
+    @pytest.mark.parametrize('n_bars', [1, 2, 3, 10, 15, 19, 40])
+    def test_warm_up_rows_match_batch_on_prefix(self, n_bars):
+        """Early rows equal the last row of the batch run on the same prefix."""
+        df = _random_ohlcv(n_bars, seed=n_bars)
+
+        engine = StreamingIndicators()
+        row = engine.update_many(df)
+        expected = TechnicalIndicators.calculate_all_indicators(df).iloc[-1]
+
+        _assert_row_matches(row, expected)
+
+    def test_psar_keeps_full_history(self):
+        """PSAR after many bars is exact, not limited to a lookback window."""
+        df = _random_ohlcv(3000, seed=11)
+        engine = StreamingIndicators.from_history(df.iloc[:2990])
+
+        for i in range(2990, 3000):
+            row = engine.update(*df.iloc[i][['open', 'high', 'low', 'close', 'volume']])
+
+        expected = TechnicalIndicators.calculate_all_indicators(df).iloc[-1]
+        assert row['psar'] == pytest.approx(expected['psar'], rel=1e-12)
+        assert row['rsi'] == pytest.approx(expected['rsi'], rel=1e-9)
+
+    def test_preview_does_not_commit(self):
+        """Previewing a forming bar leaves the state untouched."""
+        df = _random_ohlcv(100)
+        engine = StreamingIndicators.from_history(df.iloc[:99])
+        last = df.iloc[99][['open', 'high', 'low', 'close', 'volume']]
+
+        previewed = engine.preview(*last)
+        engine.preview(last['open'], last['high'] * 2, last['low'], last['close'], 1)
+        committed = engine.update(*last)
+
+        assert previewed == committed
+        assert engine.bar_count == 100
+
+    def test_state_round_trip(self):
+        """An engine restored from JSON continues exactly like the original."""
+        df = _random_ohlcv(300, seed=5)
+        original = StreamingIndicators.from_history(df.iloc[:250])
+        restored = StreamingIndicators.from_state(json.loads(json.dumps(original.to_state())))
+
+        for bar in df.iloc[250:][['open', 'high', 'low', 'close', 'volume']].to_numpy(dtype=float):
+            expected = original.update(*bar)
+            row = restored.update(*bar)
+            _assert_row_matches(row, pd.Series(expected))
+
+        assert restored.to_state() == original.to_state()
+
+    def test_catch_up_applies_only_newer_bars(self):
+        """catch_up() skips bars already applied and refuses histories with a gap."""
+        df = _random_ohlcv(300, seed=9)
+        df['timestamp'] = pd.date_range('2024-01-02 09:00', periods=300, freq='15min')
+        full = StreamingIndicators.from_history(df)
+
+        engine = StreamingIndicators.from_history(df.iloc[:200])
+        assert engine.last_timestamp == df['timestamp'].iloc[199]
+        assert engine.catch_up(df.iloc[150:]) == 100
+        assert engine.to_state() == full.to_state()
+
+        stale = StreamingIndicators.from_history(df.iloc[:200])
+        assert stale.catch_up(df.iloc[250:]) is None
+        assert StreamingIndicators().catch_up(df) is None
+
+    def test_incremental_matches_full_calculation(self):
+        """Incremental mode carries PSAR across the whole existing history."""
+        df = _random_ohlcv(400)
+        existing = TechnicalIndicators.calculate_all_indicators(df.iloc[:390])
+
+        result = TechnicalIndicators.calculate_all_indicators(
+            df.iloc[390:], incremental=True, existing_df=existing
+        )
+        full = TechnicalIndicators.calculate_all_indicators(df)
+
+        assert len(result) == len(df)
+        pd.testing.assert_frame_equal(result.iloc[390:], full.iloc[390:])
+
+
+class TestPanelIndicators:
+    """Test cases for the multi-ticker panel calculation."""
+
+    def test_rows_match_single_ticker_results(self):
+        """Each panel row equals the single-ticker kernel, any history length."""
+        history_lengths = [1, 2, 5, 14, 15, 16, 19, 20, 21, 60, 200]
+        frames = {f"T{i}": _random_ohlcv(n, seed=i)
+                  for i, n in enumerate(history_lengths)}
+
+        tickers, panel, lengths = TechnicalIndicators.stack_panel(frames)
+        result = TechnicalIndicators.calculate_panel_indicators(
+            panel['open'], panel['high'], panel['low'], panel['close'],
+            panel['volume'], lengths=lengths
+        )
+
+        assert tickers == list(frames)
+        assert list(lengths) == history_lengths
+        assert result['rsi'].shape == (len(frames), 200)
+
+        for row, ticker in enumerate(tickers):
+            length = lengths[row]
+            expected = TechnicalIndicators.calculate_all_indicators(
+                frames[ticker], as_arrays=True
+            )
+            assert result['valid'][row].sum() == length
+            for column, values in result.items():
+                if column == 'valid':
+                    continue
+                actual = values[row, -length:]
+                if actual.dtype == object:
+                    assert list(actual) == list(expected[column]), column
+                else:
+                    np.testing.assert_allclose(
+                        actual.astype(float), expected[column].astype(float),
+                        rtol=1e-12, err_msg=f"{ticker} {column}"
+                    )
+
+    def test_lengths_inferred_from_padding(self):
+        """Without explicit lengths the NaN padding marks missing history."""
+        frames = {'A': _random_ohlcv(30, seed=1), 'B': _random_ohlcv(80, seed=2)}
+        tickers, panel, lengths = TechnicalIndicators.stack_panel(frames)
+        columns = [panel[c] for c in ['open', 'high', 'low', 'close', 'volume']]
+
+        explicit = TechnicalIndicators.calculate_panel_indicators(*columns, lengths=lengths)
+        inferred = TechnicalIndicators.calculate_panel_indicators(*columns)
+
+        for column in ['rsi', 'psar', 'avg_volume_20', 'volume_anomaly', 'valid']:
+            np.testing.assert_array_equal(explicit[column], inferred[column])
+
+    def test_max_bars_truncates_history(self):
+        """max_bars keeps only the most recent bars of each ticker."""
+        frames = {'A': _random_ohlcv(300, seed=3), 'B': _random_ohlcv(40, seed=4)}
+
+        tickers, panel, lengths = TechnicalIndicators.stack_panel(frames, max_bars=100)
+
+        assert list(lengths) == [100, 40]
+        np.testing.assert_array_equal(panel['close'][0], frames['A']['close'].to_numpy()[-100:])
+        assert np.isnan(panel['close'][1, :60]).all()
+
+    @pytest.mark.benchmark
+    def test_panel_performance_benchmark(self):
+        """Benchmark one panel call against per-ticker calculation."""
+        frames = {f"T{i}": _random_ohlcv(200, seed=i) for i in range(1600)}
+
+        start_time = time.time()
+        tickers, panel, lengths = TechnicalIndicators.stack_panel(frames)
+        TechnicalIndicators.calculate_panel_indicators(
+            panel['open'], panel['high'], panel['low'], panel['close'],
+            panel['volume'], lengths=lengths
+        )
+        panel_time = time.time() - start_time
+
+        start_time = time.time()
+        for df in frames.values():
+            TechnicalIndicators.calculate_all_indicators(df)
+        per_ticker_time = time.time() - start_time
+
+        assert panel_time < per_ticker_time
@@ -0,0 +1,133 @@
+import pytest
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import Mock
+from utils.rate_governor import RateGovernor, TokenBucket, is_rate_limit_error
+
+
+class MockClient:
+    """Mock API client tracking concurrency and optionally answering 429."""
+    
+    def __init__(self, latency=0.01, fail_first=0):
+        self.latency = latency
+        self.fail_first = fail_first
+        self.calls = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+    
+    def fetch(self, ticker):
+        with self._lock:
+            self.calls.append(time.monotonic())
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            fail = len(self.calls) <= self.fail_first
+        try:
+            time.sleep(self.latency)
+            if fail:
+                raise Exception("HTTP 429 Too Many Requests")
+            return ticker
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+
+def _limits(**overrides):
+    return {'default': {'rate': 50.0, 'burst': 5, 'max_concurrent': 3, 'max_retries': 3,
+                        'backoff_base': 0.01, 'backoff_max': 0.05, 'min_rate': 1.0, **overrides}}
+
+
+class TestRateGovernor:
+    """Test cases for the per-endpoint rate governor."""
+    
+    def test_token_bucket_waits_after_burst(self):
+        """The burst is free, later tokens are spaced at the refill rate."""
+        bucket = TokenBucket(rate=10.0, burst=2)
+        assert bucket.reserve() == 0.0
+        assert bucket.reserve() == 0.0
+        assert bucket.reserve() == pytest.approx(0.1, abs=0.01)
+        assert bucket.reserve() == pytest.approx(0.2, abs=0.01)
+    
+    def test_rate_limit_error_detection(self):
+        """429-style errors are recognized by status code or message."""
+        error = Exception("bad gateway")
+        error.status_code = 429
+        assert is_rate_limit_error(error)
+        assert is_rate_limit_error(Exception("Rate limit exceeded"))
+        assert not is_rate_limit_error(Exception("invalid ticker"))
+    
+    def test_load_respects_rate_and_concurrency(self):
+        """Many threads bursting calls stay within the rate and concurrency limits."""
+        client = MockClient(latency=0.01)
+        governor = RateGovernor(_limits())
+        
+        with ThreadPoolExecutor(max_workers=20) as pool:
+            results = list(pool.map(lambda i: governor.call('fetch', client.fetch, f"T{i}"), range(30)))
+        
+        assert results == [f"T{i}" for i in range(30)]
+        assert client.max_in_flight <= 3
+        # 5 burst tokens, then 25 more at 50/s take at least ~0.5s
+        assert client.calls[-1] - client.calls[0] >= 0.45
+        
+        stats = governor.get_stats()['fetch']
+        assert stats['calls'] == 30
+        assert stats['max_in_flight'] <= 3
+        assert stats['queue_delay_ms']['max'] > 0
+    
+    def test_rate_limited_calls_back_off_and_recover(self):
+        """429s lower the rate and are retried until the call succeeds."""
+        client = MockClient(latency=0, fail_first=2)
+        governor = RateGovernor(_limits())
+        
+        assert governor.call('fetch', client.fetch, 'VCB') == 'VCB'
+        assert len(client.calls) == 3
+        
+        stats = governor.get_stats()['fetch']
+        assert stats['rate_limited'] == 2
+        assert stats['retries'] == 2
+        assert stats['rate'] == pytest.approx(12.5 + 5.0)  # Halved twice, one success step back
+    
+    def test_non_rate_limit_errors_are_not_retried(self):
+        """Other failures propagate immediately."""
+        func = Mock(side_effect=ValueError("invalid ticker"))
+        governor = RateGovernor(_limits())
+        
+        with pytest.raises(ValueError):
+            governor.call('fetch', func)
+        assert func.call_count == 1
+        assert governor.get_stats()['fetch']['errors'] == 1
+    
+    def test_retries_exhausted(self):
+        """Persistent 429s raise after max_retries retries."""
+        client = MockClient(latency=0, fail_first=100)
+        governor = RateGovernor(_limits(max_retries=2))
+        
+        with pytest.raises(Exception, match="429"):
+            governor.call('fetch', client.fetch, 'VCB')
+        assert len(client.calls) == 3
+    
+    def test_endpoint_settings_override_default(self):
+        """Endpoint entries override the default entry."""
+        governor = RateGovernor({**_limits(), 'login': {'rate': 0.5, 'max_concurrent': 1}})
+        assert governor.endpoint('login').configured_rate == 0.5
+        assert governor.endpoint('login').max_concurrent == 1
+        assert governor.endpoint('fetch').configured_rate == 50.0
+    
+    @pytest.mark.asyncio
+    async def test_async_calls_share_limits(self):
+        """Coroutines and threads share the same concurrency slots."""
+        client = MockClient(latency=0.02)
+        governor = RateGovernor(_limits(rate=200.0, burst=50))
+        
+        thread = threading.Thread(
+            target=lambda: [governor.call('fetch', client.fetch, 'sync') for _ in range(5)]
+        )
+        thread.start()
+        results = await asyncio.gather(*(governor.acall('fetch', client.fetch, f"T{i}") for i in range(15)))
+        await asyncio.to_thread(thread.join)
+        
+        assert results == [f"T{i}" for i in range(15)]
+        assert len(client.calls) == 20
+        assert client.max_in_flight <= 3
@@ -0,0 +1,130 @@
+import pytest
+import sqlite3
+import time
+import numpy as np
+import pandas as pd
+from utils.bar_builder import BarBuilder
+from utils.data_source import create_data_source
+from utils.replay_source import ReplayDataSource
+
+
+def _bars(ticker, days=3, bars_per_day=8, base=100.0):
+    """15-minute bars from 09:15 on consecutive days."""
+    frames = []
+    for day in range(days):
+        timestamps = pd.date_range(f"2024-01-0{day + 2} 09:15", periods=bars_per_day, freq='15min')
+        opens = base + day * 10 + np.arange(bars_per_day, dtype=float)
+        frames.append(pd.DataFrame({
+            'ticker': ticker,
+            'timestamp': timestamps,
+            'open': opens,
+            'high': opens + 2,
+            'low': opens - 1,
+            'close': opens + np.where(np.arange(bars_per_day) % 2, -0.5, 1.0),
+            'volume': 1000 + np.arange(bars_per_day, dtype=np.int64) * 100
+        }))
+    return pd.concat(frames, ignore_index=True)
+
+
+@pytest.fixture
+def bar_file(tmp_path):
+    path = tmp_path / "bars.csv"
+    pd.concat([_bars('VCB'), _bars('FPT', base=50.0)]).to_csv(path, index=False)
+    return path
+
+
+class TestReplayDataSource:
+    """Test cases for the offline replay data source."""
+    
+    def test_fetch_only_sees_bars_before_replay_clock(self, bar_file):
+        """By default the clock starts on the last day, so fetches stop before it."""
+        source = ReplayDataSource(bar_file)
+        assert source.login()
+        
+        frames = source.fetch_historical_data_batch(['VCB', 'FPT', 'XXX'], timeframe='15m', period=10)
+        assert set(frames) == {'VCB', 'FPT'}
+        assert len(frames['VCB']) == 10
+        assert frames['VCB']['timestamp'].iloc[-1] == pd.Timestamp('2024-01-03 11:00')
+        assert list(frames['VCB'].columns) == ['ticker', 'timestamp', 'open', 'high', 'low', 'close', 'volume']
+        
+        hourly = source.fetch_historical_data(['VCB'], timeframe='1h', period=100)
+        day_one = hourly[hourly['timestamp'].dt.day == 2]
+        assert list(day_one['timestamp'].dt.hour) == [9, 10, 11]
+        assert day_one['volume'].iloc[0] == 1000 + 1100 + 1200  # 09:15, 09:30, 09:45
+        
+        ranged = source.fetch_historical_data(['FPT'], from_date='2024-01-02', to_date='2024-01-02')
+        assert len(ranged) == 8
+    
+    def test_directory_and_sqlite_sources(self, tmp_path):
+        """Per-ticker files and the market_data table load the same bars."""
+        directory = tmp_path / "bars"
+        directory.mkdir()
+        _bars('HPG').drop(columns='ticker').to_csv(directory / "hpg.csv", index=False)
+        
+        db_path = tmp_path / "trading.db"
+        db_frame = _bars('HPG').rename(columns={'open': 'open_price', 'high': 'high_price',
+                                                'low': 'low_price', 'close': 'close_price'})
+        db_frame['timestamp'] = db_frame['timestamp'].astype(str)
+        with sqlite3.connect(db_path) as conn:
+            db_frame.assign(timeframe='15m').to_sql('market_data', conn, index=False)
+        
+        from_dir = ReplayDataSource(directory, start='2024-01-05').fetch_historical_data_batch(['HPG'], period=100)
+        from_db = ReplayDataSource(db_path, start='2024-01-05').fetch_historical_data_batch(['HPG'], period=100)
+        pd.testing.assert_frame_equal(from_dir['HPG'], from_db['HPG'], check_dtype=False)
+        assert len(from_db['HPG']) == 24
+    
+    def test_stream_rebuilds_bars(self, bar_file):
+        """Replayed ticks aggregate back into the source bars, then become visible to fetches."""
+        source = ReplayDataSource(bar_file)
+        built = []
+        builder = BarBuilder('15m', built.append, emit_partial=False)
+        
+        assert source.start_realtime_stream(['VCB'], builder.on_market_data)
+        assert source.wait_for_stream(timeout=5)
+        builder.close_due(pd.Timestamp('2024-01-05').tz_localize('Asia/Ho_Chi_Minh'))
+        source.stop_realtime_stream()
+        
+        expected = _bars('VCB').iloc[-8:].reset_index(drop=True)
+        assert len(built) == 8
+        assert [bar.start.replace(tzinfo=None) for bar in built] == list(expected['timestamp'])
+        assert [(bar.open, bar.high, bar.low, bar.close) for bar in built] == list(
+            expected[['open', 'high', 'low', 'close']].itertuples(index=False, name=None)
+        )
+        assert [bar.volume for bar in built] == list(expected['volume'])
+        
+        stats = source.get_stream_stats()
+        assert stats['ticks_replayed'] == 32
+        assert stats['dispatch']['processed'] == 32
+        assert source.fetch_historical_data_batch(['VCB'], period=1)['VCB']['timestamp'].iloc[0] == expected['timestamp'].iloc[-1]
+    
+    def test_stream_speed_multiplier(self, bar_file):
+        """A speed multiplier paces ticks in scaled real time."""
+        source = ReplayDataSource(bar_file, speed=3600, start='2024-01-04 10:30')
+        received = []
+        
+        started = time.monotonic()
+        source.start_realtime_stream(['FPT'], received.append)
+        assert source.wait_for_stream(timeout=5)
+        elapsed = time.monotonic() - started
+        source.stop_realtime_stream()
+        
+        # Three bars of 4 ticks spanning 10:30 to 11:11:15 of data time, ~0.69s at 3600x
+        assert len(received) == 12
+        assert 0.6 < elapsed < 3
+    
+    @pytest.mark.asyncio
+    async def test_async_api_and_factory(self, bar_file, monkeypatch):
+        """The factory builds a replay source whose async API works offline."""
+        monkeypatch.delenv('DATA_PROVIDER', raising=False)
+        config = {'data_source': {'provider': 'replay', 'batch_size': 1, 'replay': {'path': str(bar_file)}}}
+        source = create_data_source(config)
+        assert isinstance(source, ReplayDataSource)
+        assert source.simulated
+        
+        assert await source.alogin()
+        frames = await source.afetch_many(['VCB', 'FPT'], period=5)
+        assert {ticker: len(df) for ticker, df in frames.items()} == {'VCB': 5, 'FPT': 5}
+        source.close()
+        
+        with pytest.raises(ValueError):
+            create_data_source({'data_source': {'provider': 'unknown'}})
@@ -0,0 +1,93 @@
+import pytest
+from datetime import datetime
+import numpy as np
+import pandas as pd
+from utils.state_store import StateSnapshotStore
+from strategy.rsi_psar_engulfing import RSIPSAREngulfingStrategy, StrategyState
+
+
+def _bars(n_bars=300, seed=3):
+    rng = np.random.default_rng(seed)
+    close = 50000 + np.cumsum(rng.normal(0, 200, n_bars))
+    open_prices = close + rng.normal(0, 150, n_bars)
+    return pd.DataFrame({
+        'timestamp': pd.date_range('2024-01-02 09:00', periods=n_bars, freq='15min'),
+        'open': open_prices,
+        'high': np.maximum(open_prices, close) + rng.uniform(0, 100, n_bars),
+        'low': np.minimum(open_prices, close) - rng.uniform(0, 100, n_bars),
+        'close': close,
+        'volume': rng.integers(10000, 500000, n_bars)
+    })
+
+
+def _feed(strategy, ticker, df):
+    for bar in df.itertuples(index=False):
+        strategy.analyze_bar(ticker, bar.open, bar.high, bar.low, bar.close, bar.volume,
+                             timestamp=bar.timestamp)
+
+
+class TestStateSnapshotStore:
+    """Test cases for strategy state snapshots."""
+    
+    def test_restart_resumes_from_snapshot(self, mock_config, tmp_path):
+        """A restarted strategy restores its state and only applies the newer bars."""
+        df = _bars()
+        path = tmp_path / "state.db"
+        
+        running = RSIPSAREngulfingStrategy(mock_config)
+        running.sync_streaming_indicators('VCB', df.iloc[:200])
+        _feed(running, 'VCB', df.iloc[200:250])
+        running.ticker_states['VCB'].position_status = 'long'
+        running.ticker_states['VCB'].entry_date = datetime(2024, 1, 3, 10, 15)
+        
+        store = StateSnapshotStore(str(path))
+        assert store.save(running.snapshot_state()) == 1
+        store.close()
+        
+        restarted = RSIPSAREngulfingStrategy(mock_config)
+        assert restarted.restore_state(StateSnapshotStore(str(path)).load()) == {'indicators': 1, 'strategy': 1}
+        assert restarted.ticker_states['VCB'] == running.ticker_states['VCB']
+        
+        # The warm-up fetches a short window; only bars after the snapshot are applied
+        _feed(running, 'VCB', df.iloc[250:])
+        engine = restarted.sync_streaming_indicators('VCB', df.iloc[200:])
+        assert engine.bar_count == 300
+        assert engine.to_state() == running.streaming_indicators['VCB'].to_state()
+        
+        # Rebuilding from the same short window would lose the PSAR history
+        rebuilt = RSIPSAREngulfingStrategy(mock_config).seed_streaming_indicators('VCB', df.iloc[200:])
+        assert rebuilt.to_state() != engine.to_state()
+    
+    def test_changed_parameters_discard_engines(self, mock_config, tmp_path):
+        """Engines built with other indicator parameters are not restored."""
+        strategy = RSIPSAREngulfingStrategy(mock_config)
+        strategy.seed_streaming_indicators('FPT', _bars(100))
+        strategy.ticker_states['FPT'] = StrategyState(
+            ticker='FPT', last_update=datetime(2024, 1, 2, 9, 0), current_price=np.float64(98.5),
+            position_status='none'
+        )
+        store = StateSnapshotStore(str(tmp_path / "state.db"))
+        store.save(strategy.snapshot_state())
+        
+        config = {**mock_config, 'strategy': {**mock_config['strategy'], 'rsi': {'period': 7}}}
+        restored = RSIPSAREngulfingStrategy(config)
+        assert restored.restore_state(store.load()) == {'indicators': 0, 'strategy': 1}
+        assert 'FPT' not in restored.streaming_indicators
+        assert restored.ticker_states['FPT'].current_price == 98.5
+    
+    def test_save_replaces_rows(self, tmp_path):
+        """Each save keeps one row per ticker and reports its size."""
+        strategy = RSIPSAREngulfingStrategy({})
+        store = StateSnapshotStore(str(tmp_path / "state.db"))
+        
+        for ticker in ['VCB', 'FPT']:
+            strategy.seed_streaming_indicators(ticker, _bars(60))
+        store.save(strategy.snapshot_state())
+        strategy.seed_streaming_indicators('VCB', _bars(80))
+        store.save(strategy.snapshot_state())
+        
+        stats = store.get_stats()
+        assert stats['tickers'] == 2
+        assert stats['saves'] == 2
+        assert 0 < stats['size_bytes'] < 4096
+        assert store.load()['VCB']['indicators']['bar_count'] == 80
@@ -127,6 +127,64 @@ class TestRSIPSAREngulfingStrategy:
             assert isinstance(signals, list)
             mock_calc.assert_called_once()
     
+    def test_generate_signals_from_arrays(self, mock_config, sample_ohlcv_data):
+        """Signals from the dict-of-arrays path match the DataFrame path."""
+        strategy = RSIPSAREngulfingStrategy(mock_config)
+        df = sample_ohlcv_data.copy()
+        df['close'] = df['close'] * 1000  # VND price range for the liquidity filter
+        
+        frame = strategy._calculate_indicators(df)
+        arrays = strategy._calculate_indicators(df, as_arrays=True)
+        
+        from_frame = strategy._generate_signals('VIC', frame)
+        from_arrays = strategy._generate_signals('VIC', arrays)
+        
+        assert [(s.signal_type, s.confidence, s.reason) for s in from_frame] == \
+               [(s.signal_type, s.confidence, s.reason) for s in from_arrays]
+        assert strategy._latest_row(arrays)['rsi'] == frame['rsi'].iloc[-1]
+    
+    def test_analyze_bar_matches_analyze_ticker(self, mock_config, sample_ohlcv_data):
+        """Streaming bar analysis agrees with the full DataFrame analysis."""
+        strategy = RSIPSAREngulfingStrategy(mock_config)
+        df = sample_ohlcv_data.copy()
+        df['close'] = df['close'] * 1000  # VND price range for the liquidity filter
+        
+        strategy.get_streaming_indicators('VIC', history=df.iloc[:-1])
+        last = df.iloc[-1]
+        bar_signals = strategy.analyze_bar(
+            'VIC', last['open'], last['high'], last['low'], last['close'], last['volume']
+        )
+        frame_signals = strategy._generate_signals('VIC', strategy._calculate_indicators(df))
+        
+        assert strategy.streaming_indicators['VIC'].bar_count == len(df)
+        assert [(s.signal_type, s.reason) for s in bar_signals] == \
+               [(s.signal_type, s.reason) for s in
+                strategy._apply_risk_management('VIC', frame_signals)]
+        assert strategy.ticker_states['VIC'].current_price == last['close']
+    
+    def test_analyze_universe_matches_per_ticker(self, mock_config, sample_market_data):
+        """Batched universe analysis gives the same signals as per-ticker analysis."""
+        strategy = RSIPSAREngulfingStrategy(mock_config)
+        market_data = {}
+        for ticker, df in sample_market_data.items():
+            df = df.copy()
+            df['close'] = df['close'] * 1000  # VND price range for the liquidity filter
+            market_data[ticker] = df
+        market_data['NEW'] = sample_market_data['VIC'].head(10)
+        
+        results = strategy.analyze_universe(market_data)
+        
+        assert results['NEW'] == []
+        for ticker, df in market_data.items():
+            if ticker == 'NEW':
+                continue
+            expected = strategy._apply_risk_management(
+                ticker, strategy._generate_signals(ticker, strategy._calculate_indicators(df))
+            )
+            assert [(s.signal_type, s.reason) for s in results[ticker]] == \
+                   [(s.signal_type, s.reason) for s in expected]
+            assert strategy.ticker_states[ticker].current_price == df['close'].iloc[-1]
+    
     def test_check_buy_conditions_rsi_oversold(self, mock_config):
         """Test buy conditions with RSI oversold."""
         strategy = RSIPSAREngulfingStrategy(mock_config)
@@ -0,0 +1,97 @@
+import pytest
+import threading
+import time
+from utils.stream_dispatcher import StreamDispatcher
+
+
+class TestStreamDispatcher:
+    """Test cases for the bounded stream dispatcher."""
+    
+    def test_events_delivered_in_order_per_ticker(self):
+        """Every event reaches the callback once, in submit order per ticker."""
+        received = []
+        lock = threading.Lock()
+        
+        def callback(event):
+            with lock:
+                received.append(event)
+        
+        dispatcher = StreamDispatcher(callback, workers=4)
+        dispatcher.start()
+        for i in range(200):
+            dispatcher.submit(f"T{i % 10}", (f"T{i % 10}", i))
+        dispatcher.stop()
+        
+        assert len(received) == 200
+        for ticker in range(10):
+            sequence = [i for key, i in received if key == f"T{ticker}"]
+            assert sequence == sorted(sequence)
+        
+        stats = dispatcher.get_stats()
+        assert stats['submitted'] == stats['processed'] == 200
+        assert stats['queue_depth'] == 0
+        assert stats['latency_ms']['max'] >= stats['latency_ms']['p50'] >= 0
+    
+    def test_full_queue_coalesces_per_ticker(self):
+        """When full, a ticker's pending event is replaced and new tickers are dropped."""
+        release = threading.Event()
+        received = []
+        
+        def callback(event):
+            release.wait(5)
+            received.append(event)
+        
+        dispatcher = StreamDispatcher(callback, workers=1, max_queue_size=2)
+        dispatcher.start()
+        dispatcher.submit('VCB', 'VCB-0')
+        time.sleep(0.05)  # Worker picks VCB-0 and blocks
+        
+        assert dispatcher.submit('VCB', 'VCB-1')
+        assert dispatcher.submit('FPT', 'FPT-1')
+        assert dispatcher.submit('VCB', 'VCB-2')  # Coalesced into VCB-1
+        assert not dispatcher.submit('HPG', 'HPG-1')  # Dropped
+        
+        release.set()
+        dispatcher.stop()
+        
+        assert received == ['VCB-0', 'VCB-2', 'FPT-1']
+        stats = dispatcher.get_stats()
+        assert stats['coalesced'] == 1
+        assert stats['dropped'] == 1
+        assert stats['max_worker_queue_depth'] == 2
+    
+    def test_callback_errors_do_not_stop_workers(self):
+        """A failing callback is counted and later events still run."""
+        received = []
+        
+        def callback(event):
+            if event == 'bad':
+                raise ValueError("boom")
+            received.append(event)
+        
+        dispatcher = StreamDispatcher(callback)
+        dispatcher.start()
+        for event in ['a', 'bad', 'b']:
+            dispatcher.submit('VCB', event)
+        dispatcher.stop()
+        
+        assert received == ['a', 'b']
+        assert dispatcher.get_stats()['callback_errors'] == 1
+    
+    def test_stop_without_drain_discards_pending(self):
+        """stop(drain=False) counts pending events as dropped."""
+        release = threading.Event()
+        dispatcher = StreamDispatcher(lambda event: release.wait(5))
+        dispatcher.start()
+        dispatcher.submit('VCB', 0)
+        time.sleep(0.05)
+        for i in range(5):
+            dispatcher.submit(f"T{i}", i)
+        
+        threading.Timer(0.1, release.set).start()  # Unblock the worker after stop() cleared the queue
+        dispatcher.stop(drain=False)
+        
+        stats = dispatcher.get_stats()
+        assert stats['processed'] == 1
+        assert stats['dropped'] == 5
+        assert not stats['running']
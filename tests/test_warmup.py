@@ -0,0 +1,118 @@
+import pytest
+import time
+from datetime import datetime
+import numpy as np
+import pandas as pd
+from utils.cache_manager import CacheManager
+from utils.helpers import get_next_market_open, get_vietnam_timezone, seconds_until_market_open
+from utils.replay_source import ReplayDataSource
+from utils.warmup import CacheWarmer
+from strategy.rsi_psar_engulfing import RSIPSAREngulfingStrategy
+
+
+TICKERS = ['VCB', 'FPT', 'HPG', 'VNM', 'MWG']
+
+
+@pytest.fixture
+def replay_source(tmp_path):
+    rng = np.random.default_rng(7)
+    frames = []
+    for ticker in TICKERS:
+        close = 100 + np.cumsum(rng.normal(0, 1, 120))
+        frames.append(pd.DataFrame({
+            'ticker': ticker,
+            'timestamp': pd.date_range('2024-01-02 09:15', periods=120, freq='15min'),
+            'open': close - 0.5,
+            'high': close + 1,
+            'low': close - 1,
+            'close': close,
+            'volume': rng.integers(1000, 5000, 120)
+        }))
+    path = tmp_path / "bars.csv"
+    pd.concat(frames).to_csv(path, index=False)
+    return ReplayDataSource(path, start='2024-02-01', batch_size=2)
+
+
+def _key(ticker):
+    return f"ohlcv:15m:{ticker}"
+
+
+class TestCacheWarmer:
+    """Test cases for the pre-market warm-up."""
+    
+    @pytest.mark.asyncio
+    async def test_warms_cache_and_indicators(self, replay_source):
+        """Every ticker lands in the cache and gets a seeded indicator engine."""
+        cache = CacheManager(use_redis=False)
+        strategy = RSIPSAREngulfingStrategy({})
+        warmer = CacheWarmer(replay_source, cache, _key, strategy=strategy, period=100, chunk_size=2)
+        progress = []
+        
+        report = await warmer.run(TICKERS + ['XXX'], cache_ttl=600,
+                                  on_progress=lambda r: progress.append(r.tickers_done))
+        
+        assert report.completed
+        assert report.tickers_loaded == 5
+        assert report.engines_seeded == 5
+        assert report.failed == ['XXX']
+        assert progress == [2, 4, 6]
+        
+        cached = cache.get_many([_key(ticker) for ticker in TICKERS])
+        assert len(cached) == 5
+        assert len(cached[_key('VCB')]) == 100
+        assert strategy.streaming_indicators['VCB'].bar_count == 100
+        replay_source.close()
+    
+    @pytest.mark.asyncio
+    async def test_drop_last_bar_and_reseed(self, replay_source):
+        """Warming during a session leaves the forming bar out and replaces stale engines."""
+        strategy = RSIPSAREngulfingStrategy({})
+        stale = strategy.get_streaming_indicators('VCB')
+        warmer = CacheWarmer(replay_source, CacheManager(use_redis=False), _key, strategy=strategy)
+        
+        await warmer.run(['VCB'], drop_last_bar=True)
+        
+        assert strategy.streaming_indicators['VCB'] is not stale
+        assert strategy.streaming_indicators['VCB'].bar_count == 99
+        replay_source.close()
+    
+    @pytest.mark.asyncio
+    async def test_time_budget(self, replay_source, monkeypatch):
+        """A slow source is cut off at the budget and the rest is left for the first cycle."""
+        fetch = replay_source.fetch_historical_data_batch
+        
+        def slow_fetch(*args, **kwargs):
+            time.sleep(0.2)
+            return fetch(*args, **kwargs)
+        
+        monkeypatch.setattr(replay_source, 'fetch_historical_data_batch', slow_fetch)
+        warmer = CacheWarmer(replay_source, CacheManager(use_redis=False), _key,
+                             time_budget=0.3, chunk_size=1)
+        
+        started = time.monotonic()
+        report = await warmer.run(TICKERS)
+        
+        assert time.monotonic() - started < 1.0
+        assert report.budget_exhausted
+        assert not report.completed
+        assert 1 <= report.tickers_loaded < len(TICKERS)
+        assert "time budget exhausted" in report.summary()
+        replay_source.close()
+
+
+class TestMarketOpen:
+    """Test cases for the next-session helpers."""
+    
+    def _at(self, text):
+        return get_vietnam_timezone().localize(datetime.fromisoformat(text))
+    
+    def test_next_market_open(self):
+        """Sessions start today until the close, then on the next weekday."""
+        config = {'market': {'trading_hours': {'start': '09:00', 'end': '15:00'}}}
+        
+        assert get_next_market_open(config, self._at('2024-01-05 08:30')) == self._at('2024-01-05 09:00')
+        assert get_next_market_open(config, self._at('2024-01-05 16:00')) == self._at('2024-01-08 09:00')
+        assert get_next_market_open(config, self._at('2024-01-06 10:00')) == self._at('2024-01-08 09:00')
+        
+        assert seconds_until_market_open(config, self._at('2024-01-05 08:30')) == 1800
+        assert seconds_until_market_open(config, self._at('2024-01-05 10:00')) == 0
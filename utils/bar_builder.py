@@ -0,0 +1,338 @@
+"""Real-time tick-to-bar aggregation.
+Turns streamed quotes (last price plus cumulative matched volume) into
+OHLCV bars aligned to exchange-time boundaries, and replays synthetic
+ticks so the pipeline can be exercised offline.
+"""
+
+import logging
+import random
+import threading
+import time
+from dataclasses import dataclass, replace
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+import pytz
+
+TIMEFRAME_UNITS = {'m': 'minutes', 'h': 'hours', 'd': 'days'}
+
+
+def parse_timeframe(timeframe: str) -> timedelta:
+    """
+    Convert a timeframe string to its bar length.
+    
+    Args:
+        timeframe: Timeframe such as '1m', '5m', '15m', '1h' or '1d'
+    
+    Returns:
+        timedelta: Bar length
+    """
+    unit = TIMEFRAME_UNITS.get(timeframe[-1:].lower())
+    if unit is None or not timeframe[:-1].isdigit():
+        raise ValueError(f"Unsupported timeframe: {timeframe}")
+    return timedelta(**{unit: int(timeframe[:-1])})
+
+
+@dataclass
+class Tick:
+    """Single trade update: last price and cumulative matched volume."""
+    ticker: str
+    timestamp: datetime
+    price: float
+    total_volume: int
+    match_volume: int = 0
+
+
+@dataclass
+class Bar:
+    """OHLCV bar built from ticks."""
+    ticker: str
+    timeframe: str
+    start: datetime
+    end: datetime
+    open: float
+    high: float
+    low: float
+    close: float
+    volume: int
+    tick_count: int = 0
+    final: bool = False
+
+
+class BarBuilder:
+    """
+    Per-ticker OHLCV bar builder for a single timeframe.
+    
+    Bar volume is the growth of the cumulative matched volume (FiinQuant's
+    TotalMatchVolume) within the bar. A bar closes when a tick of a later
+    bar arrives or when close_due() finds its end time has passed, and is
+    emitted once with final=True; while it forms, partial copies are
+    emitted with final=False. Callbacks run outside the builder lock.
+    """
+    
+    def __init__(self, timeframe: str,
+                 on_bar: Callable[[Bar], None],
+                 timezone: str = 'Asia/Ho_Chi_Minh',
+                 emit_partial: bool = True,
+                 partial_interval: float = 0.0):
+        """
+        Initialize bar builder.
+        
+        Args:
+            timeframe: Bar timeframe ('1m', '5m', '15m', '1h', '1d', ...)
+            on_bar: Callback receiving finished and partial bars
+            timezone: Exchange timezone that bar boundaries are aligned to
+            emit_partial: Whether to emit partial bars while they form
+            partial_interval: Minimum seconds (tick time) between partial
+                emissions per ticker (0 emits on every tick)
+        """
+        self.logger = logging.getLogger(__name__)
+        self.timeframe = timeframe
+        self.bar_length = parse_timeframe(timeframe)
+        self.on_bar = on_bar
+        self.tz = pytz.timezone(timezone)
+        self.emit_partial = emit_partial
+        self.partial_interval = partial_interval
+        
+        self._bars: Dict[str, Bar] = {}
+        self._last_total_volume: Dict[str, int] = {}
+        self._last_tick_time: Dict[str, datetime] = {}
+        self._last_partial_time: Dict[str, datetime] = {}
+        self._lock = threading.Lock()
+        
+        self.ticks_processed = 0
+        self.stale_ticks = 0
+    
+    def _to_exchange_time(self, timestamp: datetime) -> datetime:
+        """Convert a timestamp to exchange time (naive values are taken as system local time)."""
+        return timestamp.astimezone(self.tz)
+    
+    def _bar_start(self, timestamp: datetime) -> datetime:
+        """Start of the bar containing an exchange-time timestamp."""
+        midnight = self.tz.localize(datetime(timestamp.year, timestamp.month, timestamp.day))
+        if self.bar_length >= timedelta(days=1):
+            return midnight
+        return midnight + ((timestamp - midnight) // self.bar_length) * self.bar_length
+    
+    def on_market_data(self, point: Any):
+        """
+        Stream callback: aggregate one FiinQuantAdapter MarketDataPoint.
+        
+        Args:
+            point: Realtime data point (close is the last price, volume the
+                cumulative matched volume of the session)
+        """
+        self.add_tick(point.ticker, point.timestamp, point.close, point.volume, point.match_volume)
+    
+    def on_tick(self, tick: Tick):
+        """Aggregate one Tick (e.g. from SyntheticTickReplayer)."""
+        self.add_tick(tick.ticker, tick.timestamp, tick.price, tick.total_volume, tick.match_volume)
+    
+    def add_tick(self, ticker: str, timestamp: datetime, price: float,
+                 total_volume: int, match_volume: int = 0):
+        """
+        Aggregate one tick.
+        
+        Args:
+            ticker: Stock symbol
+            timestamp: Tick time
+            price: Last matched price
+            total_volume: Cumulative matched volume of the session
+            match_volume: Size of the last match (used for the first tick of a
+                ticker, when there is no previous cumulative volume)
+        """
+        if not price or price <= 0:
+            return
+        
+        timestamp = self._to_exchange_time(timestamp)
+        emitted: List[Bar] = []
+        
+        with self._lock:
+            # Volume traded since the previous tick
+            last_total = self._last_total_volume.get(ticker)
+            if last_total is None:
+                delta = match_volume
+            elif total_volume >= last_total:
+                delta = total_volume - last_total
+            elif timestamp.date() != self._last_tick_time[ticker].date():
+                delta = total_volume  # New session, the counter restarted
+            else:
+                self.stale_ticks += 1  # Older snapshot delivered late
+                return
+            self._last_total_volume[ticker] = total_volume
+            self._last_tick_time[ticker] = timestamp
+            self.ticks_processed += 1
+            
+            start = self._bar_start(timestamp)
+            bar = self._bars.get(ticker)
+            
+            if bar is not None and start > bar.start:
+                emitted.append(self._close_bar(ticker))
+                bar = None
+            
+            if bar is None:
+                bar = self._bars[ticker] = Bar(
+                    ticker=ticker,
+                    timeframe=self.timeframe,
+                    start=start,
+                    end=start + self.bar_length,
+                    open=price,
+                    high=price,
+                    low=price,
+                    close=price,
+                    volume=delta,
+                    tick_count=1
+                )
+            elif start < bar.start:
+                # Late tick of an already closed bar: keep its volume, not its price
+                bar.volume += delta
+            else:
+                bar.high = max(bar.high, price)
+                bar.low = min(bar.low, price)
+                bar.close = price
+                bar.volume += delta
+                bar.tick_count += 1
+            
+            if self.emit_partial:
+                last_partial = self._last_partial_time.get(ticker)
+                if last_partial is None or (timestamp - last_partial).total_seconds() >= self.partial_interval:
+                    self._last_partial_time[ticker] = timestamp
+                    emitted.append(replace(bar))
+        
+        self._emit(emitted)
+    
+    def _close_bar(self, ticker: str) -> Bar:
+        """Finalize and remove a ticker's current bar (caller holds the lock)."""
+        bar = self._bars.pop(ticker)
+        bar.final = True
+        self._last_partial_time.pop(ticker, None)
+        return bar
+    
+    def close_due(self, now: Optional[datetime] = None) -> List[Bar]:
+        """
+        Finalize bars whose end time has passed.
+        
+        Call periodically so bars close on time even when no later tick
+        arrives (illiquid tickers, lunch break, end of session).
+        
+        Args:
+            now: Current time (defaults to the system clock)
+        
+        Returns:
+            List[Bar]: Bars closed by this call
+        """
+        now = self._to_exchange_time(now or datetime.now(self.tz))
+        with self._lock:
+            closed = [self._close_bar(ticker) for ticker, bar in list(self._bars.items()) if bar.end <= now]
+        self._emit(closed)
+        return closed
+    
+    def current_bar(self, ticker: str) -> Optional[Bar]:
+        """Copy of a ticker's forming bar (None if there is none)."""
+        with self._lock:
+            bar = self._bars.get(ticker)
+            return replace(bar) if bar else None
+    
+    def _emit(self, bars: List[Bar]):
+        """Deliver bars to the callback, isolating callback failures."""
+        for bar in bars:
+            try:
+                self.on_bar(bar)
+            except Exception as e:
+                self.logger.error(f"Bar callback failed for {bar.ticker}: {str(e)}")
+    
+    def get_stats(self) -> Dict[str, int]:
+        """Get aggregation statistics."""
+        with self._lock:
+            return {
+                'ticks_processed': self.ticks_processed,
+                'stale_ticks': self.stale_ticks,
+                'open_bars': len(self._bars)
+            }
+
+
+class SyntheticTickReplayer:
+    """
+    Generates a reproducible tick stream for offline testing.
+    
+    Prices follow a random walk rounded to the tick size and cumulative
+    matched volume only grows, like FiinQuant realtime events.
+    """
+    
+    def __init__(self, tickers: List[str],
+                 start: datetime,
+                 ticks_per_minute: int = 30,
+                 base_prices: Optional[Dict[str, float]] = None,
+                 volatility: float = 0.001,
+                 tick_size: float = 50.0,
+                 seed: int = 42):
+        """
+        Initialize replayer.
+        
+        Args:
+            tickers: Stock symbols to generate ticks for
+            start: Time of the first tick
+            ticks_per_minute: Ticks per minute per ticker
+            base_prices: Starting prices (default 20,000 VND)
+            volatility: Standard deviation of per-tick returns
+            tick_size: Price increment
+            seed: Random seed
+        """
+        self.tickers = tickers
+        self.start = start
+        self.ticks_per_minute = ticks_per_minute
+        self.base_prices = base_prices or {}
+        self.volatility = volatility
+        self.tick_size = tick_size
+        self.seed = seed
+    
+    def ticks(self, duration: timedelta) -> Iterator[Tick]:
+        """
+        Generate ticks in time order.
+        
+        Args:
+            duration: Length of the generated session
+        
+        Yields:
+            Tick: Next tick
+        """
+        rng = random.Random(self.seed)
+        prices = {ticker: self.base_prices.get(ticker, 20000.0) for ticker in self.tickers}
+        totals = {ticker: 0 for ticker in self.tickers}
+        step = timedelta(minutes=1) / self.ticks_per_minute
+        
+        for i in range(int(duration / step)):
+            timestamp = self.start + i * step
+            for ticker in self.tickers:
+                price = prices[ticker] * (1 + rng.gauss(0, self.volatility))
+                price = max(self.tick_size, round(price / self.tick_size) * self.tick_size)
+                match_volume = rng.randint(1, 50) * 100
+                prices[ticker] = price
+                totals[ticker] += match_volume
+                
+                yield Tick(ticker, timestamp, price, totals[ticker], match_volume)
+    
+    def replay(self, callback: Callable[[Tick], None],
+               duration: timedelta, speed: Optional[float] = None) -> int:
+        """
+        Push generated ticks into a callback.
+        
+        Args:
+            callback: Tick consumer (e.g. BarBuilder.on_tick)
+            duration: Length of the generated session
+            speed: Replay speed as a multiple of real time (None for no pacing)
+        
+        Returns:
+            int: Number of ticks delivered
+        """
+        count = 0
+        wall_start = time.monotonic()
+        for point in self.ticks(duration):
+            if speed:
+                due = (point.timestamp - self.start).total_seconds() / speed
+                delay = due - (time.monotonic() - wall_start)
+                if delay > 0:
+                    time.sleep(delay)
+            callback(point)
+            count += 1
+        return count
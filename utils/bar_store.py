@@ -0,0 +1,263 @@
+"""Local columnar OHLCV bar store.
+Keeps each ticker/timeframe history as append-only column files that are
+read through numpy memory maps, so refreshes only need the newest bars.
+"""
+
+import json
+import logging
+import os
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+# Cross-process write lock (optional, POSIX only)
+try:
+    import fcntl
+    FCNTL_AVAILABLE = True
+except ImportError:
+    FCNTL_AVAILABLE = False
+
+
+class BarStore:
+    """
+    Append-only columnar store of OHLCV bars.
+    
+    Layout: <root>/<timeframe>/<ticker>/ holds one raw little-endian file per
+    column ('timestamp' as int64 nanoseconds, value columns as int64 or
+    float64) and meta.json with the committed row count. Rows past that
+    count (left by an interrupted write) are ignored and truncated by the
+    next append. An appended bar with the newest stored timestamp replaces
+    it, so a still-forming last bar gets overwritten by its final version.
+    """
+    
+    def __init__(self, root: Union[str, Path]):
+        """
+        Initialize bar store.
+        
+        Args:
+            root: Directory holding the store
+        """
+        self.logger = logging.getLogger(__name__)
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+    
+    def _series_dir(self, ticker: str, timeframe: str) -> Path:
+        """Directory of one ticker/timeframe series."""
+        return self.root / timeframe / ticker
+    
+    @staticmethod
+    def _read_meta(series_dir: Path) -> Optional[Dict[str, Any]]:
+        """Read a series' metadata (None if the series does not exist)."""
+        try:
+            with open(series_dir / 'meta.json', 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+    
+    @staticmethod
+    def _write_meta(series_dir: Path, meta: Dict[str, Any]):
+        """Atomically replace a series' metadata (this commits appended rows)."""
+        tmp_path = series_dir / 'meta.json.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, series_dir / 'meta.json')
+    
+    @contextmanager
+    def _write_lock(self, series_dir: Path):
+        """Serialize writers of a series across threads and processes."""
+        with self._lock:
+            series_dir.mkdir(parents=True, exist_ok=True)
+            with open(series_dir / '.lock', 'w') as lock_file:
+                if FCNTL_AVAILABLE:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    if FCNTL_AVAILABLE:
+                        fcntl.flock(lock_file, fcntl.LOCK_UN)
+    
+    def _column(self, series_dir: Path, meta: Dict[str, Any], column: str) -> np.ndarray:
+        """Memory-map the committed rows of one column."""
+        rows = meta['rows']
+        dtype = np.dtype(meta['columns'][column])
+        if rows == 0:
+            return np.empty(0, dtype=dtype)
+        return np.memmap(series_dir / f"{column}.bin", dtype=dtype, mode='r', shape=(rows,))
+    
+    def last_timestamp(self, ticker: str, timeframe: str) -> Optional[pd.Timestamp]:
+        """
+        Get the timestamp of the newest stored bar.
+        
+        Args:
+            ticker: Stock symbol
+            timeframe: Data timeframe
+        
+        Returns:
+            pd.Timestamp or None if nothing is stored
+        """
+        series_dir = self._series_dir(ticker, timeframe)
+        meta = self._read_meta(series_dir)
+        if not meta or meta['rows'] == 0:
+            return None
+        
+        last = pd.Timestamp(int(self._column(series_dir, meta, 'timestamp')[-1]))
+        return last.tz_localize('UTC').tz_convert(meta['tz']) if meta.get('tz') else last
+    
+    def append(self, ticker: str, timeframe: str, df: pd.DataFrame) -> int:
+        """
+        Merge bars into a series.
+        
+        Bars older than the newest stored bar are ignored; a bar with the
+        newest stored timestamp replaces it.
+        
+        Args:
+            ticker: Stock symbol
+            timeframe: Data timeframe
+            df: Bars with a 'timestamp' column (or DatetimeIndex) and value columns
+        
+        Returns:
+            int: Number of rows written
+        """
+        if df is None or df.empty:
+            return 0
+        
+        # Timestamps are stored as naive UTC nanoseconds, the zone goes into meta.json
+        timestamps = pd.DatetimeIndex(pd.to_datetime(df['timestamp'] if 'timestamp' in df.columns else df.index))
+        tz = str(timestamps.tz) if timestamps.tz is not None else None
+        if tz:
+            timestamps = timestamps.tz_convert('UTC').tz_localize(None)
+        ts_all = timestamps.values.astype('datetime64[ns]').view(np.int64)
+        
+        order = np.argsort(ts_all, kind='stable')
+        ts_values = ts_all[order]
+        
+        # Keep the last version of duplicated timestamps
+        keep = np.append(ts_values[1:] != ts_values[:-1], True)
+        ts_values = ts_values[keep]
+        
+        series_dir = self._series_dir(ticker, timeframe)
+        with self._write_lock(series_dir):
+            meta = self._read_meta(series_dir)
+            if meta is None:
+                value_columns = [c for c in df.columns
+                                 if c not in ('timestamp', 'ticker') and pd.api.types.is_numeric_dtype(df[c])]
+                meta = {
+                    'rows': 0,
+                    'tz': tz,
+                    'columns': {'timestamp': '<i8', **{
+                        c: '<i8' if pd.api.types.is_integer_dtype(df[c]) else '<f8' for c in value_columns
+                    }}
+                }
+            
+            # Drop bars older than what is stored, overwrite a revised last bar
+            rows = meta['rows']
+            start = 0
+            if rows:
+                last_ts = int(self._column(series_dir, meta, 'timestamp')[-1])
+                start = int(np.searchsorted(ts_values, last_ts, side='left'))
+                ts_values = ts_values[start:]
+                if len(ts_values) == 0:
+                    return 0
+                if ts_values[0] == last_ts:
+                    rows -= 1
+            
+            selected = np.flatnonzero(keep)[start:]
+            for column, dtype in meta['columns'].items():
+                if column == 'timestamp':
+                    values = ts_values
+                elif column in df.columns:
+                    values = df[column].to_numpy()[order][selected]
+                else:
+                    values = np.zeros(len(ts_values)) if dtype == '<i8' else np.full(len(ts_values), np.nan)
+                values = np.ascontiguousarray(values, dtype=np.dtype(dtype))
+                
+                path = series_dir / f"{column}.bin"
+                with open(path, 'ab') as f:
+                    f.truncate(rows * values.itemsize)
+                    f.write(values.tobytes())
+            
+            meta['rows'] = rows + len(ts_values)
+            self._write_meta(series_dir, meta)
+        
+        return len(ts_values)
+    
+    def read(self, ticker: str, timeframe: str,
+             last_n: Optional[int] = None,
+             start: Optional[Union[str, pd.Timestamp]] = None,
+             end: Optional[Union[str, pd.Timestamp]] = None) -> pd.DataFrame:
+        """
+        Read stored bars.
+        
+        Args:
+            ticker: Stock symbol
+            timeframe: Data timeframe
+            last_n: Only the newest N bars (after applying start/end)
+            start: First timestamp to include
+            end: Last timestamp to include
+        
+        Returns:
+            pd.DataFrame: Columns ticker, timestamp and the stored value columns
+        """
+        series_dir = self._series_dir(ticker, timeframe)
+        meta = self._read_meta(series_dir)
+        if not meta or meta['rows'] == 0:
+            return pd.DataFrame()
+        
+        tz = meta.get('tz')
+        
+        def to_ns(value):
+            ts = pd.Timestamp(value)
+            if tz:
+                ts = (ts.tz_localize(tz) if ts.tzinfo is None else ts).tz_convert('UTC').tz_localize(None)
+            return ts.value
+        
+        stored_ts = self._column(series_dir, meta, 'timestamp')
+        lo = int(np.searchsorted(stored_ts, to_ns(start), side='left')) if start is not None else 0
+        hi = int(np.searchsorted(stored_ts, to_ns(end), side='right')) if end is not None else meta['rows']
+        if last_n is not None:
+            lo = max(lo, hi - last_n)
+        
+        timestamps = pd.to_datetime(np.array(stored_ts[lo:hi]))
+        if tz:
+            timestamps = timestamps.tz_localize('UTC').tz_convert(tz)
+        
+        frame = pd.DataFrame({'ticker': ticker, 'timestamp': timestamps})
+        for column in meta['columns']:
+            if column != 'timestamp':
+                frame[column] = np.array(self._column(series_dir, meta, column)[lo:hi])
+        return frame
+    
+    def tickers(self, timeframe: str) -> List[str]:
+        """List tickers stored for a timeframe."""
+        timeframe_dir = self.root / timeframe
+        if not timeframe_dir.exists():
+            return []
+        return sorted(path.name for path in timeframe_dir.iterdir() if (path / 'meta.json').exists())
+    
+    def delete(self, ticker: str, timeframe: str) -> bool:
+        """
+        Delete a stored series.
+        
+        Args:
+            ticker: Stock symbol
+            timeframe: Data timeframe
+        
+        Returns:
+            bool: Whether the series existed
+        """
+        series_dir = self._series_dir(ticker, timeframe)
+        if not series_dir.exists():
+            return False
+        
+        with self._write_lock(series_dir):
+            for path in series_dir.iterdir():
+                if path.name != '.lock':
+                    path.unlink()
+        (series_dir / '.lock').unlink(missing_ok=True)
+        series_dir.rmdir()
+        return True
@@ -2,24 +2,73 @@
 Provides Redis and in-memory caching for performance optimization.
 """
 
+import asyncio
 import json
 import pickle
 import hashlib
+import inspect
 import logging
-from typing import Any, Dict, List, Optional, Union, Callable
+from typing import Any, Awaitable, Dict, List, Optional, Set, Tuple, Union, Callable
 from datetime import datetime, timedelta
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, asdict, is_dataclass
 from functools import wraps
+import sys
+import time
+import zlib
 import threading
+import uuid
+import fnmatch
+import heapq
+from collections import OrderedDict
 from pathlib import Path
+import numpy as np
+import pandas as pd
+
+from utils.cache_metrics import CacheMetrics
+from utils.disk_cache import DiskCache
 
 # Redis support (optional)
 try:
     import redis
+    import redis.asyncio as redis_asyncio
     REDIS_AVAILABLE = True
 except ImportError:
     REDIS_AVAILABLE = False
 
+# Compression codecs (optional, zlib is always available)
+try:
+    import lz4.frame
+    LZ4_AVAILABLE = True
+except ImportError:
+    LZ4_AVAILABLE = False
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+# Serialization envelope: one format byte and one compression byte precede
+# the payload. Codes stay below 0x20 so they never collide with legacy
+# payloads (JSON text or pickle, which starts with 0x80).
+FORMAT_JSON = 0x01
+FORMAT_PICKLE = 0x02
+FORMAT_BUFFERS = 0x03
+
+CODEC_NONE = 0x00
+CODEC_ZLIB = 0x01
+CODEC_LZ4 = 0x02
+CODEC_ZSTD = 0x03
+
+# Redis key holding the generation counter of a cache namespace
+GENERATION_KEY = "cache_gen:{}"
+
+# Default pub/sub channel for cross-process invalidation events
+DEFAULT_INVALIDATION_CHANNEL = "cache_invalidation"
+
+# Nesting depth from which _estimate_size counts objects shallowly
+MAX_SIZE_DEPTH = 8
+
 
 @dataclass
 class CacheEntry:
@@ -33,6 +82,180 @@ class CacheEntry:
     size_bytes: int = 0
 
 
+def _hash_array(hasher, values: np.ndarray):
+    """Feed an array's dtype, shape and contents into a hasher."""
+    hasher.update(f"{values.dtype.str}{values.shape}".encode())
+    if values.dtype.kind in 'biufcmM':
+        # Hash the raw buffer, no per-element work
+        hasher.update(np.ascontiguousarray(values).view(np.uint8).data)
+    else:
+        hasher.update(pd.util.hash_pandas_object(pd.Series(values.ravel()), index=False).values.data)
+
+
+def _fingerprint(value: Any) -> str:
+    """
+    Stable content fingerprint for values json cannot encode.
+    
+    DataFrames, Series and ndarrays are identified by their data buffers,
+    shape and index contents rather than their (truncated) repr. Objects can
+    provide a cache_key() method; objects with the default repr (which holds
+    a memory address) have no stable identity and raise TypeError.
+    """
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        hasher = hashlib.blake2b(digest_size=16)
+        if isinstance(value, pd.DataFrame):
+            for column in value.columns:
+                hasher.update(str(column).encode())
+                _hash_array(hasher, value[column].to_numpy())
+        else:
+            hasher.update(str(value.name).encode())
+            _hash_array(hasher, value.to_numpy())
+        index = value.index
+        hasher.update(pd.util.hash_pandas_object(index).to_numpy().data)
+        hasher.update(f"{type(value).__name__}{value.shape}{index.dtype}".encode())
+        return f"{type(value).__name__}:{hasher.hexdigest()}"
+    
+    if isinstance(value, np.ndarray):
+        hasher = hashlib.blake2b(digest_size=16)
+        _hash_array(hasher, value)
+        return f"ndarray:{hasher.hexdigest()}"
+    
+    cache_key = getattr(value, 'cache_key', None)
+    if callable(cache_key):
+        return f"{type(value).__qualname__}:{cache_key()}"
+    
+    if type(value).__repr__ is object.__repr__:
+        raise TypeError(f"{type(value).__qualname__} has no stable cache identity "
+                        f"(define cache_key() or __repr__)")
+    
+    return str(value)
+
+
+def _instance_identity(instance: Any) -> str:
+    """
+    Cache identity of the bound self of a cached method.
+    
+    Instances providing cache_key() are told apart by it; other instances
+    are identified by their class, so bound methods share cache entries
+    across instances.
+    """
+    cache_key = getattr(instance, 'cache_key', None)
+    if callable(cache_key):
+        return f"{type(instance).__qualname__}:{cache_key()}"
+    return f"{type(instance).__module__}.{type(instance).__qualname__}"
+
+
+def _get_codecs() -> Dict[str, Tuple[int, Callable, Callable]]:
+    """Available compression codecs by name: (code, compress, decompress)."""
+    codecs = {'zlib': (CODEC_ZLIB, lambda data: zlib.compress(data, 1), zlib.decompress)}
+    if LZ4_AVAILABLE:
+        codecs['lz4'] = (CODEC_LZ4, lz4.frame.compress, lz4.frame.decompress)
+    if ZSTD_AVAILABLE:
+        codecs['zstd'] = (CODEC_ZSTD, zstandard.ZstdCompressor().compress,
+                          zstandard.ZstdDecompressor().decompress)
+    return codecs
+
+
+def _encode_buffers(value: Any) -> bytes:
+    """
+    Encode a DataFrame/Series/ndarray as pickle metadata plus raw data buffers.
+    
+    Pickle protocol 5 hands numpy blocks out-of-band, so column data is
+    written as-is (8-byte aligned) instead of being copied into the pickle
+    stream. Layout: buffer count, metadata length, buffer lengths, metadata,
+    buffers.
+    """
+    buffers = []
+    meta = pickle.dumps(value, protocol=5, buffer_callback=buffers.append)
+    raw = [buffer.raw() for buffer in buffers]
+    
+    header = [len(raw).to_bytes(4, 'little'), len(meta).to_bytes(4, 'little')]
+    header += [view.nbytes.to_bytes(8, 'little') for view in raw]
+    parts = header + [meta, b'\0' * (-(8 + 8 * len(raw) + len(meta)) % 8)]
+    for view in raw:
+        parts += [view, b'\0' * (-view.nbytes % 8)]
+    return b''.join(parts)
+
+
+def _decode_buffers(body: Any) -> Any:
+    """Rebuild a value from _encode_buffers output; arrays are views into one buffer."""
+    # Single copy into a writable, aligned buffer shared by all arrays
+    data = memoryview(bytearray(body))
+    count = int.from_bytes(data[:4], 'little')
+    meta_len = int.from_bytes(data[4:8], 'little')
+    sizes = [int.from_bytes(data[8 + 8 * i:16 + 8 * i], 'little') for i in range(count)]
+    
+    offset = 8 + 8 * count
+    meta = data[offset:offset + meta_len]
+    offset += meta_len + (-(offset + meta_len) % 8)
+    views = []
+    for size in sizes:
+        views.append(data[offset:offset + size])
+        offset += size + (-size % 8)
+    return pickle.loads(meta, buffers=views)
+
+
+class _InFlight:
+    """Result slot shared by callers waiting on the same computation."""
+    
+    def __init__(self):
+        self.event = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+def _estimate_size(value: Any, _seen: Optional[Set[int]] = None, _depth: int = 0) -> int:
+    """
+    Estimate the in-memory size of a cached value in bytes without serializing it.
+    
+    DataFrames and Series use memory_usage(deep=True), ndarrays use nbytes;
+    containers and dataclass instances are sized recursively, counting each
+    object once and stopping at MAX_SIZE_DEPTH. Other objects count their
+    shallow sys.getsizeof(), so references to large graphs (a strategy, a
+    cache manager) are not walked.
+    """
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True, deep=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(index=True, deep=True))
+    if isinstance(value, np.ndarray):
+        if value.dtype == object:
+            return value.nbytes + sum(sys.getsizeof(item) for item in value.ravel())
+        return value.nbytes
+    
+    if _seen is None:
+        _seen = set()
+    if id(value) in _seen:
+        return 0
+    _seen.add(id(value))
+    if _depth >= MAX_SIZE_DEPTH:
+        return sys.getsizeof(value)
+    
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(
+            _estimate_size(k, _seen, _depth + 1) + _estimate_size(v, _seen, _depth + 1)
+            for k, v in value.items()
+        )
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return sys.getsizeof(value) + sum(_estimate_size(item, _seen, _depth + 1) for item in value)
+    if is_dataclass(value) and not isinstance(value, type) and hasattr(value, '__dict__'):
+        return sys.getsizeof(value) + sum(
+            _estimate_size(v, _seen, _depth + 1) for v in vars(value).values()
+        )
+    return sys.getsizeof(value)
+
+
+def _escape_glob(text: str) -> str:
+    """Escape glob metacharacters in a literal string (valid for Redis and fnmatch)."""
+    return ''.join('[\\\\]' if char == '\\' else f'[{char}]' if char in '*?[' else char
+                   for char in text)
+
+
+def _key_prefix(key: str) -> str:
+    """Prefix part of a generated cache key (text before the first ':')."""
+    return key.split(':', 1)[0]
+
+
 class CacheManager:
     """
     Advanced caching manager with multiple backends and strategies.
@@ -45,7 +268,15 @@ class CacheManager:
                  redis_password: Optional[str] = None,
                  use_redis: bool = True,
                  memory_cache_size: int = 1000,
-                 default_ttl: int = 300):
+                 default_ttl: int = 300,
+                 memory_cache_max_bytes: Optional[int] = None,
+                 refresh_ahead_fraction: Optional[float] = None,
+                 compression: Optional[str] = None,
+                 compression_min_bytes: int = 4096,
+                 invalidation_channel: Optional[str] = None,
+                 disk_cache_path: Optional[str] = None,
+                 disk_cache_max_bytes: int = 1024 ** 3,
+                 async_pool_size: int = 20):
         """
         Initialize cache manager.
         
@@ -57,33 +288,96 @@ class CacheManager:
             use_redis: Whether to use Redis (falls back to memory if unavailable)
             memory_cache_size: Maximum number of items in memory cache
             default_ttl: Default time-to-live in seconds
+            memory_cache_max_bytes: Maximum total size of memory cache entries
+                (None for no byte limit)
+            refresh_ahead_fraction: Fraction of TTL after which get_or_compute
+                refreshes an entry in the background (None to disable)
+            compression: Codec for Redis payloads ('zlib', 'lz4', 'zstd' or None)
+            compression_min_bytes: Payloads smaller than this are stored uncompressed
+            invalidation_channel: Redis pub/sub channel used to keep memory tiers
+                of other processes coherent (None to disable)
+            disk_cache_path: SQLite file for the persistent disk tier (None to disable)
+            disk_cache_max_bytes: Maximum total payload size of the disk tier
+            async_pool_size: Maximum connections of the asyncio Redis pool
         """
         self.logger = logging.getLogger(__name__)
         self.default_ttl = default_ttl
         self.memory_cache_size = memory_cache_size
+        self.memory_cache_max_bytes = memory_cache_max_bytes
+        self.refresh_ahead_fraction = refresh_ahead_fraction
+        
+        # Serialization codecs
+        self._codecs = _get_codecs()
+        self._decompressors = {code: decompress for code, _, decompress in self._codecs.values()}
+        self.compression_min_bytes = compression_min_bytes
+        self._compressor = None
+        if compression:
+            if compression in self._codecs:
+                self._compressor = self._codecs[compression][:2]
+            else:
+                self.logger.warning(f"Compression codec '{compression}' unavailable, storing uncompressed")
         
-        # Memory cache
-        self._memory_cache: Dict[str, CacheEntry] = {}
+        # Memory cache: insertion order is LRU order (oldest first), expiry
+        # times live in a min-heap with lazy deletion of stale items
+        self._memory_cache: 'OrderedDict[str, CacheEntry]' = OrderedDict()
+        self._expiry_heap: List[Tuple[float, str]] = []
+        self._memory_bytes = 0
+        self._prefix_bytes: Dict[str, int] = {}
+        self._prefix_entries: Dict[str, int] = {}
         self._cache_lock = threading.RLock()
         
+        # Namespace generations (version numbers baked into namespaced keys)
+        self._generations: Dict[str, int] = {}
+        
+        # Single-flight bookkeeping: one computation per key at a time
+        self._inflight: Dict[str, _InFlight] = {}
+        self._inflight_lock = threading.Lock()
+        
+        # Per-prefix hit/miss/latency/eviction telemetry
+        self.metrics = CacheMetrics()
+        
+        # Disk cache (survives restarts, sits between memory and Redis)
+        self.disk_cache = None
+        if disk_cache_path:
+            try:
+                self.disk_cache = DiskCache(disk_cache_path, max_bytes=disk_cache_max_bytes)
+            except Exception as e:
+                self.logger.warning(f"Disk cache unavailable at {disk_cache_path}: {e}")
+        
+        # Cross-process invalidation (Redis pub/sub)
+        self.invalidation_channel = invalidation_channel
+        self._instance_id = uuid.uuid4().hex
+        self._pubsub = None
+        self._pubsub_thread = None
+        
         # Redis cache
         self.redis_client = None
         self.use_redis = use_redis and REDIS_AVAILABLE
+        self._redis_kwargs = {
+            'host': redis_host,
+            'port': redis_port,
+            'db': redis_db,
+            'password': redis_password,
+            'decode_responses': False,  # We'll handle encoding
+            'socket_connect_timeout': 5,
+            'socket_timeout': 5
+        }
+        
+        # Asyncio Redis client, created on first use inside the event loop
+        self.async_pool_size = async_pool_size
+        self._async_redis = None
+        self._async_inflight: Dict[str, asyncio.Future] = {}
+        self._async_tasks: Set[asyncio.Task] = set()
         
         if self.use_redis:
             try:
-                self.redis_client = redis.Redis(
-                    host=redis_host,
-                    port=redis_port,
-                    db=redis_db,
-                    password=redis_password,
-                    decode_responses=False,  # We'll handle encoding
-                    socket_connect_timeout=5,
-                    socket_timeout=5
-                )
+                self.redis_client = redis.Redis(**self._redis_kwargs)
                 # Test connection
                 self.redis_client.ping()
                 self.logger.info("Redis cache initialized successfully")
+                
+                if self.invalidation_channel:
+                    self._start_invalidation_listener()
             except Exception as e:
                 self.logger.warning(f"Redis unavailable, falling back to memory cache: {e}")
                 self.redis_client = None
@@ -91,6 +385,100 @@ class CacheManager:
         else:
             self.logger.info("Using memory-only cache")
     
+    def _start_invalidation_listener(self):
+        """Subscribe to the invalidation channel on a background thread."""
+        try:
+            self._pubsub = self.redis_client.pubsub(ignore_subscribe_messages=True)
+            self._pubsub.subscribe(**{self.invalidation_channel: self._handle_invalidation})
+            self._pubsub_thread = self._pubsub.run_in_thread(sleep_time=0.1, daemon=True)
+        except Exception as e:
+            self.logger.warning(f"Cache invalidation listener unavailable: {e}")
+            self._pubsub = None
+    
+    def _publish_invalidation(self, client: Any, **event):
+        """Publish an invalidation event (client may be a pipeline)."""
+        if self.invalidation_channel:
+            event['origin'] = self._instance_id
+            event['disk'] = self.disk_cache.identity if self.disk_cache else None
+            client.publish(self.invalidation_channel, json.dumps(event))
+    
+    def _handle_invalidation(self, message: Dict[str, Any]):
+        """Evict local copies (memory and disk) named by an invalidation event from another process."""
+        try:
+            event = json.loads(message['data'])
+            if event.get('origin') == self._instance_id:
+                return
+            
+            with self._cache_lock:
+                if 'keys' in event:
+                    for key in event['keys']:
+                        self._remove_memory_entry(key, reason='invalidated')
+                elif 'namespace' in event:
+                    namespace = event['namespace']
+                    current = self._generations.get(namespace, 0)
+                    generation = max(current, event['generation'])
+                    self._generations[namespace] = generation
+                    self._delete_memory_pattern(f"{_escape_glob(namespace)}:*", reason='invalidated')
+                elif 'pattern' in event:
+                    self._delete_memory_pattern(event['pattern'], reason='invalidated')
+                elif event.get('clear'):
+                    self._clear_memory()
+            
+            # The disk tier is read before Redis, so its copies must go too.
+            # A publisher sharing our database file has already written the
+            # new values there, so written keys are only evicted from other files.
+            if self.disk_cache:
+                if 'keys' in event:
+                    if event.get('disk') != self.disk_cache.identity:
+                        self.disk_cache.delete_many(list(event['keys']))
+                elif 'namespace' in event:
+                    self.disk_cache.set_generation(namespace, generation)
+                    prefix = f"{namespace}:g"
+                    
+                    def is_stale(key: str) -> bool:
+                        key_generation = key[len(prefix):].split(':', 1)[0]
+                        return key_generation.isdigit() and int(key_generation) < generation
+                    
+                    self.disk_cache.delete_pattern(f"{_escape_glob(namespace)}:g*", is_stale)
+                elif 'pattern' in event:
+                    self.disk_cache.delete_pattern(event['pattern'])
+                elif event.get('clear'):
+                    self.disk_cache.clear()
+        except Exception as e:
+            self.logger.warning(f"Failed to handle cache invalidation: {e}")
+    
+    def close(self):
+        """Stop the invalidation listener."""
+        if self._pubsub_thread is not None:
+            self._pubsub_thread.stop()
+            self._pubsub_thread = None
+        if self._pubsub is not None:
+            try:
+                self._pubsub.close()
+            except Exception:
+                pass
+            self._pubsub = None
+    
+    async def aclose(self):
+        """Close the asyncio Redis client and its connection pool."""
+        client, self._async_redis = self._async_redis, None
+        if client is not None:
+            try:
+                # redis-py < 5 only has close()
+                closer = getattr(client, 'aclose', None) or client.close
+                await closer()
+            except Exception as e:
+                self.logger.warning(f"Failed to close async Redis client: {e}")
+    
+    def _get_async_redis(self) -> Optional[Any]:
+        """Get the asyncio Redis client, creating its pool on first use."""
+        if not (self.use_redis and self.redis_client):
+            return None
+        if self._async_redis is None:
+            pool = redis_asyncio.ConnectionPool(max_connections=self.async_pool_size, **self._redis_kwargs)
+            self._async_redis = redis_asyncio.Redis(connection_pool=pool)
+        return self._async_redis
+    
     def _generate_key(self, prefix: str, *args, **kwargs) -> str:
         """Generate cache key from prefix and arguments."""
         # Create deterministic key from arguments
@@ -98,18 +486,163 @@ class CacheManager:
             'args': args,
             'kwargs': sorted(kwargs.items())
         }
-        key_hash = hashlib.md5(json.dumps(key_data, sort_keys=True, default=str).encode()).hexdigest()
-        return f"{prefix}:{key_hash}"
+        key_hash = hashlib.md5(json.dumps(key_data, sort_keys=True, default=_fingerprint).encode()).hexdigest()
+        return self.namespaced_key(prefix, key_hash)
+    
+    def get_generation(self, namespace: str) -> int:
+        """
+        Get the current generation of a cache namespace.
+        
+        Generations are read once (from Redis, or the disk tier when Redis is
+        unavailable) and then kept locally.
+        
+        Args:
+            namespace: Namespace (key prefix)
+            
+        Returns:
+            int: Generation number
+        """
+        with self._cache_lock:
+            generation = self._generations.get(namespace)
+        if generation is not None:
+            return generation
+        
+        generation = 0
+        if self.use_redis and self.redis_client:
+            try:
+                generation = int(self.redis_client.get(GENERATION_KEY.format(namespace)) or 0)
+            except Exception as e:
+                self.logger.warning(f"Redis generation read failed: {e}")
+        elif self.disk_cache:
+            try:
+                generation = self.disk_cache.get_generation(namespace) or 0
+            except Exception as e:
+                self.logger.warning(f"Disk generation read failed: {e}")
+        
+        with self._cache_lock:
+            return self._generations.setdefault(namespace, generation)
+    
+    def namespaced_key(self, namespace: str, *parts: Any) -> str:
+        """
+        Build a key within a namespace, tagged with the namespace generation.
+        
+        Args:
+            namespace: Namespace (key prefix)
+            *parts: Remaining key components
+            
+        Returns:
+            str: Key of the form namespace:g<generation>:part1:part2...
+        """
+        return ':'.join([namespace, f"g{self.get_generation(namespace)}", *map(str, parts)])
+    
+    def invalidate_namespace(self, namespace: str) -> int:
+        """
+        Invalidate every key of a namespace by bumping its generation.
+        
+        This is O(1) in Redis; keys of older generations become unreachable
+        and expire or are reclaimed by reclaim_namespace_keys().
+        
+        Args:
+            namespace: Namespace (key prefix)
+            
+        Returns:
+            int: New generation number
+        """
+        generation = None
+        if self.use_redis and self.redis_client:
+            try:
+                generation = int(self.redis_client.incr(GENERATION_KEY.format(namespace)))
+                self._publish_invalidation(self.redis_client, namespace=namespace, generation=generation)
+            except Exception as e:
+                self.logger.warning(f"Redis generation bump failed: {e}")
+        
+        with self._cache_lock:
+            if generation is None:
+                generation = self.get_generation(namespace) + 1
+            self._generations[namespace] = generation
+            
+            # Persist so disk entries of older generations stay hidden after a restart
+            if self.disk_cache:
+                try:
+                    self.disk_cache.set_generation(namespace, generation)
+                except Exception as e:
+                    self.logger.warning(f"Disk generation write failed: {e}")
+            
+            # Drop local copies right away
+            self._delete_memory_pattern(f"{_escape_glob(namespace)}:*", reason='invalidated')
+        
+        return generation
+    
+    def reclaim_namespace_keys(self, namespace: str, batch_size: int = 500) -> int:
+        """
+        Delete Redis keys left behind by older generations of a namespace.
+        
+        Uses incremental SCAN and UNLINK in batches so Redis is never blocked.
+        
+        Args:
+            namespace: Namespace (key prefix)
+            batch_size: Keys per SCAN step and per UNLINK
+            
+        Returns:
+            int: Number of keys deleted
+        """
+        if not (self.use_redis and self.redis_client):
+            return 0
+        
+        try:
+            current = int(self.redis_client.get(GENERATION_KEY.format(namespace)) or 0)
+            prefix = f"{namespace}:g"
+            
+            def is_stale(key: str) -> bool:
+                generation = key[len(prefix):].split(':', 1)[0]
+                return generation.isdigit() and int(generation) < current
+            
+            return self._scan_delete(f"{_escape_glob(namespace)}:g*", batch_size, is_stale)
+        except Exception as e:
+            self.logger.warning(f"Redis namespace reclaim failed: {e}")
+            return 0
+    
+    def _scan_delete(self, match: str, batch_size: int = 500,
+                     predicate: Optional[Callable[[str], bool]] = None) -> int:
+        """Delete Redis keys matching a glob with incremental SCAN + UNLINK."""
+        deleted = 0
+        batch = []
+        for raw_key in self.redis_client.scan_iter(match=match, count=batch_size):
+            key = raw_key.decode('utf-8', 'replace') if isinstance(raw_key, bytes) else raw_key
+            if predicate is not None and not predicate(key):
+                continue
+            batch.append(raw_key)
+            if len(batch) >= batch_size:
+                deleted += self.redis_client.unlink(*batch)
+                batch = []
+        if batch:
+            deleted += self.redis_client.unlink(*batch)
+        return deleted
     
     def _serialize_value(self, value: Any) -> bytes:
-        """Serialize value for storage."""
+        """Serialize value for storage as a typed, optionally compressed envelope."""
         try:
-            # Try JSON first for simple types
+            payload = None
             if isinstance(value, (str, int, float, bool, list, dict)):
-                return json.dumps(value).encode('utf-8')
-            else:
-                # Use pickle for complex objects
-                return pickle.dumps(value)
+                # JSON for simple types, pickle if they hold anything else
+                try:
+                    fmt, payload = FORMAT_JSON, json.dumps(value).encode('utf-8')
+                except (TypeError, ValueError):
+                    payload = None
+            elif isinstance(value, (pd.DataFrame, pd.Series, np.ndarray)):
+                fmt, payload = FORMAT_BUFFERS, _encode_buffers(value)
+            
+            if payload is None:
+                fmt, payload = FORMAT_PICKLE, pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+            
+            codec = CODEC_NONE
+            if self._compressor and len(payload) >= self.compression_min_bytes:
+                code, compress = self._compressor
+                compressed = compress(payload)
+                if len(compressed) < len(payload):
+                    codec, payload = code, compressed
+            
+            return bytes((fmt, codec)) + payload
         except Exception as e:
             self.logger.error(f"Failed to serialize value: {e}")
             raise
@@ -117,42 +650,115 @@ class CacheManager:
     def _deserialize_value(self, data: bytes) -> Any:
         """Deserialize value from storage."""
         try:
-            # Try JSON first
-            try:
-                return json.loads(data.decode('utf-8'))
-            except (json.JSONDecodeError, UnicodeDecodeError):
-                # Fall back to pickle
-                return pickle.loads(data)
+            fmt = data[0] if data else None
+            if fmt not in (FORMAT_JSON, FORMAT_PICKLE, FORMAT_BUFFERS):
+                # Legacy payload written without an envelope
+                try:
+                    return json.loads(data.decode('utf-8'))
+                except (json.JSONDecodeError, UnicodeDecodeError):
+                    return pickle.loads(data)
+            
+            body = memoryview(data)[2:]
+            codec = data[1]
+            if codec != CODEC_NONE:
+                if codec not in self._decompressors:
+                    raise ValueError(f"Unsupported compression codec {codec}")
+                body = self._decompressors[codec](body)
+            
+            if fmt == FORMAT_JSON:
+                return json.loads(bytes(body))
+            if fmt == FORMAT_BUFFERS:
+                return _decode_buffers(body)
+            return pickle.loads(body)
         except Exception as e:
             self.logger.error(f"Failed to deserialize value: {e}")
             raise
     
+    def _store_memory_entry(self, entry: CacheEntry):
+        """Insert or replace a memory cache entry as most recently used."""
+        with self._cache_lock:
+            self._remove_memory_entry(entry.key)
+            self._memory_cache[entry.key] = entry
+            self._memory_bytes += entry.size_bytes
+            prefix = _key_prefix(entry.key)
+            self._prefix_bytes[prefix] = self._prefix_bytes.get(prefix, 0) + entry.size_bytes
+            self._prefix_entries[prefix] = self._prefix_entries.get(prefix, 0) + 1
+            if entry.expires_at:
+                heapq.heappush(self._expiry_heap, (entry.expires_at.timestamp(), entry.key))
+            self._cleanup_memory_cache()
+    
+    def _remove_memory_entry(self, key: str, reason: Optional[str] = None) -> Optional[CacheEntry]:
+        """Remove a memory cache entry, keeping the byte total in sync (reason counts it as an eviction)."""
+        with self._cache_lock:
+            entry = self._memory_cache.pop(key, None)
+            if entry is not None:
+                self._release_entry(entry, reason)
+            return entry
+    
+    def _release_entry(self, entry: CacheEntry, reason: Optional[str] = None):
+        """Subtract a removed entry from the byte and per-prefix totals."""
+        if reason:
+            self.metrics.record_eviction(_key_prefix(entry.key), reason)
+        self._memory_bytes -= entry.size_bytes
+        prefix = _key_prefix(entry.key)
+        remaining = self._prefix_entries.get(prefix, 0) - 1
+        if remaining > 0:
+            self._prefix_entries[prefix] = remaining
+            self._prefix_bytes[prefix] -= entry.size_bytes
+        else:
+            self._prefix_entries.pop(prefix, None)
+            self._prefix_bytes.pop(prefix, None)
+    
+    def _delete_memory_pattern(self, pattern: str, reason: Optional[str] = None) -> int:
+        """Remove memory cache entries whose keys match a glob pattern."""
+        with self._cache_lock:
+            keys_to_delete = [key for key in self._memory_cache if fnmatch.fnmatchcase(key, pattern)]
+            for key in keys_to_delete:
+                self._remove_memory_entry(key, reason)
+        return len(keys_to_delete)
+    
+    def _clear_memory(self):
+        """Remove every memory cache entry."""
+        with self._cache_lock:
+            self._memory_cache.clear()
+            self._expiry_heap = []
+            self._memory_bytes = 0
+            self._prefix_bytes.clear()
+            self._prefix_entries.clear()
+    
     def _cleanup_memory_cache(self):
-        """Clean up expired entries and enforce size limits."""
+        """Clean up expired entries and enforce size limits (amortized O(1) per entry)."""
         with self._cache_lock:
-            now = datetime.now()
+            now = datetime.now().timestamp()
+            heap = self._expiry_heap
             
-            # Remove expired entries
-            expired_keys = [
-                key for key, entry in self._memory_cache.items()
-                if entry.expires_at and entry.expires_at < now
-            ]
-            
-            for key in expired_keys:
-                del self._memory_cache[key]
-            
-            # Enforce size limit (LRU eviction)
-            if len(self._memory_cache) > self.memory_cache_size:
-                # Sort by last accessed time (oldest first)
-                sorted_entries = sorted(
-                    self._memory_cache.items(),
-                    key=lambda x: x[1].last_accessed or x[1].created_at
-                )
-                
-                # Remove oldest entries
-                excess_count = len(self._memory_cache) - self.memory_cache_size
-                for key, _ in sorted_entries[:excess_count]:
-                    del self._memory_cache[key]
+            # Remove expired entries; heap items whose entry was replaced or
+            # deleted no longer match and are simply dropped
+            while heap and heap[0][0] < now:
+                expires_ts, key = heapq.heappop(heap)
+                entry = self._memory_cache.get(key)
+                if entry and entry.expires_at and entry.expires_at.timestamp() == expires_ts:
+                    self._remove_memory_entry(key, reason='expired')
+            
+            # Rebuild the heap when stale items dominate it
+            if len(heap) > 2 * len(self._memory_cache) + 64:
+                self._expiry_heap = heap = [
+                    (entry.expires_at.timestamp(), key)
+                    for key, entry in self._memory_cache.items() if entry.expires_at
+                ]
+                heapq.heapify(heap)
+            
+            # Enforce count and byte limits (LRU eviction from the front)
+            max_bytes = self.memory_cache_max_bytes
+            while self._memory_cache:
+                if len(self._memory_cache) > self.memory_cache_size:
+                    reason = 'capacity'
+                elif max_bytes is not None and self._memory_bytes > max_bytes:
+                    reason = 'bytes'
+                else:
+                    break
+                _, evicted = self._memory_cache.popitem(last=False)
+                self._release_entry(evicted, reason)
     
     def set(self, key: str, value: Any, ttl: Optional[int] = None) -> bool:
         """
@@ -163,6 +769,177 @@ class CacheManager:
             value: Value to cache
             ttl: Time-to-live in seconds (None for default)
             
+        Returns:
+            bool: Success status
+        """
+        return self.set_many({key: value}, ttl)
+    
+    def _store_local_copy(self, key: str, value: Any, expires_at: Optional[datetime]):
+        """Keep a memory copy of a value read from a slower tier."""
+        now = datetime.now()
+        self._store_memory_entry(CacheEntry(
+            key=key,
+            value=value,
+            created_at=now,
+            expires_at=expires_at,
+            access_count=1,
+            last_accessed=now,
+            size_bytes=_estimate_size(value)
+        ))
+    
+    def _get_from_memory(self, keys: List[str]) -> Dict[str, Any]:
+        """Read unexpired memory entries, marking them most recently used."""
+        results = {}
+        now = datetime.now()
+        with self._cache_lock:
+            for key in keys:
+                entry = self._memory_cache.get(key)
+                if entry is None:
+                    continue
+                if entry.expires_at and entry.expires_at < now:
+                    self._remove_memory_entry(key, reason='expired')
+                    continue
+                self._memory_cache.move_to_end(key)
+                entry.access_count += 1
+                entry.last_accessed = now
+                results[key] = entry.value
+        return results
+    
+    def _get_from_disk(self, keys: List[str]) -> Dict[str, Any]:
+        """Read keys from the disk tier, copying hits into memory."""
+        results = {}
+        if not (self.disk_cache and keys):
+            return results
+        
+        try:
+            for key, (data, expires_ts) in self.disk_cache.get_many(keys).items():
+                value = self._deserialize_value(data)
+                expires_at = datetime.fromtimestamp(expires_ts) if expires_ts else None
+                self._store_local_copy(key, value, expires_at)
+                results[key] = value
+        except Exception as e:
+            self.logger.warning(f"Disk cache get failed: {e}")
+        return results
+    
+    def _get_from_redis(self, keys: List[str]) -> Dict[str, Any]:
+        """Read keys from Redis in one round trip, copying hits into the local tiers."""
+        results = {}
+        if not (self.use_redis and self.redis_client and keys):
+            return results
+        
+        try:
+            pipeline = self.redis_client.pipeline(transaction=False)
+            self._queue_redis_reads(pipeline, keys)
+            replies = pipeline.execute()
+        except Exception as e:
+            self.logger.warning(f"Redis get failed: {e}")
+            return results
+        return self._accept_redis_replies(keys, replies)
+    
+    @staticmethod
+    def _queue_redis_reads(pipeline: Any, keys: List[str]):
+        """Queue MGET plus a PTTL per key (sync or asyncio pipeline)."""
+        pipeline.mget(keys)
+        for key in keys:
+            pipeline.pttl(key)
+    
+    def _accept_redis_replies(self, keys: List[str], replies: List[Any]) -> Dict[str, Any]:
+        """Deserialize Redis read replies, copying hits into the local tiers."""
+        results = {}
+        for key, data, ttl_ms in zip(keys, replies[0], replies[1:]):
+            if data is None:
+                continue
+            
+            # Local copies expire with the Redis key
+            value = self._deserialize_value(data)
+            expires_at = datetime.now() + timedelta(milliseconds=ttl_ms) if ttl_ms and ttl_ms > 0 else None
+            self._store_local_copy(key, value, expires_at)
+            if self.disk_cache:
+                try:
+                    self.disk_cache.set(key, data, expires_at.timestamp() if expires_at else None)
+                except Exception as e:
+                    self.logger.warning(f"Disk cache set failed: {e}")
+            results[key] = value
+        return results
+    
+    def _read_tiers(self, keys: List[str]) -> Dict[str, Any]:
+        """Look keys up tier by tier, recording hits per tier and misses per prefix."""
+        start = time.perf_counter()
+        results = {}
+        hits: Dict[str, Dict[str, int]] = {}
+        for tier, read_tier in (('memory', self._get_from_memory),
+                                ('disk', self._get_from_disk),
+                                ('redis', self._get_from_redis)):
+            missing = [key for key in keys if key not in results]
+            if not missing:
+                break
+            found = read_tier(missing)
+            self._count_tier_hits(tier, found, hits)
+            results.update(found)
+        self._record_reads(keys, results, hits, time.perf_counter() - start)
+        return results
+    
+    @staticmethod
+    def _count_tier_hits(tier: str, found: Dict[str, Any], hits: Dict[str, Dict[str, int]]):
+        """Add the hits of one tier to per-prefix counts."""
+        for key in found:
+            tier_hits = hits.setdefault(_key_prefix(key), {})
+            tier_hits[tier] = tier_hits.get(tier, 0) + 1
+    
+    def _record_reads(self, keys: List[str], results: Dict[str, Any],
+                      hits: Dict[str, Dict[str, int]], elapsed: float):
+        """Record one lookup call in the telemetry of each prefix involved."""
+        misses: Dict[str, int] = {}
+        for key in keys:
+            prefix = _key_prefix(key)
+            misses[prefix] = misses.get(prefix, 0) + (key not in results)
+        for prefix, miss_count in misses.items():
+            self.metrics.record_get(prefix, hits.get(prefix, {}), miss_count, elapsed)
+    
+    def get(self, key: str, default: Any = None) -> Any:
+        """
+        Get cache value (memory, then disk, then Redis).
+        
+        Args:
+            key: Cache key
+            default: Default value if not found
+            
+        Returns:
+            Cached value or default
+        """
+        try:
+            found = self._read_tiers([key])
+            return found[key] if key in found else default
+            
+        except Exception as e:
+            self.logger.error(f"Failed to get cache key {key}: {e}")
+            return default
+    
+    def get_many(self, keys: List[str]) -> Dict[str, Any]:
+        """
+        Get several cache values (memory, then disk, then one Redis round trip).
+        
+        Args:
+            keys: Cache keys
+            
+        Returns:
+            Dict of found keys to values (missing keys are omitted)
+        """
+        try:
+            return self._read_tiers(keys)
+            
+        except Exception as e:
+            self.logger.error(f"Failed to get {len(keys)} cache keys: {e}")
+            return {}
+    
+    def set_many(self, items: Dict[str, Any], ttl: Optional[int] = None) -> bool:
+        """
+        Set several cache values, writing Redis with one pipeline.
+        
+        Args:
+            items: Dict of cache keys to values
+            ttl: Time-to-live in seconds (None for default)
+            
         Returns:
             bool: Success status
         """
@@ -170,42 +947,190 @@ class CacheManager:
             ttl = self.default_ttl
         
         try:
-            serialized_value = self._serialize_value(value)
-            expires_at = datetime.now() + timedelta(seconds=ttl) if ttl > 0 else None
+            start = time.perf_counter()
+            now = datetime.now()
+            expires_at = now + timedelta(seconds=ttl) if ttl > 0 else None
+            payloads = self._serialize_items(items)
             
-            # Store in Redis if available
-            if self.use_redis and self.redis_client:
+            # Disk first, so peers sharing the file see the new values when the event arrives
+            self._write_disk(payloads, expires_at)
+            
+            # Store in Redis if available, with the invalidation event in the same pipeline
+            if self.use_redis and self.redis_client and payloads:
                 try:
-                    if ttl > 0:
-                        self.redis_client.setex(key, ttl, serialized_value)
-                    else:
-                        self.redis_client.set(key, serialized_value)
+                    pipeline = self.redis_client.pipeline(transaction=False)
+                    self._queue_redis_writes(pipeline, payloads, ttl)
+                    pipeline.execute()
                 except Exception as e:
-                    self.logger.warning(f"Redis set failed, using memory cache: {e}")
-            
-            # Store in memory cache
-            with self._cache_lock:
-                self._memory_cache[key] = CacheEntry(
-                    key=key,
-                    value=value,
-                    created_at=datetime.now(),
-                    expires_at=expires_at,
-                    size_bytes=len(serialized_value)
-                )
-                
-                # Cleanup if needed
-                if len(self._memory_cache) % 100 == 0:  # Periodic cleanup
-                    self._cleanup_memory_cache()
+                    self.logger.warning(f"Redis set failed, using local cache: {e}")
             
+            self._write_memory(items, now, expires_at)
+            self._record_writes(items, payloads, time.perf_counter() - start)
             return True
             
         except Exception as e:
-            self.logger.error(f"Failed to set cache key {key}: {e}")
+            self.logger.error(f"Failed to set {len(items)} cache keys: {e}")
             return False
     
-    def get(self, key: str, default: Any = None) -> Any:
+    def _serialize_items(self, items: Dict[str, Any]) -> Dict[str, bytes]:
+        """Serialize values for the disk/Redis tiers (memory-only entries are never serialized)."""
+        if items and ((self.use_redis and self.redis_client) or self.disk_cache):
+            return {key: self._serialize_value(value) for key, value in items.items()}
+        return {}
+    
+    def _queue_redis_writes(self, pipeline: Any, payloads: Dict[str, bytes], ttl: int):
+        """Queue SET/SETEX per payload plus the invalidation event (sync or asyncio pipeline)."""
+        for key, payload in payloads.items():
+            if ttl > 0:
+                pipeline.setex(key, ttl, payload)
+            else:
+                pipeline.set(key, payload)
+        self._publish_invalidation(pipeline, keys=list(payloads))
+    
+    def _write_disk(self, payloads: Dict[str, bytes], expires_at: Optional[datetime]):
+        """Store serialized payloads on disk."""
+        if self.disk_cache and payloads:
+            try:
+                self.disk_cache.set_many(payloads, expires_at.timestamp() if expires_at else None)
+            except Exception as e:
+                self.logger.warning(f"Disk cache set failed: {e}")
+    
+    def _write_memory(self, items: Dict[str, Any], now: datetime, expires_at: Optional[datetime]):
+        """Store values in the memory cache."""
+        for key, value in items.items():
+            self._store_memory_entry(CacheEntry(
+                key=key,
+                value=value,
+                created_at=now,
+                expires_at=expires_at,
+                size_bytes=_estimate_size(value)
+            ))
+    
+    def _record_writes(self, items: Dict[str, Any], payloads: Dict[str, bytes], elapsed: float):
+        """Record one write call in the telemetry of each prefix involved."""
+        written: Dict[str, List[int]] = {}
+        for key in items:
+            counts = written.setdefault(_key_prefix(key), [0, 0])
+            counts[0] += 1
+            counts[1] += len(payloads.get(key, b''))
+        for prefix, (count, nbytes) in written.items():
+            self.metrics.record_set(prefix, count, nbytes, elapsed)
+    
+    def get_or_compute(self, key: str, compute: Callable[[], Any],
+                       ttl: Optional[int] = None,
+                       refresh_ahead: Optional[float] = None) -> Any:
         """
-        Get cache value.
+        Get cache value, computing it once on a miss.
+        
+        Concurrent callers that miss on the same key wait for a single
+        computation instead of each running compute(). When refresh-ahead is
+        enabled, a hit older than that fraction of its TTL is returned as-is
+        while the entry is recomputed in the background.
+        
+        Args:
+            key: Cache key
+            compute: Zero-argument callable producing the value
+            ttl: Time-to-live in seconds (None for default)
+            refresh_ahead: Fraction of TTL that triggers a background refresh
+                (None to use refresh_ahead_fraction)
+            
+        Returns:
+            Cached or freshly computed value
+        """
+        value = self.get(key)
+        if value is not None:
+            fraction = self.refresh_ahead_fraction if refresh_ahead is None else refresh_ahead
+            if fraction and self._needs_refresh(key, fraction):
+                self._refresh_in_background(key, compute, ttl)
+            return value
+        
+        return self._compute_single_flight(key, compute, ttl, check_cache=True)
+    
+    def _needs_refresh(self, key: str, fraction: float) -> bool:
+        """Whether a memory entry has lived past the given fraction of its TTL."""
+        with self._cache_lock:
+            entry = self._memory_cache.get(key)
+            if entry is None or entry.expires_at is None:
+                return False
+            lifetime = (entry.expires_at - entry.created_at).total_seconds()
+            age = (datetime.now() - entry.created_at).total_seconds()
+        return age >= fraction * lifetime
+    
+    def _refresh_in_background(self, key: str, compute: Callable[[], Any], ttl: Optional[int]):
+        """Recompute an entry on a daemon thread unless it is already being computed."""
+        with self._inflight_lock:
+            if key in self._inflight:
+                return
+        
+        def refresh():
+            try:
+                self._compute_single_flight(key, compute, ttl, check_cache=False)
+            except Exception as e:
+                self.logger.warning(f"Refresh-ahead failed for cache key {key}: {e}")
+        
+        threading.Thread(target=refresh, name=f"cache-refresh-{key}", daemon=True).start()
+    
+    def _compute_single_flight(self, key: str, compute: Callable[[], Any],
+                               ttl: Optional[int], check_cache: bool) -> Any:
+        """Run compute() for a key once; concurrent callers share the outcome."""
+        with self._inflight_lock:
+            flight = self._inflight.get(key)
+            is_leader = flight is None
+            if is_leader:
+                flight = self._inflight[key] = _InFlight()
+        
+        if not is_leader:
+            flight.event.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+        
+        try:
+            # A previous leader may have filled the entry since our miss
+            value = self.get(key) if check_cache else None
+            if value is None:
+                value = compute()
+                self.set(key, value, ttl)
+            flight.result = value
+            return value
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._inflight_lock:
+                self._inflight.pop(key, None)
+            flight.event.set()
+    
+    async def _aget_from_disk(self, keys: List[str]) -> Dict[str, Any]:
+        """Read keys from the disk tier on a worker thread."""
+        if not (self.disk_cache and keys):
+            return {}
+        return await asyncio.to_thread(self._get_from_disk, keys)
+    
+    async def _aget_from_redis(self, keys: List[str]) -> Dict[str, Any]:
+        """Read keys from Redis in one asyncio round trip, copying hits into the local tiers."""
+        client = self._get_async_redis()
+        if not (client and keys):
+            return {}
+        
+        try:
+            pipeline = client.pipeline(transaction=False)
+            self._queue_redis_reads(pipeline, keys)
+            replies = await pipeline.execute()
+        except Exception as e:
+            self.logger.warning(f"Async Redis get failed: {e}")
+            return {}
+        
+        if self.disk_cache:
+            return await asyncio.to_thread(self._accept_redis_replies, keys, replies)
+        return self._accept_redis_replies(keys, replies)
+    
+    async def aget(self, key: str, default: Any = None) -> Any:
+        """
+        Get cache value without blocking the event loop.
+        
+        Shares the memory tier, keys and serialization with get(); Redis is
+        read through redis.asyncio and the disk tier on a worker thread.
         
         Args:
             key: Cache key
@@ -214,48 +1139,159 @@ class CacheManager:
         Returns:
             Cached value or default
         """
+        found = await self.aget_many([key])
+        return found[key] if key in found else default
+    
+    async def aget_many(self, keys: List[str]) -> Dict[str, Any]:
+        """
+        Get several cache values (memory, then disk, then one Redis round trip).
+        
+        Args:
+            keys: Cache keys
+            
+        Returns:
+            Dict of found keys to values (missing keys are omitted)
+        """
+        results = {}
         try:
-            # Try memory cache first
-            with self._cache_lock:
-                if key in self._memory_cache:
-                    entry = self._memory_cache[key]
-                    
-                    # Check expiration
-                    if entry.expires_at and entry.expires_at < datetime.now():
-                        del self._memory_cache[key]
-                    else:
-                        # Update access info
-                        entry.access_count += 1
-                        entry.last_accessed = datetime.now()
-                        return entry.value
-            
-            # Try Redis if available
-            if self.use_redis and self.redis_client:
+            start = time.perf_counter()
+            hits: Dict[str, Dict[str, int]] = {}
+            for tier, read_tier in (('memory', self._get_from_memory),
+                                    ('disk', self._aget_from_disk),
+                                    ('redis', self._aget_from_redis)):
+                missing = [key for key in keys if key not in results]
+                if not missing:
+                    break
+                found = read_tier(missing)
+                if asyncio.iscoroutine(found):
+                    found = await found
+                self._count_tier_hits(tier, found, hits)
+                results.update(found)
+            self._record_reads(keys, results, hits, time.perf_counter() - start)
+            return results
+            
+        except Exception as e:
+            self.logger.error(f"Failed to get {len(keys)} cache keys: {e}")
+            return results
+    
+    async def aset(self, key: str, value: Any, ttl: Optional[int] = None) -> bool:
+        """
+        Set cache value without blocking the event loop.
+        
+        Args:
+            key: Cache key
+            value: Value to cache
+            ttl: Time-to-live in seconds (None for default)
+            
+        Returns:
+            bool: Success status
+        """
+        return await self.aset_many({key: value}, ttl)
+    
+    async def aset_many(self, items: Dict[str, Any], ttl: Optional[int] = None) -> bool:
+        """
+        Set several cache values, writing Redis with one asyncio pipeline.
+        
+        Args:
+            items: Dict of cache keys to values
+            ttl: Time-to-live in seconds (None for default)
+            
+        Returns:
+            bool: Success status
+        """
+        if ttl is None:
+            ttl = self.default_ttl
+        
+        try:
+            start = time.perf_counter()
+            now = datetime.now()
+            expires_at = now + timedelta(seconds=ttl) if ttl > 0 else None
+            payloads = self._serialize_items(items)
+            
+            # Disk first, so peers sharing the file see the new values when the event arrives
+            if self.disk_cache and payloads:
+                await asyncio.to_thread(self._write_disk, payloads, expires_at)
+            
+            client = self._get_async_redis()
+            if client and payloads:
                 try:
-                    data = self.redis_client.get(key)
-                    if data is not None:
-                        value = self._deserialize_value(data)
-                        
-                        # Store in memory cache for faster access
-                        with self._cache_lock:
-                            self._memory_cache[key] = CacheEntry(
-                                key=key,
-                                value=value,
-                                created_at=datetime.now(),
-                                expires_at=None,  # Redis handles expiration
-                                access_count=1,
-                                last_accessed=datetime.now()
-                            )
-                        
-                        return value
+                    pipeline = client.pipeline(transaction=False)
+                    self._queue_redis_writes(pipeline, payloads, ttl)
+                    await pipeline.execute()
                 except Exception as e:
-                    self.logger.warning(f"Redis get failed: {e}")
+                    self.logger.warning(f"Async Redis set failed, using local cache: {e}")
             
-            return default
+            self._write_memory(items, now, expires_at)
+            self._record_writes(items, payloads, time.perf_counter() - start)
+            return True
             
         except Exception as e:
-            self.logger.error(f"Failed to get cache key {key}: {e}")
-            return default
+            self.logger.error(f"Failed to set {len(items)} cache keys: {e}")
+            return False
+    
+    async def aget_or_compute(self, key: str, compute: Callable[[], Awaitable[Any]],
+                              ttl: Optional[int] = None,
+                              refresh_ahead: Optional[float] = None) -> Any:
+        """
+        Get cache value, awaiting compute() once on a miss.
+        
+        Same semantics as get_or_compute(): concurrent coroutines that miss
+        on the same key share one computation, and refresh-ahead recomputes
+        aging entries in a background task.
+        
+        Args:
+            key: Cache key
+            compute: Zero-argument coroutine function producing the value
+            ttl: Time-to-live in seconds (None for default)
+            refresh_ahead: Fraction of TTL that triggers a background refresh
+                (None to use refresh_ahead_fraction)
+            
+        Returns:
+            Cached or freshly computed value
+        """
+        value = await self.aget(key)
+        if value is not None:
+            fraction = self.refresh_ahead_fraction if refresh_ahead is None else refresh_ahead
+            if fraction and self._needs_refresh(key, fraction) and key not in self._async_inflight:
+                task = asyncio.ensure_future(self._acompute_single_flight(key, compute, ttl, check_cache=False))
+                self._async_tasks.add(task)
+                task.add_done_callback(self._on_refresh_done)
+            return value
+        
+        return await self._acompute_single_flight(key, compute, ttl, check_cache=True)
+    
+    def _on_refresh_done(self, task: asyncio.Task):
+        """Forget a finished refresh-ahead task, logging its failure."""
+        self._async_tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            self.logger.warning(f"Refresh-ahead failed: {task.exception()}")
+    
+    async def _acompute_single_flight(self, key: str, compute: Callable[[], Awaitable[Any]],
+                                      ttl: Optional[int], check_cache: bool) -> Any:
+        """Await compute() for a key once per event loop; concurrent callers share the outcome."""
+        flight = self._async_inflight.get(key)
+        if flight is not None:
+            # Shielded so a cancelled waiter does not cancel the shared result
+            return await asyncio.shield(flight)
+        
+        flight = self._async_inflight[key] = asyncio.get_running_loop().create_future()
+        try:
+            # A previous leader may have filled the entry since our miss
+            value = await self.aget(key) if check_cache else None
+            if value is None:
+                value = await compute()
+                await self.aset(key, value, ttl)
+            flight.set_result(value)
+            return value
+        except asyncio.CancelledError:
+            flight.cancel()
+            raise
+        except BaseException as e:
+            flight.set_exception(e)
+            flight.exception()  # Mark retrieved when nobody else is waiting
+            raise
+        finally:
+            self._async_inflight.pop(key, None)
     
     def delete(self, key: str) -> bool:
         """
@@ -264,34 +1300,103 @@ class CacheManager:
         Args:
             key: Cache key
             
+        Returns:
+            bool: Success status
+        """
+        return self.delete_many([key])
+    
+    def delete_many(self, keys: List[str]) -> bool:
+        """
+        Delete several cache entries with a single Redis DEL.
+        
+        Args:
+            keys: Cache keys
+            
         Returns:
             bool: Success status
         """
         try:
             # Delete from memory cache
-            with self._cache_lock:
-                if key in self._memory_cache:
-                    del self._memory_cache[key]
+            for key in keys:
+                self._remove_memory_entry(key)
+            
+            # Delete from disk
+            if keys and self.disk_cache:
+                try:
+                    self.disk_cache.delete_many(list(keys))
+                except Exception as e:
+                    self.logger.warning(f"Disk cache delete failed: {e}")
             
             # Delete from Redis
-            if self.use_redis and self.redis_client:
+            if keys and self.use_redis and self.redis_client:
                 try:
-                    self.redis_client.delete(key)
+                    self.redis_client.delete(*keys)
+                    self._publish_invalidation(self.redis_client, keys=list(keys))
                 except Exception as e:
                     self.logger.warning(f"Redis delete failed: {e}")
             
             return True
             
         except Exception as e:
-            self.logger.error(f"Failed to delete cache key {key}: {e}")
+            self.logger.error(f"Failed to delete {len(keys)} cache keys: {e}")
             return False
     
+    def cleanup(self):
+        """Remove expired memory and disk cache entries (Redis expires keys itself)."""
+        self._cleanup_memory_cache()
+        if self.disk_cache:
+            try:
+                self.disk_cache.cleanup()
+            except Exception as e:
+                self.logger.warning(f"Disk cache cleanup failed: {e}")
+    
+    def delete_pattern(self, pattern: str) -> int:
+        """
+        Delete cache entries whose keys match a glob pattern.
+        
+        Redis keys are found with incremental SCAN rather than KEYS.
+        
+        Args:
+            pattern: Glob pattern (e.g. 'latest_data:*')
+            
+        Returns:
+            int: Number of entries deleted (memory and Redis)
+        """
+        deleted = 0
+        try:
+            # Memory cache
+            deleted += self._delete_memory_pattern(pattern)
+            
+            # Disk cache
+            if self.disk_cache:
+                try:
+                    deleted += self.disk_cache.delete_pattern(pattern)
+                except Exception as e:
+                    self.logger.warning(f"Disk cache pattern delete failed: {e}")
+            
+            # Redis cache
+            if self.use_redis and self.redis_client:
+                try:
+                    deleted += self._scan_delete(pattern)
+                    self._publish_invalidation(self.redis_client, pattern=pattern)
+                except Exception as e:
+                    self.logger.warning(f"Redis pattern delete failed: {e}")
+            
+            return deleted
+            
+        except Exception as e:
+            self.logger.error(f"Failed to delete cache pattern {pattern}: {e}")
+            return deleted
+    
     def clear(self, pattern: Optional[str] = None) -> bool:
         """
         Clear cache entries.
         
+        Namespace generation counters are kept, so namespaced keys stay
+        consistent across processes.
+        
         Args:
-            pattern: Key pattern to match (None for all)
+            pattern: Key substring to match (None for all)
             
         Returns:
             bool: Success status
@@ -299,35 +1404,24 @@ class CacheManager:
         try:
             if pattern:
                 # Clear matching keys
-                keys_to_delete = []
-                
-                # Memory cache
-                with self._cache_lock:
-                    for key in self._memory_cache:
-                        if pattern in key:
-                            keys_to_delete.append(key)
-                    
-                    for key in keys_to_delete:
-                        del self._memory_cache[key]
+                self.delete_pattern(f"*{_escape_glob(pattern)}*")
+            else:
+                # Clear all
+                self._clear_memory()
                 
-                # Redis cache
-                if self.use_redis and self.redis_client:
+                if self.disk_cache:
                     try:
-                        redis_keys = self.redis_client.keys(f"*{pattern}*")
-                        if redis_keys:
-                            self.redis_client.delete(*redis_keys)
+                        self.disk_cache.clear()
                     except Exception as e:
-                        self.logger.warning(f"Redis pattern delete failed: {e}")
-            else:
-                # Clear all
-                with self._cache_lock:
-                    self._memory_cache.clear()
+                        self.logger.warning(f"Disk cache clear failed: {e}")
                 
                 if self.use_redis and self.redis_client:
                     try:
-                        self.redis_client.flushdb()
+                        generation_prefix = GENERATION_KEY.format('')
+                        self._scan_delete('*', predicate=lambda key: not key.startswith(generation_prefix))
+                        self._publish_invalidation(self.redis_client, clear=True)
                     except Exception as e:
-                        self.logger.warning(f"Redis flush failed: {e}")
+                        self.logger.warning(f"Redis clear failed: {e}")
             
             return True
             
@@ -340,7 +1434,12 @@ class CacheManager:
         with self._cache_lock:
             memory_stats = {
                 'entries': len(self._memory_cache),
-                'total_size_bytes': sum(entry.size_bytes for entry in self._memory_cache.values()),
+                'total_size_bytes': self._memory_bytes,
+                'max_bytes': self.memory_cache_max_bytes,
+                'prefixes': {
+                    prefix: {'entries': self._prefix_entries[prefix], 'size_bytes': size}
+                    for prefix, size in sorted(self._prefix_bytes.items(), key=lambda item: -item[1])
+                },
                 'total_access_count': sum(entry.access_count for entry in self._memory_cache.values())
             }
         
@@ -355,48 +1454,94 @@ class CacheManager:
             except Exception as e:
                 self.logger.warning(f"Failed to get Redis stats: {e}")
         
+        disk_stats = {}
+        if self.disk_cache:
+            try:
+                disk_stats = self.disk_cache.get_stats()
+            except Exception as e:
+                self.logger.warning(f"Failed to get disk cache stats: {e}")
+        
         return {
             'memory_cache': memory_stats,
+            'disk_cache': disk_stats,
             'redis_cache': redis_stats,
-            'redis_available': self.use_redis
+            'redis_available': self.use_redis,
+            'telemetry': self.metrics.get_stats()
         }
+    
+    def snapshot_stats(self) -> Dict[str, Any]:
+        """
+        Get telemetry accumulated since the previous snapshot.
+        
+        Meant to be called periodically (e.g. from health checks) so hit
+        ratios reflect recent traffic rather than the whole process lifetime.
+        
+        Returns:
+            Dict with per-prefix and overall hits, misses, hit ratio,
+            latency histograms, evictions and serialized bytes
+        """
+        return self.metrics.snapshot()
 
 
 def cached(cache_manager: CacheManager, 
           prefix: str = 'func',
           ttl: Optional[int] = None,
-          key_func: Optional[Callable] = None):
+          key_func: Optional[Callable] = None,
+          refresh_ahead: Optional[float] = None):
     """
     Decorator for caching function results.
     
+    Concurrent calls with the same key share one execution of the function.
+    Coroutine functions are cached through the asyncio API (aget/aset).
+    Calls with an argument that has no stable cache identity (an object with
+    the default repr and no cache_key()) are not cached.
+    
     Args:
         cache_manager: CacheManager instance
         prefix: Cache key prefix
         ttl: Time-to-live in seconds
         key_func: Custom key generation function
+        refresh_ahead: Fraction of TTL after which entries are refreshed in
+            the background (None to use the cache manager's setting)
     """
     def decorator(func):
-        @wraps(func)
-        def wrapper(*args, **kwargs):
-            # Generate cache key
+        # Methods: the bound self is keyed by its class (or cache_key())
+        parameters = list(inspect.signature(func).parameters)
+        is_method = bool(parameters) and parameters[0] == 'self'
+        
+        def make_key(*args, **kwargs) -> Optional[str]:
             if key_func:
-                cache_key = key_func(*args, **kwargs)
-            else:
-                cache_key = cache_manager._generate_key(f"{prefix}_{func.__name__}", *args, **kwargs)
-            
-            # Try to get from cache
-            result = cache_manager.get(cache_key)
-            if result is not None:
-                return result
-            
-            # Execute function and cache result
-            result = func(*args, **kwargs)
-            cache_manager.set(cache_key, result, ttl)
-            
-            return result
+                return key_func(*args, **kwargs)
+            if is_method and args:
+                args = (_instance_identity(args[0]),) + args[1:]
+            try:
+                return cache_manager._generate_key(f"{prefix}_{func.__name__}", *args, **kwargs)
+            except TypeError as e:
+                cache_manager.logger.debug(f"Not caching {func.__qualname__} call: {e}")
+                return None
+        
+        if asyncio.iscoroutinefunction(func):
+            @wraps(func)
+            async def wrapper(*args, **kwargs):
+                key = make_key(*args, **kwargs)
+                if key is None:
+                    return await func(*args, **kwargs)
+                return await cache_manager.aget_or_compute(
+                    key, lambda: func(*args, **kwargs), ttl, refresh_ahead
+                )
+        else:
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                key = make_key(*args, **kwargs)
+                if key is None:
+                    return func(*args, **kwargs)
+                # Get from cache, or execute function once and cache result
+                return cache_manager.get_or_compute(
+                    key, lambda: func(*args, **kwargs), ttl, refresh_ahead
+                )
         
         # Add cache management methods
-        wrapper.cache_clear = lambda: cache_manager.clear(f"{prefix}_{func.__name__}")
+        wrapper.cache_clear = lambda: cache_manager.invalidate_namespace(f"{prefix}_{func.__name__}")
         wrapper.cache_info = lambda: cache_manager.get_stats()
         
         return wrapper
@@ -411,7 +1556,7 @@ def get_cache_manager() -> CacheManager:
     """Get global cache manager instance."""
     global _global_cache_manager
     if _global_cache_manager is None:
-        _global_cache_manager = CacheManager()
+        _global_cache_manager = CacheManager(invalidation_channel=DEFAULT_INVALIDATION_CHANNEL)
     return _global_cache_manager
 
 
@@ -436,7 +1581,15 @@ def init_cache_manager(config: Dict[str, Any]) -> CacheManager:
         redis_password=cache_config.get('redis_password'),
         use_redis=cache_config.get('use_redis', True),
         memory_cache_size=cache_config.get('memory_cache_size', 1000),
-        default_ttl=cache_config.get('default_ttl', 300)
+        default_ttl=cache_config.get('default_ttl', 300),
+        memory_cache_max_bytes=cache_config.get('memory_cache_max_bytes'),
+        refresh_ahead_fraction=cache_config.get('refresh_ahead_fraction'),
+        compression=cache_config.get('compression'),
+        compression_min_bytes=cache_config.get('compression_min_bytes', 4096),
+        invalidation_channel=cache_config.get('invalidation_channel', DEFAULT_INVALIDATION_CHANNEL),
+        disk_cache_path=cache_config.get('disk_cache_path'),
+        disk_cache_max_bytes=cache_config.get('disk_cache_max_bytes', 1024 ** 3),
+        async_pool_size=cache_config.get('async_pool_size', 20)
     )
     
     return _global_cache_manager
\ No newline at end of file
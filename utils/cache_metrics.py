@@ -0,0 +1,185 @@
+"""Cache telemetry.
+Per key-prefix counters for hits (by tier), misses, latencies, evictions
+and serialized bytes, with snapshots for periodic health checks.
+"""
+
+import bisect
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+# Upper bounds (milliseconds) of the latency histogram buckets; the last
+# bucket collects everything slower
+LATENCY_BUCKETS_MS = [0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 1000]
+
+
+@dataclass
+class PrefixMetrics:
+    """Counters for one key prefix."""
+    hits: Dict[str, int] = field(default_factory=dict)
+    misses: int = 0
+    sets: int = 0
+    serialized_bytes: int = 0
+    evictions: Dict[str, int] = field(default_factory=dict)
+    get_latency: List[int] = field(default_factory=lambda: [0] * (len(LATENCY_BUCKETS_MS) + 1))
+    set_latency: List[int] = field(default_factory=lambda: [0] * (len(LATENCY_BUCKETS_MS) + 1))
+    
+    @property
+    def hit_count(self) -> int:
+        return sum(self.hits.values())
+    
+    def to_dict(self) -> Dict[str, Any]:
+        lookups = self.hit_count + self.misses
+        return {
+            'hits': self.hit_count,
+            'misses': self.misses,
+            'hit_ratio': self.hit_count / lookups if lookups else None,
+            'hits_by_tier': dict(self.hits),
+            'sets': self.sets,
+            'serialized_bytes': self.serialized_bytes,
+            'evictions': dict(self.evictions),
+            'get_latency_ms': _histogram_dict(self.get_latency),
+            'set_latency_ms': _histogram_dict(self.set_latency)
+        }
+
+
+def _histogram_dict(counts: List[int]) -> Dict[str, int]:
+    """Label histogram buckets by their upper bound (non-empty buckets only)."""
+    labels = [f"<={bound}" for bound in LATENCY_BUCKETS_MS] + [f">{LATENCY_BUCKETS_MS[-1]}"]
+    return {label: count for label, count in zip(labels, counts) if count}
+
+
+def _subtract(current: Dict[str, Any], previous: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Difference of two PrefixMetrics.to_dict() results."""
+    if previous is None:
+        return current
+    
+    def diff_counts(now: Dict[str, int], before: Dict[str, int]) -> Dict[str, int]:
+        return {key: value - before.get(key, 0) for key, value in now.items() if value - before.get(key, 0)}
+    
+    hits = current['hits'] - previous['hits']
+    misses = current['misses'] - previous['misses']
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_ratio': hits / (hits + misses) if hits + misses else None,
+        'hits_by_tier': diff_counts(current['hits_by_tier'], previous['hits_by_tier']),
+        'sets': current['sets'] - previous['sets'],
+        'serialized_bytes': current['serialized_bytes'] - previous['serialized_bytes'],
+        'evictions': diff_counts(current['evictions'], previous['evictions']),
+        'get_latency_ms': diff_counts(current['get_latency_ms'], previous['get_latency_ms']),
+        'set_latency_ms': diff_counts(current['set_latency_ms'], previous['set_latency_ms'])
+    }
+
+
+class CacheMetrics:
+    """
+    Thread-safe cache telemetry keyed by cache key prefix.
+    """
+    
+    def __init__(self):
+        """Initialize empty metrics."""
+        self._lock = threading.Lock()
+        self._prefixes: Dict[str, PrefixMetrics] = {}
+        self._last_snapshot: Dict[str, Dict[str, Any]] = {}
+        self._last_snapshot_time = time.time()
+    
+    def _metrics(self, prefix: str) -> PrefixMetrics:
+        """Get or create the counters of a prefix (caller holds the lock)."""
+        metrics = self._prefixes.get(prefix)
+        if metrics is None:
+            metrics = self._prefixes[prefix] = PrefixMetrics()
+        return metrics
+    
+    def record_get(self, prefix: str, hits_by_tier: Dict[str, int], misses: int, seconds: float):
+        """
+        Record one lookup call for a prefix.
+        
+        Args:
+            prefix: Key prefix
+            hits_by_tier: Number of hits per tier ('memory', 'disk', 'redis')
+            misses: Number of keys not found
+            seconds: Call latency
+        """
+        bucket = bisect.bisect_left(LATENCY_BUCKETS_MS, seconds * 1000)
+        with self._lock:
+            metrics = self._metrics(prefix)
+            for tier, count in hits_by_tier.items():
+                metrics.hits[tier] = metrics.hits.get(tier, 0) + count
+            metrics.misses += misses
+            metrics.get_latency[bucket] += 1
+    
+    def record_set(self, prefix: str, count: int, serialized_bytes: int, seconds: float):
+        """
+        Record one write call for a prefix.
+        
+        Args:
+            prefix: Key prefix
+            count: Number of keys written
+            serialized_bytes: Bytes written to the disk/Redis tiers
+            seconds: Call latency
+        """
+        bucket = bisect.bisect_left(LATENCY_BUCKETS_MS, seconds * 1000)
+        with self._lock:
+            metrics = self._metrics(prefix)
+            metrics.sets += count
+            metrics.serialized_bytes += serialized_bytes
+            metrics.set_latency[bucket] += 1
+    
+    def record_eviction(self, prefix: str, reason: str):
+        """
+        Record a memory tier eviction.
+        
+        Args:
+            prefix: Key prefix
+            reason: 'expired', 'capacity', 'bytes' or 'invalidated'
+        """
+        with self._lock:
+            metrics = self._metrics(prefix)
+            metrics.evictions[reason] = metrics.evictions.get(reason, 0) + 1
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Cumulative metrics per prefix plus overall totals.
+        
+        Returns:
+            Dict with 'prefixes' and 'overall' entries
+        """
+        with self._lock:
+            prefixes = {prefix: metrics.to_dict() for prefix, metrics in self._prefixes.items()}
+        return {'prefixes': prefixes, 'overall': self._overall(prefixes)}
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Metrics accumulated since the previous snapshot.
+        
+        Returns:
+            Dict with 'timestamp', 'interval_seconds', 'prefixes' and 'overall'
+        """
+        now = time.time()
+        with self._lock:
+            current = {prefix: metrics.to_dict() for prefix, metrics in self._prefixes.items()}
+            previous, self._last_snapshot = self._last_snapshot, current
+            interval, self._last_snapshot_time = now - self._last_snapshot_time, now
+        
+        prefixes = {prefix: _subtract(stats, previous.get(prefix)) for prefix, stats in current.items()}
+        return {
+            'timestamp': now,
+            'interval_seconds': interval,
+            'prefixes': prefixes,
+            'overall': self._overall(prefixes)
+        }
+    
+    @staticmethod
+    def _overall(prefixes: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+        """Totals across prefixes."""
+        hits = sum(stats['hits'] for stats in prefixes.values())
+        misses = sum(stats['misses'] for stats in prefixes.values())
+        return {
+            'hits': hits,
+            'misses': misses,
+            'hit_ratio': hits / (hits + misses) if hits + misses else None,
+            'evictions': sum(sum(stats['evictions'].values()) for stats in prefixes.values()),
+            'serialized_bytes': sum(stats['serialized_bytes'] for stats in prefixes.values())
+        }
@@ -0,0 +1,289 @@
+"""Pluggable market data sources.
+Defines the interface shared by the FiinQuant adapter and the offline
+replay source, the async facade they both get, and a config factory.
+"""
+
+import asyncio
+import functools
+import logging
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime
+from threading import Lock
+from typing import Any, Callable, Dict, List, Optional
+
+import pandas as pd
+
+from utils.helpers import get_env_variable
+
+
+@dataclass
+class MarketDataPoint:
+    """Standardized market data structure."""
+    ticker: str
+    timestamp: datetime
+    open: float
+    high: float
+    low: float
+    close: float
+    volume: int
+    change: float
+    change_percent: float
+    total_match_value: float = 0.0
+    foreign_buy_volume: int = 0
+    foreign_sell_volume: int = 0
+    match_volume: int = 0
+
+
+class DataSource(ABC):
+    """
+    Market data source interface.
+    
+    Implementations provide blocking fetch, login and stream methods; the
+    async API runs them on one long-lived, bounded executor with per-call
+    timeouts.
+    """
+    
+    # True for sources that replay recorded data (trading-hours gates don't apply)
+    simulated = False
+    
+    # Thread name prefix of the async API executor
+    io_thread_prefix = "datasource-io"
+    
+    def __init__(self, batch_size: int = 50, io_workers: int = 8,
+                 request_timeout: Optional[float] = None):
+        """
+        Initialize data source.
+        
+        Args:
+            batch_size: Maximum tickers per fetch in batch and async fetches
+            io_workers: Threads of the executor behind the async API
+            request_timeout: Default per-call timeout of the async API in
+                seconds (None for no timeout)
+        """
+        self.logger = logging.getLogger(self.__class__.__module__)
+        self.batch_size = batch_size
+        self.io_workers = io_workers
+        self.request_timeout = request_timeout
+        self._io_executor: Optional[ThreadPoolExecutor] = None
+        self._io_lock = Lock()
+        self.io_timeouts = 0
+    
+    @abstractmethod
+    def login(self) -> bool:
+        """Authenticate with the source (True when ready to serve data)."""
+    
+    @abstractmethod
+    def fetch_historical_data(self, tickers: List[str],
+                              timeframe: str = "15m",
+                              period: int = 100,
+                              from_date: Optional[str] = None,
+                              to_date: Optional[str] = None,
+                              fields: Optional[List[str]] = None,
+                              incremental: bool = False,
+                              use_cache: bool = True) -> pd.DataFrame:
+        """Fetch OHLCV bars for tickers as one frame with a 'ticker' column."""
+    
+    @abstractmethod
+    def fetch_historical_data_batch(self, tickers: List[str],
+                                    timeframe: str = "15m",
+                                    period: int = 100,
+                                    fields: Optional[List[str]] = None,
+                                    use_cache: bool = True) -> Dict[str, pd.DataFrame]:
+        """Fetch the last period bars of many tickers as per-ticker frames."""
+    
+    @abstractmethod
+    def start_realtime_stream(self, tickers: List[str],
+                              callback: Callable[[MarketDataPoint], None]) -> bool:
+        """Start delivering MarketDataPoint events for tickers to callback."""
+    
+    @abstractmethod
+    def stop_realtime_stream(self):
+        """Stop the realtime stream."""
+    
+    @abstractmethod
+    def health_check(self) -> Dict[str, Any]:
+        """Get health status information."""
+    
+    def _get_io_executor(self) -> ThreadPoolExecutor:
+        """Get the async API executor, creating it on first use."""
+        with self._io_lock:
+            if self._io_executor is None:
+                self._io_executor = ThreadPoolExecutor(
+                    max_workers=self.io_workers, thread_name_prefix=self.io_thread_prefix
+                )
+            return self._io_executor
+    
+    async def _run_io(self, func: Callable, *args, timeout: Optional[float] = None, **kwargs) -> Any:
+        """
+        Run a blocking call on the I/O executor.
+        
+        On timeout or cancellation the caller is released immediately; the
+        worker thread finishes the call in the background (threads can't
+        be interrupted) and its result is discarded.
+        
+        Args:
+            func: Blocking callable
+            timeout: Seconds before asyncio.TimeoutError (defaults to request_timeout)
+        
+        Returns:
+            Result of func
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(self._get_io_executor(), functools.partial(func, *args, **kwargs))
+        try:
+            return await asyncio.wait_for(future, timeout if timeout is not None else self.request_timeout)
+        except asyncio.TimeoutError:
+            self.io_timeouts += 1
+            raise
+    
+    async def alogin(self, timeout: Optional[float] = None) -> bool:
+        """
+        Login without blocking the event loop.
+        
+        Args:
+            timeout: Seconds before giving up (defaults to request_timeout)
+        
+        Returns:
+            bool: Success status
+        """
+        try:
+            return await self._run_io(self.login, timeout=timeout)
+        except asyncio.TimeoutError:
+            self.logger.error("Login timed out")
+            return False
+    
+    async def afetch_historical_data(self, tickers: List[str],
+                                     timeframe: str = "15m",
+                                     period: int = 100,
+                                     from_date: Optional[str] = None,
+                                     to_date: Optional[str] = None,
+                                     fields: Optional[List[str]] = None,
+                                     incremental: bool = False,
+                                     use_cache: bool = True,
+                                     timeout: Optional[float] = None) -> pd.DataFrame:
+        """
+        Async fetch_historical_data().
+        
+        Args:
+            tickers, timeframe, period, from_date, to_date, fields, incremental,
+            use_cache: As for fetch_historical_data()
+            timeout: Seconds before asyncio.TimeoutError (defaults to request_timeout)
+        
+        Returns:
+            pd.DataFrame: Historical data
+        """
+        return await self._run_io(
+            self.fetch_historical_data, tickers,
+            timeframe=timeframe, period=period, from_date=from_date, to_date=to_date,
+            fields=fields, incremental=incremental, use_cache=use_cache, timeout=timeout
+        )
+    
+    async def afetch_many(self, tickers: List[str],
+                          timeframe: str = "15m",
+                          period: int = 100,
+                          fields: Optional[List[str]] = None,
+                          use_cache: bool = True,
+                          timeout: Optional[float] = None) -> Dict[str, pd.DataFrame]:
+        """
+        Fetch many tickers concurrently, batch_size tickers per task.
+        
+        Each chunk runs fetch_historical_data_batch() on the I/O executor
+        with its own timeout; a chunk that fails or times out is logged and
+        left out, so one hung request doesn't hold up the others.
+        
+        Args:
+            tickers: List of stock symbols
+            timeframe: Time frame (1m, 5m, 15m, 30m, 1h, 1d)
+            period: Number of periods
+            fields: Data fields to fetch
+            use_cache: Whether to use cached data
+            timeout: Seconds allowed per chunk (defaults to request_timeout)
+        
+        Returns:
+            Dict[str, pd.DataFrame]: Frames by ticker (failed chunks are omitted)
+        """
+        tickers = list(dict.fromkeys(tickers))
+        chunks = [tickers[i:i + self.batch_size] for i in range(0, len(tickers), self.batch_size)]
+        results = await asyncio.gather(*(
+            self._run_io(self.fetch_historical_data_batch, chunk, timeframe=timeframe,
+                         period=period, fields=fields, use_cache=use_cache, timeout=timeout)
+            for chunk in chunks
+        ), return_exceptions=True)
+        
+        frames = {}
+        for chunk, result in zip(chunks, results):
+            if isinstance(result, asyncio.TimeoutError):
+                self.logger.error(f"Fetch timed out for {len(chunk)} tickers starting at {chunk[0]}")
+            elif isinstance(result, BaseException):
+                self.logger.error(f"Fetch failed for {len(chunk)} tickers starting at {chunk[0]}: {str(result)}")
+            else:
+                frames.update(result)
+        return frames
+    
+    def close(self):
+        """Stop the stream and release the async API executor."""
+        self.stop_realtime_stream()
+        with self._io_lock:
+            if self._io_executor is not None:
+                self._io_executor.shutdown(wait=False, cancel_futures=True)
+                self._io_executor = None
+
+
+def create_data_source(config: Dict[str, Any]) -> DataSource:
+    """
+    Build the data source selected by data_source.provider.
+    
+    'fiinquant' (default) uses FIINQUANT_USERNAME/FIINQUANT_PASSWORD from
+    the environment; 'replay' serves local files as configured under
+    data_source.replay. The DATA_PROVIDER environment variable overrides
+    the configured provider.
+    
+    Args:
+        config: Application configuration
+    
+    Returns:
+        DataSource: Configured data source
+    """
+    data_config = config.get('data_source', {})
+    provider = get_env_variable('DATA_PROVIDER', data_config.get('provider', 'fiinquant')).lower()
+    common = {
+        'batch_size': data_config.get('batch_size', 50),
+        'io_workers': data_config.get('io_workers', 8),
+        'request_timeout': data_config.get('request_timeout')
+    }
+    
+    if provider == 'replay':
+        from utils.replay_source import ReplayDataSource
+        
+        replay_config = data_config.get('replay', {})
+        return ReplayDataSource(
+            path=replay_config.get('path', config.get('database', {}).get('path', 'database/trading_data.db')),
+            ticks_path=replay_config.get('ticks_path'),
+            speed=replay_config.get('speed'),
+            start=replay_config.get('start'),
+            base_timeframe=replay_config.get('base_timeframe', '15m'),
+            timezone=config.get('market', {}).get('trading_hours', {}).get('timezone', 'Asia/Ho_Chi_Minh'),
+            stream_workers=data_config.get('stream_workers', 1),
+            stream_queue_size=data_config.get('stream_queue_size', 10000),
+            **common
+        )
+    
+    if provider != 'fiinquant':
+        raise ValueError(f"Unknown data provider: {provider}")
+    
+    from utils.fiinquant_adapter import FiinQuantAdapter
+    
+    return FiinQuantAdapter(
+        username=get_env_variable('FIINQUANT_USERNAME', required=True),
+        password=get_env_variable('FIINQUANT_PASSWORD', required=True),
+        retry_attempts=data_config.get('retry_attempts', 3),
+        retry_delay=data_config.get('retry_delay', 5),
+        bar_store_path=data_config.get('bar_store_path'),
+        db_path=config.get('database', {}).get('path', 'database/trading_data.db'),
+        stream_workers=data_config.get('stream_workers', 1),
+        stream_queue_size=data_config.get('stream_queue_size', 10000),
+        rate_limits=data_config.get('rate_limits'),
+        **common
+    )
@@ -0,0 +1,284 @@
+"""Persistent on-disk cache tier.
+Stores serialized cache payloads as SQLite blobs with TTL and a size cap,
+so cached frames survive process restarts when Redis is unavailable.
+"""
+
+import sqlite3
+import fnmatch
+import logging
+import socket
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+class DiskCache:
+    """
+    SQLite-backed blob store keyed by cache key.
+    
+    Entries carry an absolute expiry time; when the total payload size
+    exceeds max_bytes, expired entries go first, then least recently used.
+    """
+    
+    def __init__(self, path: str, max_bytes: int = 1024 ** 3):
+        """
+        Initialize disk cache.
+        
+        Args:
+            path: SQLite database file
+            max_bytes: Maximum total payload size in bytes
+        """
+        self.logger = logging.getLogger(__name__)
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        
+        # Processes with the same identity share one database file
+        self.identity = f"{socket.gethostname()}:{self.path.resolve()}"
+        self._lock = threading.Lock()
+        
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS cache_entries (
+                key TEXT PRIMARY KEY,
+                value BLOB NOT NULL,
+                expires_at REAL,
+                size_bytes INTEGER NOT NULL,
+                last_accessed REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_cache_entries_expires ON cache_entries(expires_at);
+            CREATE INDEX IF NOT EXISTS idx_cache_entries_accessed ON cache_entries(last_accessed);
+            CREATE TABLE IF NOT EXISTS cache_generations (
+                namespace TEXT PRIMARY KEY,
+                generation INTEGER NOT NULL
+            );
+        """)
+        self._conn.commit()
+        
+        self._total_bytes = self._conn.execute(
+            "SELECT COALESCE(SUM(size_bytes), 0) FROM cache_entries"
+        ).fetchone()[0]
+    
+    def get(self, key: str) -> Optional[Tuple[bytes, Optional[float]]]:
+        """
+        Get a payload and its expiry timestamp.
+        
+        Args:
+            key: Cache key
+        
+        Returns:
+            (payload, expires_at) or None if missing or expired
+        """
+        return self.get_many([key]).get(key)
+    
+    def get_many(self, keys: List[str]) -> Dict[str, Tuple[bytes, Optional[float]]]:
+        """
+        Get several payloads in one query.
+        
+        Args:
+            keys: Cache keys
+        
+        Returns:
+            Dict of found keys to (payload, expires_at)
+        """
+        if not keys:
+            return {}
+        
+        now = time.time()
+        results = {}
+        with self._lock:
+            # Stay well under SQLite's bound-parameter limit
+            for start in range(0, len(keys), 500):
+                chunk = keys[start:start + 500]
+                rows = self._conn.execute(
+                    f"SELECT key, value, expires_at FROM cache_entries "
+                    f"WHERE key IN ({','.join('?' * len(chunk))})",
+                    chunk
+                ).fetchall()
+                for key, value, expires_at in rows:
+                    if expires_at is None or expires_at > now:
+                        results[key] = (bytes(value), expires_at)
+            
+            if results:
+                self._conn.executemany(
+                    "UPDATE cache_entries SET last_accessed = ? WHERE key = ?",
+                    [(now, key) for key in results]
+                )
+                self._conn.commit()
+        return results
+    
+    def set(self, key: str, value: bytes, expires_at: Optional[float] = None):
+        """
+        Store a payload.
+        
+        Args:
+            key: Cache key
+            value: Serialized payload
+            expires_at: Absolute expiry (epoch seconds, None for no expiry)
+        """
+        self.set_many({key: value}, expires_at)
+    
+    def set_many(self, items: Dict[str, bytes], expires_at: Optional[float] = None):
+        """
+        Store several payloads in one transaction.
+        
+        Args:
+            items: Dict of cache keys to serialized payloads
+            expires_at: Absolute expiry (epoch seconds, None for no expiry)
+        """
+        if not items:
+            return
+        
+        now = time.time()
+        with self._lock:
+            self._total_bytes -= self._sizes(list(items))
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO cache_entries (key, value, expires_at, size_bytes, last_accessed) "
+                "VALUES (?, ?, ?, ?, ?)",
+                [(key, sqlite3.Binary(value), expires_at, len(value), now) for key, value in items.items()]
+            )
+            self._total_bytes += sum(len(value) for value in items.values())
+            if self._total_bytes > self.max_bytes:
+                self._evict(now)
+            self._conn.commit()
+    
+    def delete_many(self, keys: List[str]) -> int:
+        """
+        Delete entries by key.
+        
+        Args:
+            keys: Cache keys
+        
+        Returns:
+            int: Number of entries deleted
+        """
+        if not keys:
+            return 0
+        
+        with self._lock:
+            self._total_bytes -= self._sizes(keys)
+            deleted = self._conn.executemany(
+                "DELETE FROM cache_entries WHERE key = ?", [(key,) for key in keys]
+            ).rowcount
+            self._conn.commit()
+        return max(deleted, 0)
+    
+    def delete_pattern(self, pattern: str,
+                       predicate: Optional[Callable[[str], bool]] = None) -> int:
+        """
+        Delete entries whose keys match a glob pattern.
+        
+        Args:
+            pattern: Glob pattern (fnmatch syntax, as for the memory tier)
+            predicate: Further filter on the matching keys (None for all)
+        
+        Returns:
+            int: Number of entries deleted
+        """
+        with self._lock:
+            keys = [row[0] for row in self._conn.execute("SELECT key FROM cache_entries")]
+        return self.delete_many([
+            key for key in keys
+            if fnmatch.fnmatchcase(key, pattern) and (predicate is None or predicate(key))
+        ])
+    
+    def cleanup(self) -> int:
+        """
+        Remove expired entries.
+        
+        Returns:
+            int: Number of entries removed
+        """
+        now = time.time()
+        with self._lock:
+            deleted = self._conn.execute(
+                "DELETE FROM cache_entries WHERE expires_at <= ?", (now,)
+            ).rowcount
+            self._conn.commit()
+            
+            # Resync the size total, other processes may share the file
+            self._total_bytes = self._conn.execute(
+                "SELECT COALESCE(SUM(size_bytes), 0) FROM cache_entries"
+            ).fetchone()[0]
+        return deleted
+    
+    def clear(self):
+        """Remove all entries (namespace generations are kept)."""
+        with self._lock:
+            self._conn.execute("DELETE FROM cache_entries")
+            self._conn.commit()
+            self._total_bytes = 0
+    
+    def get_generation(self, namespace: str) -> Optional[int]:
+        """Get the persisted generation of a namespace (None if never bumped)."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT generation FROM cache_generations WHERE namespace = ?", (namespace,)
+            ).fetchone()
+        return row[0] if row else None
+    
+    def set_generation(self, namespace: str, generation: int):
+        """Persist a namespace generation."""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache_generations (namespace, generation) VALUES (?, ?)",
+                (namespace, generation)
+            )
+            self._conn.commit()
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get disk cache statistics."""
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM cache_entries").fetchone()[0]
+        return {
+            'path': str(self.path),
+            'entries': entries,
+            'total_size_bytes': self._total_bytes,
+            'max_bytes': self.max_bytes
+        }
+    
+    def close(self):
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+    
+    def _sizes(self, keys: List[str]) -> int:
+        """Total stored size of existing keys (caller holds the lock)."""
+        total = 0
+        for start in range(0, len(keys), 500):
+            chunk = keys[start:start + 500]
+            total += self._conn.execute(
+                f"SELECT COALESCE(SUM(size_bytes), 0) FROM cache_entries "
+                f"WHERE key IN ({','.join('?' * len(chunk))})",
+                chunk
+            ).fetchone()[0]
+        return total
+    
+    def _evict(self, now: float):
+        """Drop expired, then least recently used entries until under max_bytes (caller holds the lock)."""
+        expired = self._conn.execute(
+            "SELECT COALESCE(SUM(size_bytes), 0) FROM cache_entries WHERE expires_at <= ?", (now,)
+        ).fetchone()[0]
+        self._conn.execute("DELETE FROM cache_entries WHERE expires_at <= ?", (now,))
+        self._total_bytes -= expired
+        
+        # Evict to 90% of the cap so every write past the limit doesn't evict again
+        target = int(self.max_bytes * 0.9)
+        if self._total_bytes <= self.max_bytes:
+            return
+        
+        freed = 0
+        victims = []
+        for key, size in self._conn.execute(
+            "SELECT key, size_bytes FROM cache_entries ORDER BY last_accessed"
+        ):
+            if self._total_bytes - freed <= target:
+                break
+            victims.append((key,))
+            freed += size
+        self._conn.executemany("DELETE FROM cache_entries WHERE key = ?", victims)
+        self._total_bytes -= freed
+        self.logger.debug(f"Disk cache evicted {len(victims)} entries ({freed} bytes)")
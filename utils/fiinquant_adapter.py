@@ -5,14 +5,13 @@ Handles authentication, data fetching, caching, and retry logic.
 
 import time
 import logging
-from typing import Dict, List, Optional, Callable, Any
+from typing import Dict, List, Optional, Callable, Any, Tuple
 from datetime import datetime, timedelta
 import pandas as pd
 import asyncio
-from threading import Thread, Event
+from threading import Thread, Event, Lock
 import json
 import os
-from dataclasses import dataclass
 
 # Import cache manager (will be initialized later to avoid circular imports)
 try:
@@ -21,44 +20,38 @@ try:
 except ImportError:
     CACHE_AVAILABLE = False
 
-# FiinQuantX - Real FiinQuant integration (REQUIRED)
+from utils.bar_store import BarStore
+from utils.data_source import DataSource, MarketDataPoint
+from utils.stream_dispatcher import StreamDispatcher
+from utils.rate_governor import RateGovernor
+
+# FiinQuantX - Real FiinQuant integration (required for live data; the
+# replay data source works without it)
 try:
     from FiinQuantX import FiinSession, RealTimeData
     FIINQUANT_AVAILABLE = True
 except ImportError:
+    FiinSession = None
     FIINQUANT_AVAILABLE = False
-    raise ImportError(
-        "FiinQuantX is required for this system. Please install it from FiinQuant. "
-        "Contact FiinQuant support to get the FiinQuantX package and premium account access."
-    )
-
-
-@dataclass
-class MarketDataPoint:
-    """Standardized market data structure."""
-    ticker: str
-    timestamp: datetime
-    open: float
-    high: float
-    low: float
-    close: float
-    volume: int
-    change: float
-    change_percent: float
-    total_match_value: float = 0.0
-    foreign_buy_volume: int = 0
-    foreign_sell_volume: int = 0
-    match_volume: int = 0
 
 
-class FiinQuantAdapter:
+class FiinQuantAdapter(DataSource):
     """
     FiinQuant API adapter with session management, caching, and retry logic.
     """
     
+    io_thread_prefix = "fiinquant-io"
+    
     def __init__(self, username: str, password: str, 
                  retry_attempts: int = 3, retry_delay: int = 5,
-                 cache_duration: int = 300):
+                 cache_duration: int = 300, batch_size: int = 50,
+                 bar_store_path: Optional[str] = None,
+                 db_path: str = 'database/trading_data.db',
+                 stream_workers: int = 1,
+                 stream_queue_size: int = 10000,
+                 rate_limits: Optional[Dict[str, Dict[str, Any]]] = None,
+                 io_workers: int = 8,
+                 request_timeout: Optional[float] = None):
         """
         Initialize FiinQuant adapter.
         
@@ -68,12 +61,30 @@ class FiinQuantAdapter:
             retry_attempts: Number of retry attempts for failed requests
             retry_delay: Delay between retries (seconds)
             cache_duration: Cache duration for session (seconds)
+            batch_size: Maximum tickers per Fetch_Trading_Data call in batch fetches
+            bar_store_path: Directory of the local bar store; batch fetches then
+                only request bars newer than what is stored (None to disable)
+            db_path: SQLite database holding market_data (see DatabaseManager)
+            stream_workers: Threads running realtime stream callbacks
+            stream_queue_size: Maximum queued realtime events; when full, only
+                the latest event per ticker is kept
+            rate_limits: Per-endpoint rate/concurrency limits ('login',
+                'fetch_trading_data', 'stream' or 'default'; see RateGovernor)
+            io_workers: Threads of the executor behind the async API
+            request_timeout: Default per-call timeout of the async API in
+                seconds (None for no timeout)
         """
+        super().__init__(batch_size=batch_size, io_workers=io_workers, request_timeout=request_timeout)
         self.username = username
         self.password = password
         self.retry_attempts = retry_attempts
         self.retry_delay = retry_delay
         self.cache_duration = cache_duration
+        self.db_path = db_path
+        
+        # Shared by every thread and coroutine calling the API
+        self.rate_governor = RateGovernor(rate_limits)
+        self._login_lock = Lock()
         
         self.client = None
         self.session_created_at = None
@@ -84,9 +95,9 @@ class FiinQuantAdapter:
         self.stream_thread = None
         self.stream_stop_event = Event()
         self.stream_callbacks: Dict[str, List[Callable]] = {}
-        
-        # Initialize logger first
-        self.logger = logging.getLogger(__name__)
+        self.stream_workers = stream_workers
+        self.stream_queue_size = stream_queue_size
+        self.stream_dispatcher: Optional[StreamDispatcher] = None
         
         # Legacy data cache (kept for backward compatibility)
         self.data_cache: Dict[str, Dict] = {}
@@ -101,8 +112,16 @@ class FiinQuantAdapter:
             except Exception as e:
                 self.logger.warning(f"Failed to initialize cache manager: {e}")
         
+        # Local bar store (delta-only fetching)
+        self.bar_store = None
+        if bar_store_path:
+            try:
+                self.bar_store = BarStore(bar_store_path)
+            except Exception as e:
+                self.logger.warning(f"Bar store unavailable at {bar_store_path}: {e}")
+        
         if not FIINQUANT_AVAILABLE:
-            self.logger.error("FiinQuantX not available. Please install it.")
+            self.logger.error("FiinQuantX not available. Install it from FiinQuant or use the replay data source.")
     
     def _is_session_valid(self) -> bool:
         """Check if current session is still valid."""
@@ -123,34 +142,36 @@ class FiinQuantAdapter:
             self.logger.error("FiinQuantX not available")
             return False
             
-        if self._is_session_valid():
-            self.logger.info("Using existing valid session")
-            return True
-        
-        for attempt in range(self.retry_attempts):
-            try:
-                self.logger.info(f"Attempting to login to FiinQuant (attempt {attempt + 1})")
-                
-                self.client = FiinSession(
-                    username=self.username,
-                    password=self.password
-                ).login()
-                
-                self.session_created_at = datetime.now()
-                self.is_logged_in = True
-                
-                self.logger.info("Successfully logged in to FiinQuant")
+        # Concurrent callers wait for one login instead of each logging in
+        with self._login_lock:
+            if self._is_session_valid():
+                self.logger.info("Using existing valid session")
                 return True
-                
-            except Exception as e:
-                self.logger.error(f"Login attempt {attempt + 1} failed: {str(e)}")
-                if attempt < self.retry_attempts - 1:
-                    time.sleep(self.retry_delay)
-                else:
-                    self.logger.error("All login attempts failed")
+            
+            for attempt in range(self.retry_attempts):
+                try:
+                    self.logger.info(f"Attempting to login to FiinQuant (attempt {attempt + 1})")
                     
-        self.is_logged_in = False
-        return False
+                    self.client = self.rate_governor.call('login', FiinSession(
+                        username=self.username,
+                        password=self.password
+                    ).login)
+                    
+                    self.session_created_at = datetime.now()
+                    self.is_logged_in = True
+                    
+                    self.logger.info("Successfully logged in to FiinQuant")
+                    return True
+                    
+                except Exception as e:
+                    self.logger.error(f"Login attempt {attempt + 1} failed: {str(e)}")
+                    if attempt < self.retry_attempts - 1:
+                        time.sleep(self.retry_delay)
+                    else:
+                        self.logger.error("All login attempts failed")
+                        
+            self.is_logged_in = False
+            return False
     
     def fetch_historical_data(self, tickers: List[str], 
                             timeframe: str = "15m",
@@ -176,8 +197,7 @@ class FiinQuantAdapter:
         Returns:
             pd.DataFrame: Historical data
         """
-        # Create cache key for this request
-        cache_key = f"historical_data:{'_'.join(sorted(tickers))}:{timeframe}:{period}:{from_date}:{to_date}:{'_'.join(fields or [])}"
+        cache_key = self._historical_cache_key(tickers, timeframe, period, from_date, to_date, fields)
         
         # Try advanced cache manager first
         if use_cache and self.cache_manager:
@@ -206,38 +226,14 @@ class FiinQuantAdapter:
             if not to_date:
                 to_date = datetime.now().strftime('%Y-%m-%d')
             
-            # Use date range if provided, otherwise use period
-            if from_date and to_date:
-                data = self.client.Fetch_Trading_Data(
-                    realtime=False,
-                    tickers=tickers,
-                    fields=fields,
-                    adjusted=True,
-                    by=timeframe,
-                    from_date=from_date,
-                    to_date=to_date
-                ).get_data()
-            else:
-                data = self.client.Fetch_Trading_Data(
-                    realtime=False,
-                    tickers=tickers,
-                    fields=fields,
-                    adjusted=True,
-                    by=timeframe,
-                    period=period
-                ).get_data()
+            data = self._fetch_trading_data(tickers, timeframe, fields, period, from_date, to_date)
+            if len(tickers) == 1 and data is not None and not data.empty:
+                # Same frame shape fetch_historical_data_batch() caches under this key
+                data = self._split_by_ticker(data, tickers).get(tickers[0], data)
             
             # Cache the result in advanced cache manager
             if self.cache_manager:
-                # Cache for different durations based on timeframe
-                if timeframe in ['1d', 'D']:
-                    cache_ttl = 3600  # 1 hour for daily data
-                elif timeframe in ['1h', 'H']:
-                    cache_ttl = 900   # 15 minutes for hourly data
-                else:
-                    cache_ttl = 300   # 5 minutes for intraday data
-                
-                self.cache_manager.set(cache_key, data, ttl=cache_ttl)
+                self.cache_manager.set(cache_key, data, ttl=self._cache_ttl(timeframe))
             
             self.logger.info(f"Successfully fetched historical data for {len(tickers)} symbols")
             return data
@@ -246,6 +242,178 @@ class FiinQuantAdapter:
             self.logger.error(f"Failed to fetch historical data: {str(e)}")
             raise
     
+    def fetch_historical_data_batch(self, tickers: List[str],
+                                    timeframe: str = "15m",
+                                    period: int = 100,
+                                    fields: Optional[List[str]] = None,
+                                    use_cache: bool = True) -> Dict[str, pd.DataFrame]:
+        """
+        Fetch historical OHLCV data for many tickers with few API calls.
+        
+        Tickers are looked up in the cache individually; the misses are
+        fetched batch_size tickers per Fetch_Trading_Data call and the
+        result is split into per-ticker frames (with a fresh index, as
+        single-ticker fetch_historical_data() results are), each cached under
+        the same key a single-ticker call would use. With a bar store, only
+        bars from the last stored date onwards are fetched and the frames are
+        read back from the store.
+        
+        Args:
+            tickers: List of stock symbols
+            timeframe: Time frame (1m, 5m, 15m, 30m, 1h, 1d)
+            period: Number of periods
+            fields: Data fields to fetch
+            use_cache: Whether to use cached data
+            
+        Returns:
+            Dict[str, pd.DataFrame]: Frames by ticker (tickers without data are omitted)
+        """
+        tickers = list(dict.fromkeys(tickers))
+        cache_keys = {
+            ticker: self._historical_cache_key([ticker], timeframe, period, None, None, fields)
+            for ticker in tickers
+        }
+        
+        frames = {}
+        if use_cache and self.cache_manager:
+            cached_data = self.cache_manager.get_many(list(cache_keys.values()))
+            frames = {ticker: cached_data[key] for ticker, key in cache_keys.items() if key in cached_data}
+        
+        missing = [ticker for ticker in tickers if ticker not in frames]
+        if not missing:
+            return frames
+        
+        if not self.login():
+            raise Exception("Failed to login to FiinQuant")
+        
+        if fields is None:
+            fields = ['open', 'high', 'low', 'close', 'volume']
+        
+        if self.bar_store:
+            fetched, api_calls = self._sync_bar_store(missing, timeframe, fields, period)
+        else:
+            fetched, api_calls = self._fetch_chunks(missing, timeframe, fields, period)
+        
+        frames.update(fetched)
+        if self.cache_manager and fetched:
+            self.cache_manager.set_many(
+                {cache_keys[ticker]: df for ticker, df in fetched.items()},
+                ttl=self._cache_ttl(timeframe)
+            )
+        
+        self.logger.info(
+            f"Fetched historical data for {len(frames)}/{len(tickers)} symbols "
+            f"({len(tickers) - len(missing)} cached, {api_calls} API calls)"
+        )
+        return frames
+    
+    def _fetch_chunks(self, tickers: List[str], timeframe: str, fields: List[str], period: int,
+                      from_date: Optional[str] = None,
+                      to_date: Optional[str] = None) -> Tuple[Dict[str, pd.DataFrame], int]:
+        """Fetch tickers batch_size at a time; returns per-ticker frames and the API call count."""
+        frames = {}
+        chunks = [tickers[i:i + self.batch_size] for i in range(0, len(tickers), self.batch_size)]
+        for chunk in chunks:
+            try:
+                data = self._fetch_trading_data(chunk, timeframe, fields, period, from_date, to_date)
+            except Exception as e:
+                self.logger.error(f"Failed to fetch historical data for {len(chunk)} tickers: {str(e)}")
+                continue
+            frames.update(self._split_by_ticker(data, chunk))
+        return frames, len(chunks)
+    
+    def _sync_bar_store(self, tickers: List[str], timeframe: str, fields: List[str],
+                        period: int) -> Tuple[Dict[str, pd.DataFrame], int]:
+        """
+        Bring the bar store up to date and read the last period bars per ticker.
+        
+        Stored tickers are fetched from the date of their newest bar (the API
+        takes whole dates), grouped so tickers sharing a date share calls;
+        tickers not in the store yet are backfilled with period bars.
+        """
+        groups: Dict[Optional[str], List[str]] = {}
+        for ticker in tickers:
+            last = self.bar_store.last_timestamp(ticker, timeframe)
+            groups.setdefault(last.strftime('%Y-%m-%d') if last is not None else None, []).append(ticker)
+        
+        today = datetime.now().strftime('%Y-%m-%d')
+        api_calls = 0
+        for from_date, group in groups.items():
+            if from_date is None:
+                fetched, calls = self._fetch_chunks(group, timeframe, fields, period)
+            else:
+                fetched, calls = self._fetch_chunks(group, timeframe, fields, period, from_date, today)
+            api_calls += calls
+            
+            for ticker, df in fetched.items():
+                try:
+                    self.bar_store.append(ticker, timeframe, df)
+                except Exception as e:
+                    self.logger.warning(f"Failed to store bars for {ticker}: {e}")
+        
+        frames = {}
+        for ticker in tickers:
+            df = self.bar_store.read(ticker, timeframe, last_n=period)
+            if not df.empty:
+                frames[ticker] = df
+        return frames, api_calls
+    
+    def _fetch_trading_data(self, tickers: List[str], timeframe: str, fields: List[str],
+                            period: int, from_date: Optional[str] = None,
+                            to_date: Optional[str] = None) -> pd.DataFrame:
+        """Issue one rate-limited Fetch_Trading_Data call (date range if given, otherwise period)."""
+        if from_date and to_date:
+            range_args = {'from_date': from_date, 'to_date': to_date}
+        else:
+            range_args = {'period': period}
+        
+        def _request():
+            return self.client.Fetch_Trading_Data(
+                realtime=False,
+                tickers=tickers,
+                fields=fields,
+                adjusted=True,
+                by=timeframe,
+                **range_args
+            ).get_data()
+        
+        return self.rate_governor.call('fetch_trading_data', _request)
+    
+    def _split_by_ticker(self, data: pd.DataFrame, tickers: List[str]) -> Dict[str, pd.DataFrame]:
+        """Split a multi-ticker result into per-ticker frames."""
+        if data is None or data.empty:
+            return {}
+        
+        if 'ticker' not in data.columns:
+            if len(tickers) == 1:
+                return {tickers[0]: data.reset_index(drop=True)}
+            self.logger.warning("Multi-ticker result has no 'ticker' column, cannot split it")
+            return {}
+        
+        return {
+            ticker: frame.reset_index(drop=True)
+            for ticker, frame in data.groupby('ticker', sort=False)
+            if ticker in tickers
+        }
+    
+    def _historical_cache_key(self, tickers: List[str], timeframe: str, period: int,
+                              from_date: Optional[str], to_date: Optional[str],
+                              fields: Optional[List[str]]) -> str:
+        """Cache key for a historical data request (namespaced, so it can be invalidated in O(1))."""
+        key_parts = ('_'.join(sorted(tickers)), timeframe, period, from_date, to_date, '_'.join(fields or []))
+        if self.cache_manager:
+            return self.cache_manager.namespaced_key('historical_data', *key_parts)
+        return ':'.join(['historical_data', *map(str, key_parts)])
+    
+    @staticmethod
+    def _cache_ttl(timeframe: str) -> int:
+        """Cache for different durations based on timeframe."""
+        if timeframe in ['1d', 'D']:
+            return 3600  # 1 hour for daily data
+        if timeframe in ['1h', 'H']:
+            return 900   # 15 minutes for hourly data
+        return 300       # 5 minutes for intraday data
+    
     def _get_latest_data_date(self, tickers: List[str], timeframe: str) -> Optional[str]:
         """
         Get the latest data date from database for incremental loading.
@@ -257,13 +425,20 @@ class FiinQuantAdapter:
         Returns:
             str: Latest date in YYYY-MM-DD format, or None if no data exists
         """
+        # The bar store knows the newest bar without touching the database
+        if self.bar_store:
+            stored = [self.bar_store.last_timestamp(ticker, timeframe) for ticker in tickers]
+            stored = [timestamp for timestamp in stored if timestamp is not None]
+            if stored:
+                return max(stored).strftime('%Y-%m-%d')
+        
         try:
             # Import here to avoid circular imports
             import sqlite3
             from pathlib import Path
             
-            # Get database path from config
-            db_path = Path("data/trading_system.db")
+            # Same database as DatabaseManager
+            db_path = Path(self.db_path)
             if not db_path.exists():
                 return None
             
@@ -311,6 +486,15 @@ class FiinQuantAdapter:
             return True
         
         try:
+            # Callbacks run on dispatcher workers so slow consumers don't stall the feed
+            self.stream_dispatcher = StreamDispatcher(
+                callback,
+                workers=self.stream_workers,
+                max_queue_size=self.stream_queue_size
+            )
+            self.stream_dispatcher.start()
+            self.stream_stop_event.clear()
+            
             # Internal callback to process FiinQuant data
             def _process_fiinquant_data(data: 'RealTimeData'):
                 try:
@@ -331,14 +515,16 @@ class FiinQuantAdapter:
                         match_volume=getattr(data, 'MatchVolume', 0)
                     )
                     
-                    # Call user callback
-                    callback(market_data)
+                    # Hand off to the dispatcher
+                    self.stream_dispatcher.submit(market_data.ticker, market_data)
                     
                 except Exception as e:
                     self.logger.error(f"Error processing realtime data: {str(e)}")
             
             # Start FiinQuant stream
-            self.stream_events = self.client.Trading_Data_Stream(
+            self.stream_events = self.rate_governor.call(
+                'stream',
+                self.client.Trading_Data_Stream,
                 tickers=tickers,
                 callback=_process_fiinquant_data
             )
@@ -347,8 +533,7 @@ class FiinQuantAdapter:
             def _run_stream():
                 try:
                     self.stream_events.start()
-                    while not self.stream_stop_event.is_set():
-                        time.sleep(0.1)
+                    self.stream_stop_event.wait()
                     self.stream_events.stop()
                 except Exception as e:
                     self.logger.error(f"Stream error: {str(e)}")
@@ -363,6 +548,8 @@ class FiinQuantAdapter:
             
         except Exception as e:
             self.logger.error(f"Failed to start realtime stream: {str(e)}")
+            if self.stream_dispatcher:
+                self.stream_dispatcher.stop(drain=False)
             return False
     
     def stop_realtime_stream(self):
@@ -376,9 +563,22 @@ class FiinQuantAdapter:
         if self.stream_thread and self.stream_thread.is_alive():
             self.stream_thread.join(timeout=10)
         
+        if self.stream_dispatcher:
+            self.stream_dispatcher.stop()
+        
         self.stream_active = False
         self.logger.info("Realtime stream stopped")
     
+    def get_stream_stats(self) -> Dict[str, Any]:
+        """
+        Get realtime dispatch metrics (queue depth, coalesced/dropped counts,
+        event-to-callback latency).
+        
+        Returns:
+            Dict: Dispatcher statistics (empty if no stream was started)
+        """
+        return self.stream_dispatcher.get_stats() if self.stream_dispatcher else {}
+    
     @cached(get_cache_manager(), prefix="latest_data", ttl=60) if CACHE_AVAILABLE else lambda x: x
     def get_latest_data(self, ticker: str, use_cache: bool = True) -> Optional[MarketDataPoint]:
         """
@@ -484,6 +684,12 @@ class FiinQuantAdapter:
             except Exception as e:
                 status["cache_error"] = str(e)
         
+        if self.stream_dispatcher:
+            status["stream_stats"] = self.get_stream_stats()
+        
+        status["rate_limits"] = self.rate_governor.get_stats()
+        status["io_timeouts"] = self.io_timeouts
+        
         return status
     
     def clear_cache(self, pattern: Optional[str] = None) -> bool:
@@ -491,7 +697,7 @@ class FiinQuantAdapter:
         Clear cache entries.
         
         Args:
-            pattern: Optional pattern to match cache keys (e.g., 'latest_data:*')
+            pattern: Optional glob pattern to match cache keys (e.g., 'latest_data:*')
             
         Returns:
             bool: True if successful
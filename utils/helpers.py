@@ -189,6 +189,49 @@ def is_trading_hours(config: Dict[str, Any]) -> bool:
     return start <= now <= end
 
 
+def get_next_market_open(config: Dict[str, Any], now: Optional[datetime] = None) -> datetime:
+    """
+    Get the start of the current or next trading session.
+    
+    Args:
+        config: Configuration dictionary
+        now: Reference time (defaults to the current Vietnam time)
+    
+    Returns:
+        datetime: Today's session start if the session hasn't ended yet
+            (it may already have started), otherwise the next weekday's
+    """
+    trading_hours = config.get('market', {}).get('trading_hours', {})
+    start_hour, start_minute = map(int, trading_hours.get('start', '09:00').split(':'))
+    end_hour, end_minute = map(int, trading_hours.get('end', '15:00').split(':'))
+    
+    tz = get_vietnam_timezone()
+    now = datetime.now(tz) if now is None else now
+    
+    day = now
+    if now > now.replace(hour=end_hour, minute=end_minute, second=0, microsecond=0):
+        day = now + timedelta(days=1)
+    while day.weekday() >= 5:
+        day += timedelta(days=1)
+    
+    return day.replace(hour=start_hour, minute=start_minute, second=0, microsecond=0)
+
+
+def seconds_until_market_open(config: Dict[str, Any], now: Optional[datetime] = None) -> float:
+    """
+    Get the number of seconds until the next trading session starts.
+    
+    Args:
+        config: Configuration dictionary
+        now: Reference time (defaults to the current Vietnam time)
+    
+    Returns:
+        float: Seconds until the open (0 during trading hours)
+    """
+    now = datetime.now(get_vietnam_timezone()) if now is None else now
+    return max(0.0, (get_next_market_open(config, now) - now).total_seconds())
+
+
 def format_currency(amount: float, currency: str = 'VND') -> str:
     """
     Format currency amount with proper separators.
@@ -438,23 +481,27 @@ def rate_limiter(calls_per_second: float = 1.0):
         Decorator function
     """
     import time
+    import threading
     from functools import wraps
     
     min_interval = 1.0 / calls_per_second
-    last_called = [0.0]
+    next_allowed = [0.0]
+    lock = threading.Lock()
     
     def decorator(func):
         @wraps(func)
         def wrapper(*args, **kwargs):
-            elapsed = time.time() - last_called[0]
-            left_to_wait = min_interval - elapsed
+            # Reserve a start slot under the lock so concurrent callers stay spaced out
+            with lock:
+                now = time.monotonic()
+                start_at = max(now, next_allowed[0])
+                next_allowed[0] = start_at + min_interval
             
+            left_to_wait = start_at - time.monotonic()
             if left_to_wait > 0:
                 time.sleep(left_to_wait)
             
-            ret = func(*args, **kwargs)
-            last_called[0] = time.time()
-            return ret
+            return func(*args, **kwargs)
         
         return wrapper
     return decorator
@@ -5,9 +5,11 @@ Implements RSI, PSAR, Engulfing Pattern, and Volume analysis.
 
 import numpy as np
 import pandas as pd
-from typing import Tuple, Optional, Dict, Any
+from typing import Tuple, Optional, Dict, Any, Union, Deque, List
 import talib
 from dataclasses import dataclass
+from collections import deque
+from datetime import datetime
 
 
 @dataclass
@@ -35,20 +37,12 @@ class TechnicalIndicators:
         Returns:
             IndicatorResult: RSI values and signals
         """
-        if len(prices) < period + 1:
-            # Insufficient data
-            rsi_values = np.full(len(prices), np.nan)
-        else:
-            rsi_values = talib.RSI(prices.values, timeperiod=period)
+        rsi_values = TechnicalIndicators._rsi_values(
+            prices.to_numpy(dtype=float), period
+        )
         
         # Generate signals
-        signals = np.full(len(prices), 0)  # 0 = neutral
-        
-        if not np.all(np.isnan(rsi_values)):
-            signals[rsi_values > 70] = -1  # Overbought (sell signal)
-            signals[rsi_values < 30] = 1   # Oversold (buy signal) 
-            signals[rsi_values > 50] = 0.5 # Trending up
-            signals[rsi_values < 50] = -0.5 # Trending down
+        signals = TechnicalIndicators._rsi_signals(rsi_values)
         
         metadata = {
             'period': period,
@@ -64,6 +58,28 @@ class TechnicalIndicators:
             metadata=metadata
         )
     
+    @staticmethod
+    def _rsi_values(close_values: np.ndarray, period: int = 14) -> np.ndarray:
+        """RSI array, all NaN when there is not enough history."""
+        if len(close_values) < period + 1:
+            # Insufficient data
+            return np.full(len(close_values), np.nan)
+        return talib.RSI(close_values, timeperiod=period)
+    
+    @staticmethod
+    def _rsi_signals(rsi_values: np.ndarray) -> np.ndarray:
+        """RSI zone signals on an integer array (0 = neutral), per row for 2-D input."""
+        signals = np.full(rsi_values.shape, 0)
+        
+        # Rows without any RSI value keep neutral signals
+        has_rsi = ~np.all(np.isnan(rsi_values), axis=-1, keepdims=True)
+        signals[(rsi_values > 70) & has_rsi] = -1  # Overbought (sell signal)
+        signals[(rsi_values < 30) & has_rsi] = 1   # Oversold (buy signal) 
+        signals[(rsi_values > 50) & has_rsi] = 0.5 # Trending up
+        signals[(rsi_values < 50) & has_rsi] = -0.5 # Trending down
+        
+        return signals
+    
     @staticmethod
     def parabolic_sar(high: pd.Series, low: pd.Series, close: pd.Series,
                       af_init: float = 0.02, af_step: float = 0.02, 
@@ -145,38 +161,11 @@ class TechnicalIndicators:
                 metadata={'pattern_count': 0}
             )
         
-        signals = np.full(len(close), 0)
-        
-        for i in range(1, len(close)):
-            # Current and previous candle
-            prev_open, prev_close = open_prices.iloc[i-1], close.iloc[i-1]
-            curr_open, curr_close = open_prices.iloc[i], close.iloc[i]
-            
-            # Body sizes
-            prev_body = abs(prev_close - prev_open)
-            curr_body = abs(curr_close - curr_open)
-            
-            # Minimum body size check
-            if curr_body < min_body_ratio * prev_body:
-                continue
-            
-            # Bullish Engulfing
-            # Previous candle is bearish (red), current is bullish (green)
-            # Current candle completely engulfs previous candle's body
-            if (prev_close < prev_open and  # Previous bearish
-                curr_close > curr_open and  # Current bullish
-                curr_close > prev_open and  # Current close > previous open
-                curr_open < prev_close):    # Current open < previous close
-                signals[i] = 1
-            
-            # Bearish Engulfing  
-            # Previous candle is bullish (green), current is bearish (red)
-            # Current candle completely engulfs previous candle's body
-            elif (prev_close > prev_open and  # Previous bullish
-                  curr_close < curr_open and  # Current bearish  
-                  curr_close < prev_open and  # Current close < previous open
-                  curr_open > prev_close):    # Current open > previous close
-                signals[i] = -1
+        signals = TechnicalIndicators._engulfing_signals(
+            np.asarray(open_prices, dtype=float),
+            np.asarray(close, dtype=float),
+            min_body_ratio
+        )
         
         # Calculate additional metadata
         bullish_count = np.sum(signals == 1)
@@ -202,6 +191,53 @@ class TechnicalIndicators:
             metadata=metadata
         )
     
+    @staticmethod
+    def _engulfing_signals(open_values: np.ndarray, close_values: np.ndarray,
+                           min_body_ratio: float = 0.5) -> np.ndarray:
+        """
+        Array kernel for engulfing detection along the last axis.
+        
+        Compares each candle with the previous one using shifted views,
+        so a 2-D (tickers x bars) input is handled in the same pass.
+        
+        Args:
+            open_values: Open prices
+            close_values: Close prices
+            min_body_ratio: Minimum body size ratio
+            
+        Returns:
+            np.ndarray: Integer signals (+1 bullish, -1 bearish, 0 none)
+        """
+        signals = np.zeros(close_values.shape, dtype=int)
+        if close_values.shape[-1] < 2:
+            return signals
+        
+        prev_open, prev_close = open_values[..., :-1], close_values[..., :-1]
+        curr_open, curr_close = open_values[..., 1:], close_values[..., 1:]
+        
+        # Body sizes; a NaN body never fails this check, same as the scalar rule
+        prev_body = np.abs(prev_close - prev_open)
+        curr_body = np.abs(curr_close - curr_open)
+        body_ok = ~(curr_body < min_body_ratio * prev_body)
+        
+        # Bullish: previous bearish, current bullish and engulfing its body
+        bullish = (body_ok &
+                   (prev_close < prev_open) &
+                   (curr_close > curr_open) &
+                   (curr_close > prev_open) &
+                   (curr_open < prev_close))
+        
+        # Bearish: previous bullish, current bearish and engulfing its body
+        bearish = (body_ok &
+                   (prev_close > prev_open) &
+                   (curr_close < curr_open) &
+                   (curr_close < prev_open) &
+                   (curr_open > prev_close))
+        
+        # The two masks are mutually exclusive, bullish takes precedence anyway
+        signals[..., 1:] = np.where(bullish, 1, np.where(bearish, -1, 0))
+        return signals
+    
     @staticmethod
     def volume_analysis(volume: pd.Series, avg_period: int = 20,
                        anomaly_threshold: float = 1.0) -> IndicatorResult:
@@ -216,34 +252,21 @@ class TechnicalIndicators:
         Returns:
             IndicatorResult: Volume averages and anomaly signals
         """
-        if len(volume) < avg_period:
-            # Insufficient data for full calculation
-            avg_volume = np.full(len(volume), np.nan)
-            # Use simple moving average for available data
-            for i in range(len(volume)):
-                start_idx = max(0, i - avg_period + 1)
-                avg_volume[i] = volume.iloc[start_idx:i+1].mean()
-        else:
-            avg_volume = talib.SMA(volume.values, timeperiod=avg_period)
+        volume_values = volume.to_numpy(dtype=float)
+        avg_volume = TechnicalIndicators._volume_average(volume_values, avg_period)
         
         # Volume anomaly detection
-        volume_anomaly = np.full(len(volume), 0)
-        
-        for i in range(len(volume)):
-            if not np.isnan(avg_volume[i]) and avg_volume[i] > 0:
-                if volume.iloc[i] > anomaly_threshold * avg_volume[i]:
-                    volume_anomaly[i] = 1
+        volume_anomaly = TechnicalIndicators._volume_anomalies(
+            volume_values, avg_volume, anomaly_threshold
+        )
         
         # Volume trend analysis
         volume_trend = np.full(len(volume), 0)
         if len(volume) >= 5:
             # Simple trend detection over last 5 periods
-            for i in range(4, len(volume)):
-                recent_vol = volume.iloc[i-4:i+1]
-                if recent_vol.iloc[-1] > recent_vol.iloc[0]:
-                    volume_trend[i] = 1
-                elif recent_vol.iloc[-1] < recent_vol.iloc[0]:
-                    volume_trend[i] = -1
+            current, first = volume_values[4:], volume_values[:-4]
+            volume_trend[4:] = np.where(current > first, 1,
+                                        np.where(current < first, -1, 0))
         
         metadata = {
             'avg_period': avg_period,
@@ -260,6 +283,247 @@ class TechnicalIndicators:
             metadata=metadata
         )
     
+    @staticmethod
+    def _volume_average(volume_values: np.ndarray, avg_period: int = 20) -> np.ndarray:
+        """Volume SMA; short histories fall back to the mean of available bars."""
+        if len(volume_values) < avg_period:
+            # Insufficient data for full calculation
+            return pd.Series(volume_values).rolling(
+                avg_period, min_periods=1
+            ).mean().to_numpy()
+        return talib.SMA(volume_values, timeperiod=avg_period)
+    
+    @staticmethod
+    def _volume_anomalies(volume_values: np.ndarray, avg_volume: np.ndarray,
+                          anomaly_threshold: float = 1.0) -> np.ndarray:
+        """Flag bars whose volume exceeds the threshold times its average."""
+        # NaN averages compare False
+        return (
+            (avg_volume > 0) & (volume_values > anomaly_threshold * avg_volume)
+        ).astype(int)
+    
+    @staticmethod
+    def compute_indicator_arrays(open_values: np.ndarray, high_values: np.ndarray,
+                                 low_values: np.ndarray, close_values: np.ndarray,
+                                 volume_values: np.ndarray,
+                                 rsi_period: int = 14,
+                                 psar_af_init: float = 0.02,
+                                 psar_af_step: float = 0.02,
+                                 psar_af_max: float = 0.20,
+                                 engulfing_min_body_ratio: float = 0.5,
+                                 volume_avg_period: int = 20,
+                                 volume_anomaly_threshold: float = 1.0) -> Dict[str, np.ndarray]:
+        """
+        Fused kernel computing every indicator column from raw OHLCV arrays.
+        
+        Produces the same columns as calculate_all_indicators without touching
+        a DataFrame, so each derived column is allocated exactly once.
+        
+        Args:
+            open_values, high_values, low_values, close_values, volume_values:
+                1-D float arrays of equal length
+            Other args: Individual indicator parameters
+            
+        Returns:
+            Dict[str, np.ndarray]: Indicator column name -> values
+        """
+        n = len(close_values)
+        
+        # RSI
+        rsi_values = TechnicalIndicators._rsi_values(close_values, rsi_period)
+        
+        # PSAR (talib.SAR has no separate step, af_init is used for both)
+        if n < 2:
+            psar_values = np.full(n, np.nan)
+            psar_trend = np.full(n, 0)
+        else:
+            psar_values = talib.SAR(high_values, low_values,
+                                    acceleration=psar_af_init, maximum=psar_af_max)
+            psar_trend = np.where(close_values > psar_values, 1, -1)
+        
+        # Engulfing and bullish engulfing within the last 3 candles
+        engulfing = TechnicalIndicators._engulfing_signals(
+            open_values, close_values, engulfing_min_body_ratio
+        )
+        bullish = engulfing == 1
+        bullish_in_3 = bullish.copy()
+        bullish_in_3[1:] |= bullish[:-1]
+        bullish_in_3[2:] |= bullish[:-2]
+        
+        # Volume
+        avg_volume = TechnicalIndicators._volume_average(volume_values, volume_avg_period)
+        volume_anomaly = TechnicalIndicators._volume_anomalies(
+            volume_values, avg_volume, volume_anomaly_threshold
+        )
+        
+        # Body size ratio against the previous candle (0 when it had no body)
+        body_size = np.abs(close_values - open_values)
+        body_ratio = np.zeros(n)
+        if n > 1:
+            prev_body = body_size[:-1]
+            has_body = prev_body > 0
+            np.divide(body_size[1:], prev_body, out=body_ratio[1:], where=has_body)
+        
+        return {
+            'rsi': rsi_values,
+            'rsi_signal': TechnicalIndicators._rsi_signals(rsi_values),
+            'psar': psar_values,
+            'psar_trend': psar_trend,
+            'price_vs_psar': (close_values > psar_values).astype(int),
+            'engulfing_signal': engulfing.astype(float),
+            'engulfing_in_3_candles': bullish_in_3.astype(int),
+            'avg_volume_20': avg_volume,
+            'volume_anomaly': volume_anomaly,
+            'rsi_state': np.where(
+                rsi_values > 50, 'trending_up',
+                np.where(rsi_values < 50, 'trending_down', 'neutral')
+            ).astype(object),
+            'body_size': body_size,
+            'engulfing_body_size_ratio': body_ratio
+        }
+    
+    @staticmethod
+    def stack_panel(frames: Dict[str, pd.DataFrame],
+                    max_bars: Optional[int] = None) -> Tuple[List[str], Dict[str, np.ndarray], np.ndarray]:
+        """
+        Align per-ticker OHLCV frames into 2-D (tickers x bars) arrays.
+        
+        Histories are right-aligned on their latest bar and left-padded with
+        NaN, so column -1 is the most recent bar of every ticker.
+        
+        Args:
+            frames: Ticker -> OHLCV DataFrame
+            max_bars: Keep only the last N bars of each ticker (None for all)
+            
+        Returns:
+            Tuple: (tickers, column name -> 2-D array, valid bar count per ticker)
+        """
+        tickers = [ticker for ticker, df in frames.items() if df is not None and not df.empty]
+        lengths = np.array([len(frames[ticker]) for ticker in tickers], dtype=int)
+        if max_bars is not None:
+            lengths = np.minimum(lengths, max_bars)
+        n_bars = int(lengths.max()) if len(lengths) else 0
+        
+        panel = {}
+        for col in ['open', 'high', 'low', 'close', 'volume']:
+            values = np.full((len(tickers), n_bars), np.nan)
+            for row, (ticker, length) in enumerate(zip(tickers, lengths)):
+                values[row, n_bars - length:] = frames[ticker][col].to_numpy()[-length:]
+            panel[col] = values
+        
+        return tickers, panel, lengths
+    
+    @staticmethod
+    def calculate_panel_indicators(open_values: np.ndarray, high_values: np.ndarray,
+                                   low_values: np.ndarray, close_values: np.ndarray,
+                                   volume_values: np.ndarray,
+                                   lengths: Optional[np.ndarray] = None,
+                                   rsi_period: int = 14,
+                                   psar_af_init: float = 0.02,
+                                   psar_af_step: float = 0.02,
+                                   psar_af_max: float = 0.20,
+                                   engulfing_min_body_ratio: float = 0.5,
+                                   volume_avg_period: int = 20,
+                                   volume_anomaly_threshold: float = 1.0) -> Dict[str, np.ndarray]:
+        """
+        Calculate all indicators for a whole universe in one batched call.
+        
+        Inputs are 2-D (tickers x bars) arrays right-aligned on the latest bar;
+        shorter histories are left-padded with NaN (see stack_panel). Each row
+        gets exactly the values compute_indicator_arrays gives for that ticker
+        alone. Engulfing, volume and derived columns are vectorized across the
+        panel; RSI and PSAR are recursive in time and run through talib per row.
+        
+        Args:
+            open_values, high_values, low_values, close_values, volume_values:
+                2-D float arrays (tickers x bars)
+            lengths: Valid bar count per ticker (inferred from close padding if None)
+            Other args: Individual indicator parameters
+            
+        Returns:
+            Dict[str, np.ndarray]: Indicator column name -> 2-D values, plus a
+                boolean 'valid' mask marking real (non-padding) bars
+        """
+        n_tickers, n_bars = close_values.shape
+        if lengths is None:
+            has_data = ~np.isnan(close_values)
+            first_valid = np.where(has_data.any(axis=1), has_data.argmax(axis=1), n_bars)
+            lengths = n_bars - first_valid
+        lengths = np.asarray(lengths, dtype=int)
+        
+        # Local bar index within each ticker's own history (negative = padding)
+        local_index = np.arange(n_bars)[None, :] - (n_bars - lengths)[:, None]
+        valid = local_index >= 0
+        
+        # RSI and PSAR per row on the valid slice
+        rsi_values = np.full((n_tickers, n_bars), np.nan)
+        psar_values = np.full((n_tickers, n_bars), np.nan)
+        for row, length in enumerate(lengths):
+            if length < 2:
+                continue
+            start = n_bars - length
+            psar_values[row, start:] = talib.SAR(
+                high_values[row, start:], low_values[row, start:],
+                acceleration=psar_af_init, maximum=psar_af_max
+            )
+            if length >= rsi_period + 1:
+                rsi_values[row, start:] = talib.RSI(close_values[row, start:],
+                                                    timeperiod=rsi_period)
+        
+        psar_trend = np.where(close_values > psar_values, 1, -1)
+        psar_trend[~valid | (lengths < 2)[:, None]] = 0
+        
+        # Engulfing; NaN padding never forms a pattern
+        engulfing = TechnicalIndicators._engulfing_signals(
+            open_values, close_values, engulfing_min_body_ratio
+        )
+        bullish = engulfing == 1
+        bullish_in_3 = bullish.copy()
+        bullish_in_3[:, 1:] |= bullish[:, :-1]
+        bullish_in_3[:, 2:] |= bullish[:, :-2]
+        
+        # Volume SMA from a cumulative sum; short histories average available bars
+        period = volume_avg_period
+        cumulative = np.zeros((n_tickers, n_bars + 1))
+        np.cumsum(np.where(valid, volume_values, 0.0), axis=1, out=cumulative[:, 1:])
+        window_start = np.maximum(np.arange(n_bars) + 1 - period, 0)
+        window_sum = cumulative[:, 1:] - cumulative[:, window_start]
+        window_count = np.minimum(local_index + 1, period)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            avg_volume = window_sum / window_count
+        warming_up = (local_index < period - 1) & (lengths >= period)[:, None]
+        avg_volume[~valid | warming_up] = np.nan
+        volume_anomaly = TechnicalIndicators._volume_anomalies(
+            volume_values, avg_volume, volume_anomaly_threshold
+        )
+        
+        # Body size ratio against the previous candle
+        body_size = np.abs(close_values - open_values)
+        body_ratio = np.zeros((n_tickers, n_bars))
+        if n_bars > 1:
+            prev_body = body_size[:, :-1]
+            np.divide(body_size[:, 1:], prev_body, out=body_ratio[:, 1:],
+                      where=prev_body > 0)
+        
+        return {
+            'rsi': rsi_values,
+            'rsi_signal': TechnicalIndicators._rsi_signals(rsi_values),
+            'psar': psar_values,
+            'psar_trend': psar_trend,
+            'price_vs_psar': (close_values > psar_values).astype(int),
+            'engulfing_signal': engulfing.astype(float),
+            'engulfing_in_3_candles': bullish_in_3.astype(int),
+            'avg_volume_20': avg_volume,
+            'volume_anomaly': volume_anomaly,
+            'rsi_state': np.where(
+                rsi_values > 50, 'trending_up',
+                np.where(rsi_values < 50, 'trending_down', 'neutral')
+            ).astype(object),
+            'body_size': body_size,
+            'engulfing_body_size_ratio': body_ratio,
+            'valid': valid
+        }
+    
     @staticmethod
     def calculate_all_indicators(df: pd.DataFrame, 
                                rsi_period: int = 14,
@@ -270,7 +534,8 @@ class TechnicalIndicators:
                                volume_avg_period: int = 20,
                                volume_anomaly_threshold: float = 1.0,
                                incremental: bool = False,
-                               existing_df: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+                               existing_df: Optional[pd.DataFrame] = None,
+                               as_arrays: bool = False) -> Union[pd.DataFrame, Dict[str, np.ndarray]]:
         """
         Calculate all indicators for a complete dataset.
         
@@ -279,19 +544,22 @@ class TechnicalIndicators:
             Other args: Individual indicator parameters
             incremental: If True, calculate only for new data and merge with existing
             existing_df: Existing DataFrame with indicators (required if incremental=True)
+            as_arrays: If True, return a dict of column arrays instead of a DataFrame
+                (cheaper for callers that only read the last row)
             
         Returns:
             pd.DataFrame: Original data with added indicator columns
         """
         # Handle incremental calculation
         if incremental and existing_df is not None:
-            return TechnicalIndicators._calculate_incremental(
+            result_df = TechnicalIndicators._calculate_incremental(
                 df, existing_df, rsi_period, psar_af_init, psar_af_step, 
                 psar_af_max, engulfing_min_body_ratio, volume_avg_period, 
                 volume_anomaly_threshold
             )
-        
-        result_df = df.copy()
+            if as_arrays:
+                return {col: result_df[col].to_numpy() for col in result_df.columns}
+            return result_df
         
         # Ensure required columns exist
         required_cols = ['open', 'high', 'low', 'close', 'volume']
@@ -299,60 +567,25 @@ class TechnicalIndicators:
         if missing_cols:
             raise ValueError(f"Missing required columns: {missing_cols}")
         
-        # RSI Calculation
-        rsi_result = TechnicalIndicators.rsi(df['close'], period=rsi_period)
-        result_df['rsi'] = rsi_result.values
-        result_df['rsi_signal'] = rsi_result.signals
-        
-        # PSAR Calculation
-        psar_result = TechnicalIndicators.parabolic_sar(
-            df['high'], df['low'], df['close'],
-            af_init=psar_af_init, af_step=psar_af_step, af_max=psar_af_max
-        )
-        result_df['psar'] = psar_result.values
-        result_df['psar_trend'] = psar_result.signals
-        result_df['price_vs_psar'] = (df['close'] > psar_result.values).astype(int)
-        
-        # Engulfing Pattern
-        engulfing_result = TechnicalIndicators.engulfing_pattern(
-            df['open'], df['high'], df['low'], df['close'],
-            min_body_ratio=engulfing_min_body_ratio
+        indicators = TechnicalIndicators.compute_indicator_arrays(
+            *(df[col].to_numpy(dtype=float) for col in required_cols),
+            rsi_period=rsi_period,
+            psar_af_init=psar_af_init,
+            psar_af_step=psar_af_step,
+            psar_af_max=psar_af_max,
+            engulfing_min_body_ratio=engulfing_min_body_ratio,
+            volume_avg_period=volume_avg_period,
+            volume_anomaly_threshold=volume_anomaly_threshold
         )
-        result_df['engulfing_signal'] = engulfing_result.values
-        
-        # Check for engulfing in last 3 candles
-        result_df['engulfing_in_3_candles'] = 0
-        for i in range(len(result_df)):
-            lookback_start = max(0, i - 2)
-            if np.any(engulfing_result.values[lookback_start:i+1] == 1):
-                result_df.iloc[i, result_df.columns.get_loc('engulfing_in_3_candles')] = 1
-        
-        # Volume Analysis
-        volume_result = TechnicalIndicators.volume_analysis(
-            df['volume'], avg_period=volume_avg_period,
-            anomaly_threshold=volume_anomaly_threshold
-        )
-        result_df['avg_volume_20'] = volume_result.values
-        result_df['volume_anomaly'] = volume_result.signals
-        
-        # Calculate additional derived fields
-        result_df['rsi_state'] = 'neutral'
-        result_df.loc[result_df['rsi'] > 70, 'rsi_state'] = 'overbought'
-        result_df.loc[result_df['rsi'] < 30, 'rsi_state'] = 'oversold'
-        result_df.loc[result_df['rsi'] > 50, 'rsi_state'] = 'trending_up'
-        result_df.loc[result_df['rsi'] < 50, 'rsi_state'] = 'trending_down'
-        
-        # Body size ratio for engulfing
-        body_sizes = abs(df['close'] - df['open'])
-        result_df['body_size'] = body_sizes
-        result_df['engulfing_body_size_ratio'] = 0.0
-        
-        for i in range(1, len(result_df)):
-            if body_sizes.iloc[i-1] > 0:
-                ratio = body_sizes.iloc[i] / body_sizes.iloc[i-1]
-                result_df.iloc[i, result_df.columns.get_loc('engulfing_body_size_ratio')] = ratio
-        
-        return result_df
+        
+        # Original columns first, indicator columns replace any stale copies
+        columns = {col: df[col].to_numpy() for col in df.columns}
+        columns.update(indicators)
+        
+        if as_arrays:
+            return columns
+        
+        return pd.DataFrame(columns, index=df.index)
     
     @staticmethod
     def _calculate_incremental(new_df: pd.DataFrame, existing_df: pd.DataFrame,
@@ -373,30 +606,20 @@ class TechnicalIndicators:
         if new_df.empty:
             return existing_df
         
-        # Determine how much historical data we need for accurate calculation
-        max_lookback = max(rsi_period, volume_avg_period, 3)  # 3 for engulfing pattern
-        
-        # Get sufficient historical data for context
-        if len(existing_df) >= max_lookback:
-            context_df = existing_df.tail(max_lookback)
-        else:
-            context_df = existing_df
-        
-        # Combine context data with new data for calculation
-        combined_df = pd.concat([context_df, new_df], ignore_index=False)
+        # PSAR depends on the whole history, so a fixed context window is not
+        # enough: run the fused kernel over all OHLCV bars (cheap, a few ms for
+        # thousands of bars). Use StreamingIndicators for O(1) per-bar updates.
+        combined_df = pd.concat([existing_df, new_df], ignore_index=False)
         
-        # Calculate indicators on combined data
         full_result = TechnicalIndicators.calculate_all_indicators(
             combined_df, rsi_period, psar_af_init, psar_af_step,
             psar_af_max, engulfing_min_body_ratio, volume_avg_period,
             volume_anomaly_threshold, incremental=False
         )
         
-        # Extract only the new data portion with calculated indicators
-        new_data_start_idx = len(context_df)
-        new_result = full_result.iloc[new_data_start_idx:].copy()
+        # Existing rows stay unchanged, only the new rows take fresh values
+        new_result = full_result.iloc[len(existing_df):]
         
-        # Combine existing data (unchanged) with new calculated data
         if not existing_df.empty:
             final_result = pd.concat([existing_df, new_result], ignore_index=False)
         else:
@@ -405,6 +628,358 @@ class TechnicalIndicators:
         return final_result
 
 
+class StreamingIndicators:
+    """
+    Stateful O(1) indicator engine for a single ticker.
+    
+    Keeps Wilder RSI averages, PSAR trend/EP/AF, a rolling volume window and
+    the previous candle, so each new bar costs a constant amount of work.
+    Every row returned by update() equals the last row calculate_all_indicators
+    would produce on the full history up to that bar (PSAR matches talib.SAR
+    when af_step == af_init, which is what talib assumes).
+    """
+    
+    def __init__(self,
+                 rsi_period: int = 14,
+                 psar_af_init: float = 0.02,
+                 psar_af_step: float = 0.02,
+                 psar_af_max: float = 0.20,
+                 engulfing_min_body_ratio: float = 0.5,
+                 volume_avg_period: int = 20,
+                 volume_anomaly_threshold: float = 1.0):
+        """
+        Initialize streaming indicator state.
+        
+        Args:
+            Indicator parameters, same as calculate_all_indicators
+        """
+        self.rsi_period = rsi_period
+        self.psar_af_init = psar_af_init
+        self.psar_af_step = psar_af_step
+        self.psar_af_max = psar_af_max
+        self.engulfing_min_body_ratio = engulfing_min_body_ratio
+        self.volume_avg_period = volume_avg_period
+        self.volume_anomaly_threshold = volume_anomaly_threshold
+        
+        self.bar_count = 0
+        
+        # Wilder RSI state
+        self.prev_close: Optional[float] = None
+        self.avg_gain = 0.0
+        self.avg_loss = 0.0
+        
+        # PSAR state
+        self.psar_is_long = True
+        self.psar_sar = np.nan
+        self.psar_ep = np.nan
+        self.psar_af = psar_af_init
+        self.prev_high = np.nan
+        self.prev_low = np.nan
+        
+        # Rolling volume window
+        self.volume_window: Deque[float] = deque()
+        self.volume_sum = 0.0
+        
+        # Previous candle and recent engulfing signals
+        self.prev_open = np.nan
+        self.recent_engulfing: Deque[int] = deque(maxlen=3)
+        
+        # Start time of the last committed bar (None when not known)
+        self.last_timestamp: Optional[pd.Timestamp] = None
+    
+    @classmethod
+    def from_history(cls, df: pd.DataFrame, **params) -> 'StreamingIndicators':
+        """
+        Build an engine and replay an OHLCV history through it.
+        
+        Args:
+            df: OHLCV DataFrame with columns: open, high, low, close, volume
+            **params: Indicator parameters
+            
+        Returns:
+            StreamingIndicators: Engine positioned after the last bar
+        """
+        engine = cls(**params)
+        engine.update_many(df)
+        return engine
+    
+    def update_many(self, df: pd.DataFrame) -> Optional[Dict[str, Any]]:
+        """Apply every bar of an OHLCV DataFrame, returning the last row."""
+        row = None
+        for bar in zip(*(df[col].to_numpy(dtype=float)
+                         for col in ['open', 'high', 'low', 'close', 'volume'])):
+            row = self.update(*bar)
+        if row is not None and 'timestamp' in df.columns:
+            self.last_timestamp = pd.Timestamp(df['timestamp'].iloc[-1])
+        return row
+    
+    def catch_up(self, df: pd.DataFrame) -> Optional[int]:
+        """
+        Apply only the bars of an OHLCV history newer than the last committed bar.
+        
+        Args:
+            df: OHLCV DataFrame with a timestamp column
+            
+        Returns:
+            Optional[int]: Number of bars applied, or None when the history
+                doesn't reach back to the last committed bar (the gap can't
+                be filled and the engine should be rebuilt)
+        """
+        if self.last_timestamp is None or df.empty or 'timestamp' not in df.columns:
+            return None
+        
+        timestamps = pd.to_datetime(df['timestamp'])
+        try:
+            if timestamps.iloc[0] > self.last_timestamp:
+                return None
+            newer = df[(timestamps > self.last_timestamp).to_numpy()]
+        except TypeError:  # tz-aware vs naive timestamps
+            return None
+        
+        self.update_many(newer)
+        return len(newer)
+    
+    def update(self, open_price: float, high: float, low: float,
+               close: float, volume: float,
+               timestamp: Optional[datetime] = None) -> Dict[str, Any]:
+        """
+        Commit a finished bar and return its indicator row.
+        
+        Args:
+            open_price, high, low, close, volume: Bar values
+            timestamp: Bar start time, kept for catch_up() after a restore
+            
+        Returns:
+            Dict[str, Any]: Same columns as calculate_all_indicators
+        """
+        row = self._step(float(open_price), float(high), float(low),
+                         float(close), float(volume), commit=True)
+        if timestamp is not None:
+            self.last_timestamp = pd.Timestamp(timestamp)
+        return row
+    
+    def to_state(self) -> Dict[str, Any]:
+        """
+        Serialize parameters and state to a JSON-compatible dict.
+        
+        Returns:
+            Dict[str, Any]: State accepted by from_state()
+        """
+        return {
+            'params': self.params,
+            'bar_count': self.bar_count,
+            'prev_open': self.prev_open,
+            'prev_close': self.prev_close,
+            'avg_gain': self.avg_gain,
+            'avg_loss': self.avg_loss,
+            'psar': [self.psar_is_long, self.psar_sar, self.psar_ep, self.psar_af,
+                     self.prev_high, self.prev_low],
+            'volume_window': list(self.volume_window),
+            'volume_sum': self.volume_sum,
+            'recent_engulfing': list(self.recent_engulfing),
+            'last_timestamp': self.last_timestamp.isoformat() if self.last_timestamp is not None else None
+        }
+    
+    @classmethod
+    def from_state(cls, state: Dict[str, Any]) -> 'StreamingIndicators':
+        """
+        Rebuild an engine from to_state() output.
+        
+        Args:
+            state: Serialized engine state
+            
+        Returns:
+            StreamingIndicators: Engine positioned after the same bar
+        """
+        engine = cls(**state['params'])
+        engine.bar_count = state['bar_count']
+        engine.prev_open = state['prev_open']
+        engine.prev_close = state['prev_close']
+        engine.avg_gain = state['avg_gain']
+        engine.avg_loss = state['avg_loss']
+        (engine.psar_is_long, engine.psar_sar, engine.psar_ep, engine.psar_af,
+         engine.prev_high, engine.prev_low) = state['psar']
+        engine.volume_window = deque(state['volume_window'])
+        engine.volume_sum = state['volume_sum']
+        engine.recent_engulfing = deque(state['recent_engulfing'], maxlen=3)
+        if state.get('last_timestamp'):
+            engine.last_timestamp = pd.Timestamp(state['last_timestamp'])
+        return engine
+    
+    @property
+    def params(self) -> Dict[str, Any]:
+        """Indicator parameters, as passed to the constructor."""
+        return {
+            'rsi_period': self.rsi_period,
+            'psar_af_init': self.psar_af_init,
+            'psar_af_step': self.psar_af_step,
+            'psar_af_max': self.psar_af_max,
+            'engulfing_min_body_ratio': self.engulfing_min_body_ratio,
+            'volume_avg_period': self.volume_avg_period,
+            'volume_anomaly_threshold': self.volume_anomaly_threshold
+        }
+    
+    def preview(self, open_price: float, high: float, low: float,
+                close: float, volume: float) -> Dict[str, Any]:
+        """
+        Indicator row for a bar that is still forming, without changing state.
+        
+        Lets per-tick updates re-evaluate the current bar repeatedly and commit
+        it once with update() when the bar closes.
+        """
+        return self._step(float(open_price), float(high), float(low),
+                          float(close), float(volume), commit=False)
+    
+    def _step(self, open_price: float, high: float, low: float,
+              close: float, volume: float, commit: bool) -> Dict[str, Any]:
+        """Advance every indicator by one bar."""
+        index = self.bar_count
+        
+        # RSI with Wilder smoothing, seeded by the simple average of the first
+        # rsi_period changes (same as talib.RSI)
+        avg_gain, avg_loss = self.avg_gain, self.avg_loss
+        rsi = np.nan
+        if index > 0:
+            change = close - self.prev_close
+            gain, loss = max(change, 0.0), max(-change, 0.0)
+            period = self.rsi_period
+            if index < period:
+                avg_gain += gain
+                avg_loss += loss
+            elif index == period:
+                avg_gain = (avg_gain + gain) / period
+                avg_loss = (avg_loss + loss) / period
+            else:
+                avg_gain = (avg_gain * (period - 1) + gain) / period
+                avg_loss = (avg_loss * (period - 1) + loss) / period
+            if index >= period:
+                total = avg_gain + avg_loss
+                rsi = 100.0 * (avg_gain / total) if abs(total) >= 1e-8 else 0.0
+        
+        # PSAR
+        psar, psar_state = self._psar_step(index, high, low)
+        if index == 0:
+            psar_trend = 0
+        else:
+            psar_trend = 1 if close > psar else -1
+        
+        # Engulfing against the previous candle
+        engulfing = 0
+        if index > 0:
+            engulfing = int(TechnicalIndicators._engulfing_signals(
+                np.array([self.prev_open, open_price]),
+                np.array([self.prev_close, close]),
+                self.engulfing_min_body_ratio
+            )[-1])
+        recent = list(self.recent_engulfing)[-2:] + [engulfing]
+        
+        # Body size ratio
+        body_size = abs(close - open_price)
+        prev_body = abs(self.prev_close - self.prev_open) if index > 0 else np.nan
+        body_ratio = body_size / prev_body if prev_body > 0 else 0.0
+        
+        # Volume SMA; short histories average the available bars
+        window = self.volume_window
+        volume_sum = self.volume_sum + volume
+        dropped = window[0] if len(window) >= self.volume_avg_period else None
+        if dropped is not None:
+            volume_sum -= dropped
+        count = min(len(window) + 1, self.volume_avg_period)
+        avg_volume = volume_sum / count
+        volume_anomaly = int(avg_volume > 0 and volume > self.volume_anomaly_threshold * avg_volume)
+        
+        if commit:
+            self.bar_count = index + 1
+            self.prev_open, self.prev_close = open_price, close
+            self.avg_gain, self.avg_loss = avg_gain, avg_loss
+            (self.psar_is_long, self.psar_sar, self.psar_ep,
+             self.psar_af, self.prev_high, self.prev_low) = psar_state
+            self.recent_engulfing.append(engulfing)
+            if dropped is not None:
+                window.popleft()
+            window.append(volume)
+            self.volume_sum = volume_sum
+        
+        return {
+            'open': open_price,
+            'high': high,
+            'low': low,
+            'close': close,
+            'volume': volume,
+            'rsi': rsi,
+            'rsi_signal': int(TechnicalIndicators._rsi_signals(np.array([rsi]))[0]),
+            'psar': psar,
+            'psar_trend': psar_trend,
+            'price_vs_psar': int(close > psar),
+            'engulfing_signal': float(engulfing),
+            'engulfing_in_3_candles': int(1 in recent),
+            'avg_volume_20': avg_volume,
+            'volume_anomaly': volume_anomaly,
+            'rsi_state': ('trending_up' if rsi > 50 else
+                          'trending_down' if rsi < 50 else 'neutral'),
+            'body_size': body_size,
+            'engulfing_body_size_ratio': body_ratio
+        }
+    
+    def _psar_step(self, index: int, high: float, low: float) -> Tuple[float, tuple]:
+        """
+        PSAR value for this bar and the state to carry forward.
+        
+        Follows talib.SAR: the first bar has no value, the second picks the
+        initial direction from the -DM of the first two bars.
+        """
+        is_long, sar, ep, af = self.psar_is_long, self.psar_sar, self.psar_ep, self.psar_af
+        prev_high, prev_low = self.prev_high, self.prev_low
+        
+        if index == 0:
+            return np.nan, (is_long, sar, ep, af, high, low)
+        
+        if index == 1:
+            # Initial direction: short only when the low dropped more than the high rose
+            minus_dm = prev_low - low
+            is_long = not (minus_dm > 0 and high - prev_high < minus_dm)
+            if is_long:
+                ep, sar = high, prev_low
+            else:
+                ep, sar = low, prev_high
+            af = self.psar_af_init
+            # talib compares the second bar against itself on its first iteration
+            prev_high, prev_low = high, low
+        
+        if is_long:
+            if low <= sar:
+                # Switch to short, SAR jumps to the extreme point
+                is_long = False
+                sar = max(ep, prev_high, high)
+                output = sar
+                af = self.psar_af_init
+                ep = low
+                sar = max(sar + af * (ep - sar), prev_high, high)
+            else:
+                output = sar
+                if high > ep:
+                    ep = high
+                    af = min(af + self.psar_af_step, self.psar_af_max)
+                sar = min(sar + af * (ep - sar), prev_low, low)
+        else:
+            if high >= sar:
+                # Switch to long, SAR jumps to the extreme point
+                is_long = True
+                sar = min(ep, prev_low, low)
+                output = sar
+                af = self.psar_af_init
+                ep = high
+                sar = min(sar + af * (ep - sar), prev_low, low)
+            else:
+                output = sar
+                if low < ep:
+                    ep = low
+                    af = min(af + self.psar_af_step, self.psar_af_max)
+                sar = max(sar + af * (ep - sar), prev_high, high)
+        
+        return output, (is_long, sar, ep, af, high, low)
+
+
 class IndicatorValidator:
     """Validator for indicator calculations and signals."""
     
@@ -0,0 +1,311 @@
+"""Per-endpoint rate limiting for FiinQuant API calls.
+Token buckets bound the request rate, semaphores bound concurrency, and
+rate-limit responses shrink the rate and back off with jitter.
+"""
+
+import asyncio
+import logging
+import random
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Optional
+
+import numpy as np
+
+DEFAULT_LIMITS = {
+    'rate': 5.0,            # Requests per second
+    'burst': 10,            # Bucket capacity
+    'max_concurrent': 4,    # Requests in flight
+    'max_retries': 4,       # Retries after rate-limit errors
+    'backoff_base': 1.0,    # Seconds, doubled per retry
+    'backoff_max': 30.0,    # Seconds
+    'min_rate': 0.5         # Floor for the adaptive rate
+}
+
+RATE_LIMIT_MARKERS = ('429', 'too many requests', 'rate limit', 'rate-limit', 'throttl')
+
+
+def is_rate_limit_error(error: Exception) -> bool:
+    """Whether an exception looks like a 429 / rate-limit response."""
+    status = getattr(error, 'status_code', None) or getattr(getattr(error, 'response', None), 'status_code', None)
+    if status == 429:
+        return True
+    message = str(error).lower()
+    return any(marker in message for marker in RATE_LIMIT_MARKERS)
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket.
+    
+    Tokens are reserved up front: reserve() returns how long the caller
+    must wait before using its token, so sync callers can time.sleep()
+    and coroutines can asyncio.sleep() on the same bucket.
+    """
+    
+    def __init__(self, rate: float, burst: int):
+        """
+        Initialize token bucket.
+        
+        Args:
+            rate: Tokens added per second
+            burst: Bucket capacity
+        """
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def reserve(self) -> float:
+        """
+        Take a token.
+        
+        Returns:
+            float: Seconds to wait before the token may be used
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            return -self._tokens / self.rate if self._tokens < 0 else 0.0
+    
+    def set_rate(self, rate: float):
+        """Change the refill rate (tokens accrued so far are kept)."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self.rate = rate
+
+
+class EndpointGovernor:
+    """
+    Rate and concurrency governor for one API endpoint.
+    
+    Rate-limit errors halve the current rate (down to min_rate) and are
+    retried after a full-jitter exponential backoff; each success
+    restores a tenth of the configured rate.
+    """
+    
+    def __init__(self, name: str, rate: float, burst: int, max_concurrent: int,
+                 max_retries: int, backoff_base: float, backoff_max: float,
+                 min_rate: float, latency_window: int = 1000):
+        """
+        Initialize endpoint governor.
+        
+        Args:
+            name: Endpoint name (for logs and metrics)
+            rate: Configured requests per second
+            burst: Token bucket capacity
+            max_concurrent: Maximum requests in flight
+            max_retries: Retries after rate-limit errors
+            backoff_base: First backoff ceiling in seconds
+            backoff_max: Maximum backoff ceiling in seconds
+            min_rate: Lowest rate the adaptive limit may reach
+            latency_window: Number of recent queueing delays kept
+        """
+        self.logger = logging.getLogger(__name__)
+        self.name = name
+        self.configured_rate = rate
+        self.min_rate = min(min_rate, rate)
+        self.max_concurrent = max_concurrent
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        
+        self.bucket = TokenBucket(rate, burst)
+        self._slots = threading.BoundedSemaphore(max_concurrent)
+        self._lock = threading.Lock()
+        
+        # Metrics
+        self._queue_delays: Deque[float] = deque(maxlen=latency_window)
+        self.calls = 0
+        self.errors = 0
+        self.rate_limited = 0
+        self.retries = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+    
+    def _backoff(self, attempt: int) -> float:
+        """Full-jitter exponential backoff for a retry attempt."""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+    
+    def _on_success(self):
+        with self._lock:
+            if self.bucket.rate < self.configured_rate:
+                self.bucket.set_rate(min(self.configured_rate, self.bucket.rate + self.configured_rate / 10))
+    
+    def _on_rate_limited(self):
+        with self._lock:
+            self.rate_limited += 1
+            self.bucket.set_rate(max(self.min_rate, self.bucket.rate / 2))
+        self.logger.warning(f"{self.name} rate limited, rate lowered to {self.bucket.rate:.2f}/s")
+    
+    def _enter(self, queued_at: float):
+        with self._lock:
+            self._queue_delays.append(time.monotonic() - queued_at)
+            self.calls += 1
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+    
+    def _exit(self):
+        with self._lock:
+            self.in_flight -= 1
+    
+    def _should_retry(self, error: Exception, attempt: int) -> bool:
+        """Record a failed call; True if it should be retried after a backoff."""
+        if not is_rate_limit_error(error):
+            with self._lock:
+                self.errors += 1
+            return False
+        
+        self._on_rate_limited()
+        if attempt >= self.max_retries:
+            with self._lock:
+                self.errors += 1
+            return False
+        
+        with self._lock:
+            self.retries += 1
+        return True
+    
+    def call(self, func: Callable, *args, **kwargs) -> Any:
+        """
+        Run a blocking call under the endpoint limits.
+        
+        Args:
+            func: Callable performing the request
+            *args, **kwargs: Arguments for func
+        
+        Returns:
+            Result of func
+        """
+        for attempt in range(self.max_retries + 1):
+            queued_at = time.monotonic()
+            delay = self.bucket.reserve()
+            if delay > 0:
+                time.sleep(delay)
+            
+            with self._slots:
+                self._enter(queued_at)
+                try:
+                    result = func(*args, **kwargs)
+                except Exception as e:
+                    if not self._should_retry(e, attempt):
+                        raise
+                else:
+                    self._on_success()
+                    return result
+                finally:
+                    self._exit()
+            
+            time.sleep(self._backoff(attempt))
+    
+    async def acall(self, func: Callable, *args, **kwargs) -> Any:
+        """
+        Run a blocking call under the endpoint limits without blocking the event loop.
+        
+        Waits use asyncio.sleep, the call itself runs in a worker thread, and
+        concurrency slots are shared with synchronous callers.
+        
+        Args:
+            func: Callable performing the request
+            *args, **kwargs: Arguments for func
+        
+        Returns:
+            Result of func
+        """
+        for attempt in range(self.max_retries + 1):
+            queued_at = time.monotonic()
+            delay = self.bucket.reserve()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            
+            # Poll rather than block a thread on the semaphore, so cancellation can't leak a slot
+            while not self._slots.acquire(blocking=False):
+                await asyncio.sleep(0.01)
+            try:
+                self._enter(queued_at)
+                try:
+                    result = await asyncio.to_thread(func, *args, **kwargs)
+                except Exception as e:
+                    if not self._should_retry(e, attempt):
+                        raise
+                else:
+                    self._on_success()
+                    return result
+                finally:
+                    self._exit()
+            finally:
+                self._slots.release()
+            
+            await asyncio.sleep(self._backoff(attempt))
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get endpoint metrics (queueing delay in milliseconds)."""
+        with self._lock:
+            delays = np.array(self._queue_delays) * 1000
+            stats = {
+                'rate': self.bucket.rate,
+                'configured_rate': self.configured_rate,
+                'max_concurrent': self.max_concurrent,
+                'calls': self.calls,
+                'errors': self.errors,
+                'rate_limited': self.rate_limited,
+                'retries': self.retries,
+                'in_flight': self.in_flight,
+                'max_in_flight': self.max_in_flight
+            }
+        
+        stats['queue_delay_ms'] = {
+            'avg': float(delays.mean()),
+            'p95': float(np.percentile(delays, 95)),
+            'max': float(delays.max())
+        } if len(delays) else None
+        return stats
+
+
+class RateGovernor:
+    """
+    Registry of endpoint governors.
+    
+    Limits come from a config mapping of endpoint name to settings; a
+    'default' entry applies to endpoints without their own settings.
+    """
+    
+    def __init__(self, limits: Optional[Dict[str, Dict[str, Any]]] = None):
+        """
+        Initialize rate governor.
+        
+        Args:
+            limits: Endpoint name -> settings (see DEFAULT_LIMITS for the keys)
+        """
+        self.limits = limits or {}
+        self._endpoints: Dict[str, EndpointGovernor] = {}
+        self._lock = threading.Lock()
+    
+    def endpoint(self, name: str) -> EndpointGovernor:
+        """Get or create the governor of an endpoint."""
+        with self._lock:
+            governor = self._endpoints.get(name)
+            if governor is None:
+                settings = {**DEFAULT_LIMITS, **self.limits.get('default', {}), **self.limits.get(name, {})}
+                governor = self._endpoints[name] = EndpointGovernor(name, **settings)
+            return governor
+    
+    def call(self, endpoint: str, func: Callable, *args, **kwargs) -> Any:
+        """Run a blocking call under an endpoint's limits."""
+        return self.endpoint(endpoint).call(func, *args, **kwargs)
+    
+    async def acall(self, endpoint: str, func: Callable, *args, **kwargs) -> Any:
+        """Run a blocking call under an endpoint's limits from a coroutine."""
+        return await self.endpoint(endpoint).acall(func, *args, **kwargs)
+    
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Get metrics of every endpoint used so far."""
+        with self._lock:
+            endpoints = dict(self._endpoints)
+        return {name: governor.get_stats() for name, governor in endpoints.items()}
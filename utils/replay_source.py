@@ -0,0 +1,468 @@
+"""Offline replay data source.
+Serves historical bars and a realtime tick stream from local CSV, Parquet
+or SQLite files at a configurable speed, so the monitor, orchestrator and
+dashboard can run and be benchmarked without FiinQuant or a network.
+"""
+
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+import pytz
+
+from utils.bar_builder import parse_timeframe
+from utils.data_source import DataSource, MarketDataPoint
+from utils.stream_dispatcher import StreamDispatcher
+
+OHLCV_COLUMNS = ['open', 'high', 'low', 'close', 'volume']
+
+# Column aliases of the supported file layouts (market_data table, FiinQuant exports)
+COLUMN_ALIASES = {
+    'open_price': 'open', 'high_price': 'high', 'low_price': 'low', 'close_price': 'close',
+    'time': 'timestamp', 'date': 'timestamp', 'datetime': 'timestamp', 'symbol': 'ticker'
+}
+
+
+class ReplayDataSource(DataSource):
+    """
+    Data source replaying local history.
+    
+    Bars are loaded from a CSV/Parquet file with a 'ticker' column, a
+    directory of per-ticker files (named after the ticker), or the
+    market_data table of the SQLite database. A replay clock decides what
+    is visible: historical fetches only return bars that have closed
+    before it. Streaming replays ticks from the clock onwards, either from
+    a tick file or synthesized from bars (open, low/high, close, with the
+    bar volume spread over them), and advances the clock as it goes.
+    """
+    
+    simulated = True
+    io_thread_prefix = "replay-io"
+    
+    def __init__(self, path: Union[str, Path],
+                 ticks_path: Optional[Union[str, Path]] = None,
+                 speed: Optional[float] = None,
+                 start: Optional[str] = None,
+                 base_timeframe: str = '15m',
+                 timezone: str = 'Asia/Ho_Chi_Minh',
+                 stream_workers: int = 1,
+                 stream_queue_size: int = 10000,
+                 batch_size: int = 50,
+                 io_workers: int = 8,
+                 request_timeout: Optional[float] = None):
+        """
+        Initialize replay data source.
+        
+        Args:
+            path: Bar source (CSV/Parquet file, directory of them, or SQLite database)
+            ticks_path: Optional CSV/Parquet of ticks (ticker, timestamp, price,
+                volume as cumulative session volume, optional match_volume)
+            speed: Replay speed as a multiple of real time (1, 100, ...; None
+                replays as fast as possible)
+            start: Replay clock start (default: start of the last day in the data)
+            base_timeframe: Timeframe of the stored bars; coarser timeframes
+                are resampled from it
+            timezone: Exchange timezone of naive timestamps
+            stream_workers: Threads running stream callbacks
+            stream_queue_size: Maximum queued stream events
+            batch_size: Maximum tickers per task in async batch fetches
+            io_workers: Threads of the executor behind the async API
+            request_timeout: Default per-call timeout of the async API
+        """
+        super().__init__(batch_size=batch_size, io_workers=io_workers, request_timeout=request_timeout)
+        self.path = Path(path)
+        self.ticks_path = Path(ticks_path) if ticks_path else None
+        self.speed = speed
+        self.start = pd.Timestamp(start) if start else None
+        self.base_timeframe = base_timeframe
+        self.bar_length = pd.Timedelta(parse_timeframe(base_timeframe))
+        self.tz = pytz.timezone(timezone)
+        
+        self._bars: Optional[Dict[str, pd.DataFrame]] = None
+        self._resampled: Dict[tuple, pd.DataFrame] = {}
+        self._load_lock = threading.Lock()
+        self._cursor: Optional[pd.Timestamp] = None
+        
+        # Realtime streaming
+        self.stream_active = False
+        self.stream_thread = None
+        self.stream_stop_event = threading.Event()
+        self.stream_finished = threading.Event()
+        self.stream_workers = stream_workers
+        self.stream_queue_size = stream_queue_size
+        self.stream_dispatcher: Optional[StreamDispatcher] = None
+        self.ticks_replayed = 0
+        self.replay_seconds = 0.0
+    
+    def _normalize(self, df: pd.DataFrame, ticker: Optional[str] = None) -> pd.DataFrame:
+        """Standardize columns and make timestamps naive exchange time."""
+        df = df.rename(columns=lambda c: COLUMN_ALIASES.get(str(c).lower(), str(c).lower()))
+        if 'timestamp' not in df.columns:
+            df = df.reset_index().rename(columns={'index': 'timestamp'})
+        if ticker is not None and 'ticker' not in df.columns:
+            df['ticker'] = ticker
+        
+        timestamps = pd.to_datetime(df['timestamp'])
+        if timestamps.dt.tz is not None:
+            timestamps = timestamps.dt.tz_convert(self.tz).dt.tz_localize(None)
+        df['timestamp'] = timestamps
+        return df
+    
+    @staticmethod
+    def _read_file(path: Path) -> pd.DataFrame:
+        """Read a CSV or Parquet file."""
+        if path.suffix.lower() == '.parquet':
+            return pd.read_parquet(path)
+        return pd.read_csv(path)
+    
+    def _read_bars(self) -> pd.DataFrame:
+        """Read every bar of the source."""
+        if self.path.is_dir():
+            files = sorted(p for p in self.path.iterdir() if p.suffix.lower() in ('.csv', '.parquet'))
+            frames = [self._normalize(self._read_file(p), ticker=p.stem.upper()) for p in files]
+            return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+        
+        if self.path.suffix.lower() in ('.db', '.sqlite', '.sqlite3'):
+            with sqlite3.connect(str(self.path)) as conn:
+                df = pd.read_sql_query(
+                    "SELECT timestamp, ticker, open_price, high_price, low_price, close_price, volume "
+                    "FROM market_data WHERE timeframe = ?",
+                    conn, params=(self.base_timeframe,)
+                )
+            return self._normalize(df)
+        
+        return self._normalize(self._read_file(self.path))
+    
+    def _load(self) -> Dict[str, pd.DataFrame]:
+        """Load and index the bars once."""
+        with self._load_lock:
+            if self._bars is None:
+                df = self._read_bars()
+                bars = {}
+                if not df.empty:
+                    df = df.sort_values(['ticker', 'timestamp'], kind='stable')
+                    df = df.drop_duplicates(['ticker', 'timestamp'], keep='last')
+                    for ticker, frame in df.groupby('ticker', sort=False):
+                        bars[ticker] = frame[['timestamp', *OHLCV_COLUMNS]].reset_index(drop=True)
+                
+                if self.start is None and bars:
+                    last = max(frame['timestamp'].iloc[-1] for frame in bars.values())
+                    self.start = last.normalize()
+                self._cursor = self.start
+                self._bars = bars
+                self.logger.info(f"Replay source loaded {sum(map(len, bars.values()))} bars "
+                                 f"for {len(bars)} tickers from {self.path}")
+            return self._bars
+    
+    def _series(self, ticker: str, timeframe: str) -> Optional[pd.DataFrame]:
+        """All bars of a ticker in a timeframe (resampled from the base timeframe if needed)."""
+        base = self._load().get(ticker)
+        if base is None or timeframe == self.base_timeframe:
+            return base
+        
+        length = pd.Timedelta(parse_timeframe(timeframe))
+        if length < self.bar_length:
+            raise ValueError(f"Cannot replay {timeframe} bars from {self.base_timeframe} data")
+        
+        key = (ticker, timeframe)
+        if key not in self._resampled:
+            rule = 'D' if length >= pd.Timedelta(days=1) else length
+            resampled = base.set_index('timestamp').resample(rule, label='left', closed='left').agg({
+                'open': 'first', 'high': 'max', 'low': 'min', 'close': 'last', 'volume': 'sum'
+            })
+            self._resampled[key] = resampled.dropna(subset=['open']).reset_index()
+        return self._resampled[key]
+    
+    def _visible(self, df: pd.DataFrame, timeframe: str) -> pd.DataFrame:
+        """Bars that closed before the replay clock."""
+        if self._cursor is None:
+            return df
+        length = pd.Timedelta(parse_timeframe(timeframe))
+        return df[df['timestamp'] + length <= self._cursor]
+    
+    def login(self) -> bool:
+        """Load the source (no authentication needed)."""
+        try:
+            self._load()
+            return True
+        except Exception as e:
+            self.logger.error(f"Failed to load replay data from {self.path}: {str(e)}")
+            return False
+    
+    def fetch_historical_data(self, tickers: List[str],
+                              timeframe: str = "15m",
+                              period: int = 100,
+                              from_date: Optional[str] = None,
+                              to_date: Optional[str] = None,
+                              fields: Optional[List[str]] = None,
+                              incremental: bool = False,
+                              use_cache: bool = True) -> pd.DataFrame:
+        """
+        Get bars visible at the replay clock.
+        
+        Args:
+            tickers: List of stock symbols
+            timeframe: Time frame (base timeframe or coarser)
+            period: Number of most recent bars (if not using a date range)
+            from_date: Start date (YYYY-MM-DD format)
+            to_date: End date (YYYY-MM-DD format, inclusive)
+            fields: Value columns to return (default OHLCV)
+            incremental: Unused (kept for interface compatibility)
+            use_cache: Unused (data is served from memory)
+        
+        Returns:
+            pd.DataFrame: Bars with 'ticker' and 'timestamp' columns
+        """
+        frames = []
+        for ticker in tickers:
+            series = self._series(ticker, timeframe)
+            if series is None:
+                continue
+            
+            series = self._visible(series, timeframe)
+            if from_date or to_date:
+                if from_date:
+                    series = series[series['timestamp'] >= pd.Timestamp(from_date)]
+                if to_date:
+                    series = series[series['timestamp'] < pd.Timestamp(to_date) + pd.Timedelta(days=1)]
+            else:
+                series = series.iloc[-period:]
+            
+            frames.append(series.assign(ticker=ticker)[['ticker', 'timestamp', *(fields or OHLCV_COLUMNS)]])
+        
+        if not frames:
+            return pd.DataFrame()
+        return pd.concat(frames, ignore_index=True)
+    
+    def fetch_historical_data_batch(self, tickers: List[str],
+                                    timeframe: str = "15m",
+                                    period: int = 100,
+                                    fields: Optional[List[str]] = None,
+                                    use_cache: bool = True) -> Dict[str, pd.DataFrame]:
+        """
+        Get the last period visible bars of many tickers.
+        
+        Args:
+            tickers: List of stock symbols
+            timeframe: Time frame (base timeframe or coarser)
+            period: Number of periods
+            fields: Value columns to return (default OHLCV)
+            use_cache: Unused (data is served from memory)
+        
+        Returns:
+            Dict[str, pd.DataFrame]: Frames by ticker (tickers without data are omitted)
+        """
+        data = self.fetch_historical_data(tickers, timeframe=timeframe, period=period, fields=fields)
+        if data.empty:
+            return {}
+        return {
+            ticker: frame.reset_index(drop=True)
+            for ticker, frame in data.groupby('ticker', sort=False)
+            if not frame.empty
+        }
+    
+    def _tick_frame(self, tickers: List[str]) -> pd.DataFrame:
+        """Ticks to replay from the clock onwards, in time order."""
+        if self.ticks_path:
+            ticks = self._normalize(self._read_file(self.ticks_path))
+            ticks = ticks[ticks['ticker'].isin(tickers)]
+            if 'match_volume' not in ticks.columns:
+                ticks['match_volume'] = 0
+        else:
+            ticks = self._synthesize_ticks(tickers)
+        
+        if self._cursor is not None:
+            ticks = ticks[ticks['timestamp'] >= self._cursor]
+        return ticks.sort_values('timestamp', kind='stable').reset_index(drop=True)
+    
+    def _synthesize_ticks(self, tickers: List[str]) -> pd.DataFrame:
+        """Four ticks per bar: open, low/high (in candle direction), close."""
+        frames = []
+        offsets = [self.bar_length * k / 4 for k in range(4)]
+        for ticker in tickers:
+            bars = self._load().get(ticker)
+            if bars is None or bars.empty:
+                continue
+            
+            rising = (bars['close'] >= bars['open']).to_numpy()
+            first_extreme = np.where(rising, bars['low'], bars['high'])
+            second_extreme = np.where(rising, bars['high'], bars['low'])
+            prices = np.column_stack([bars['open'], first_extreme, second_extreme, bars['close']])
+            
+            volume = bars['volume'].to_numpy(dtype=np.int64)
+            parts = np.column_stack([volume // 4] * 3 + [volume - 3 * (volume // 4)])
+            
+            timestamps = (bars['timestamp'].to_numpy()[:, None]
+                          + np.array([offset.to_timedelta64() for offset in offsets])[None, :])
+            
+            ticks = pd.DataFrame({
+                'ticker': ticker,
+                'timestamp': timestamps.ravel(),
+                'price': prices.ravel(),
+                'match_volume': parts.ravel()
+            })
+            # Cumulative matched volume restarts every session
+            ticks['volume'] = ticks.groupby(ticks['timestamp'].dt.normalize())['match_volume'].cumsum()
+            frames.append(ticks)
+        
+        if not frames:
+            return pd.DataFrame(columns=['ticker', 'timestamp', 'price', 'match_volume', 'volume'])
+        return pd.concat(frames, ignore_index=True)
+    
+    def start_realtime_stream(self, tickers: List[str],
+                              callback: Callable[[MarketDataPoint], None]) -> bool:
+        """
+        Start replaying ticks for tickers.
+        
+        Args:
+            tickers: List of stock symbols
+            callback: Function to process each data point
+        
+        Returns:
+            bool: Success status
+        """
+        if self.stream_active:
+            self.logger.warning("Stream already active")
+            return True
+        
+        try:
+            self._load()
+            ticks = self._tick_frame(tickers)
+        except Exception as e:
+            self.logger.error(f"Failed to prepare replay stream: {str(e)}")
+            return False
+        
+        self.stream_dispatcher = StreamDispatcher(
+            callback,
+            workers=self.stream_workers,
+            max_queue_size=self.stream_queue_size
+        )
+        self.stream_dispatcher.start()
+        self.stream_stop_event.clear()
+        self.stream_finished.clear()
+        
+        self.stream_thread = threading.Thread(target=self._run_stream, args=(ticks,), daemon=True)
+        self.stream_thread.start()
+        self.stream_active = True
+        self.logger.info(f"Replaying {len(ticks)} ticks for {len(tickers)} symbols "
+                         f"at {f'{self.speed}x' if self.speed else 'full'} speed")
+        return True
+    
+    def _run_stream(self, ticks: pd.DataFrame):
+        """Emit ticks in time order, paced by the replay speed."""
+        wall_start = time.monotonic()
+        first_ts = ticks['timestamp'].iloc[0] if len(ticks) else None
+        sessions: Dict[str, Dict[str, Any]] = {}
+        
+        try:
+            for row in ticks.itertuples(index=False):
+                if self.stream_stop_event.is_set():
+                    break
+                
+                if self.speed:
+                    due = (row.timestamp - first_ts).total_seconds() / self.speed
+                    delay = due - (time.monotonic() - wall_start)
+                    if delay > 0 and self.stream_stop_event.wait(delay):
+                        break
+                
+                # Running session open/high/low per ticker
+                session = sessions.get(row.ticker)
+                day = row.timestamp.normalize()
+                if session is None or session['day'] != day:
+                    session = sessions[row.ticker] = {'day': day, 'open': row.price,
+                                                      'high': row.price, 'low': row.price}
+                session['high'] = max(session['high'], row.price)
+                session['low'] = min(session['low'], row.price)
+                
+                self._cursor = row.timestamp
+                self.stream_dispatcher.submit(row.ticker, MarketDataPoint(
+                    ticker=row.ticker,
+                    timestamp=self.tz.localize(row.timestamp.to_pydatetime()),
+                    open=session['open'],
+                    high=session['high'],
+                    low=session['low'],
+                    close=row.price,
+                    volume=int(row.volume),
+                    change=row.price - session['open'],
+                    change_percent=(row.price / session['open'] - 1) * 100 if session['open'] else 0.0,
+                    match_volume=int(row.match_volume)
+                ))
+                self.ticks_replayed += 1
+            else:
+                # Replay complete: every replayed bar is visible
+                if len(ticks):
+                    self._cursor = ticks['timestamp'].iloc[-1] + self.bar_length
+        except Exception as e:
+            self.logger.error(f"Replay stream error: {str(e)}")
+        finally:
+            self.replay_seconds = time.monotonic() - wall_start
+            self.stream_finished.set()
+    
+    def stop_realtime_stream(self):
+        """Stop the replay stream."""
+        if not self.stream_active:
+            return
+        
+        self.stream_stop_event.set()
+        if self.stream_thread and self.stream_thread.is_alive():
+            self.stream_thread.join(timeout=10)
+        if self.stream_dispatcher:
+            self.stream_dispatcher.stop()
+        self.stream_active = False
+    
+    def wait_for_stream(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until every tick has been replayed and handled.
+        
+        Args:
+            timeout: Maximum seconds to wait for the replay
+        
+        Returns:
+            bool: Whether the replay finished in time
+        """
+        if not self.stream_finished.wait(timeout):
+            return False
+        while self.stream_dispatcher and self.stream_dispatcher.queue_depth():
+            time.sleep(0.01)
+        return True
+    
+    def get_stream_stats(self) -> Dict[str, Any]:
+        """
+        Get replay throughput and dispatch metrics.
+        
+        Returns:
+            Dict: Ticks replayed, replay duration, ticks per second and dispatcher statistics
+        """
+        stats = {
+            'ticks_replayed': self.ticks_replayed,
+            'replay_seconds': self.replay_seconds,
+            'ticks_per_second': self.ticks_replayed / self.replay_seconds if self.replay_seconds else None,
+            'finished': self.stream_finished.is_set()
+        }
+        if self.stream_dispatcher:
+            stats['dispatch'] = self.stream_dispatcher.get_stats()
+        return stats
+    
+    def health_check(self) -> Dict[str, Any]:
+        """
+        Perform health check on the replay source.
+        
+        Returns:
+            Dict: Health status information
+        """
+        bars = self._bars or {}
+        return {
+            "provider": "replay",
+            "source": str(self.path),
+            "loaded": self._bars is not None,
+            "tickers": len(bars),
+            "replay_clock": self._cursor.isoformat() if self._cursor is not None else None,
+            "speed": self.speed,
+            "stream_active": self.stream_active,
+            "stream_stats": self.get_stream_stats(),
+            "io_timeouts": self.io_timeouts
+        }
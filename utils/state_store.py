@@ -0,0 +1,145 @@
+"""Persistent strategy state snapshots.
+Keeps the latest serialized indicator engine and strategy state per ticker
+in SQLite, so a restart resumes from the snapshot and only applies the
+bars that closed since, instead of recomputing every indicator.
+"""
+
+import json
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+
+def _json_default(value: Any) -> Any:
+    """Encode numpy scalars that json can't handle natively."""
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class StateSnapshotStore:
+    """
+    SQLite table of per-ticker state snapshots.
+    
+    Each row holds compact JSON for one ticker's indicator engine and
+    strategy state; a save replaces the rows of every ticker it contains
+    in a single transaction, so a crash mid-save keeps the previous
+    snapshot.
+    """
+    
+    def __init__(self, path: str):
+        """
+        Initialize snapshot store.
+        
+        Args:
+            path: SQLite database file
+        """
+        self.logger = logging.getLogger(__name__)
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS state_snapshots (
+                ticker TEXT PRIMARY KEY,
+                indicator_state TEXT,
+                strategy_state TEXT,
+                last_bar_time TEXT,
+                saved_at REAL NOT NULL
+            );
+        """)
+        self._conn.commit()
+        
+        self.saves = 0
+        self.last_saved_at: Optional[float] = None
+        self.last_save_seconds = 0.0
+    
+    def save(self, snapshot: Dict[str, Dict[str, Any]]) -> int:
+        """
+        Store a snapshot.
+        
+        Args:
+            snapshot: Ticker -> {'indicators': engine state or None,
+                'strategy': strategy state or None}
+        
+        Returns:
+            int: Number of tickers written
+        """
+        started = time.monotonic()
+        now = time.time()
+        rows = []
+        for ticker, entry in snapshot.items():
+            indicators = entry.get('indicators')
+            strategy = entry.get('strategy')
+            rows.append((
+                ticker,
+                json.dumps(indicators, separators=(',', ':'), default=_json_default) if indicators else None,
+                json.dumps(strategy, separators=(',', ':'), default=_json_default) if strategy else None,
+                indicators.get('last_timestamp') if indicators else None,
+                now
+            ))
+        
+        with self._lock:
+            with self._conn:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO state_snapshots "
+                    "(ticker, indicator_state, strategy_state, last_bar_time, saved_at) VALUES (?, ?, ?, ?, ?)",
+                    rows
+                )
+        
+        self.saves += 1
+        self.last_saved_at = now
+        self.last_save_seconds = time.monotonic() - started
+        return len(rows)
+    
+    def load(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Load the latest snapshot.
+        
+        Returns:
+            Dict[str, Dict[str, Any]]: Same layout as save() accepts
+                (unreadable rows are skipped)
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT ticker, indicator_state, strategy_state FROM state_snapshots"
+            ).fetchall()
+        
+        snapshot = {}
+        for ticker, indicators, strategy in rows:
+            try:
+                snapshot[ticker] = {
+                    'indicators': json.loads(indicators) if indicators else None,
+                    'strategy': json.loads(strategy) if strategy else None
+                }
+            except ValueError as e:
+                self.logger.warning(f"Skipping unreadable state snapshot for {ticker}: {str(e)}")
+        return snapshot
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get snapshot statistics."""
+        with self._lock:
+            tickers, size = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(COALESCE(LENGTH(indicator_state), 0) "
+                "+ COALESCE(LENGTH(strategy_state), 0)), 0) FROM state_snapshots"
+            ).fetchone()
+        return {
+            'tickers': tickers,
+            'size_bytes': size,
+            'saves': self.saves,
+            'last_saved_at': self.last_saved_at,
+            'last_save_seconds': round(self.last_save_seconds, 4)
+        }
+    
+    def close(self):
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,204 @@
+"""Bounded dispatch of realtime stream events.
+Decouples the feed thread from event processing: events go into bounded
+per-worker queues drained by worker threads, coalescing to the latest
+event per ticker when a queue is full.
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+import numpy as np
+
+
+class _Shard:
+    """One worker's queue and its counters (guarded by cond)."""
+    
+    def __init__(self):
+        self.queue: Deque[List[Any]] = deque()  # Slots are [key, event, enqueued_at]
+        self.latest: Dict[str, List[Any]] = {}  # Newest pending slot per key
+        self.cond = threading.Condition()
+        self.submitted = 0
+        self.coalesced = 0
+        self.dropped = 0
+        self.max_depth = 0
+
+
+class StreamDispatcher:
+    """
+    Bounded, backpressure-aware event dispatcher.
+    
+    Keys (tickers) are hashed to workers, so events of one ticker are
+    handled in arrival order by a single thread. When a worker's queue is
+    full, an event for a ticker that already has one pending replaces it
+    (coalesced); an event for any other ticker is dropped. submit() never
+    blocks the feed thread.
+    """
+    
+    def __init__(self, callback: Callable[[Any], None],
+                 workers: int = 1,
+                 max_queue_size: int = 10000,
+                 latency_window: int = 1000):
+        """
+        Initialize dispatcher.
+        
+        Args:
+            callback: Event handler run on the worker threads
+            workers: Number of worker threads
+            max_queue_size: Maximum pending events across all workers
+            latency_window: Number of recent event-to-callback latencies kept
+        """
+        self.logger = logging.getLogger(__name__)
+        self.callback = callback
+        self.workers = max(1, workers)
+        self.shard_capacity = max(1, max_queue_size // self.workers)
+        
+        self._shards = [_Shard() for _ in range(self.workers)]
+        self._threads: List[threading.Thread] = []
+        self._running = False
+        
+        # Worker-side metrics (submit-side counters live on the shards)
+        self._stats_lock = threading.Lock()
+        self._latencies: Deque[float] = deque(maxlen=latency_window)
+        self.processed = 0
+        self.callback_errors = 0
+    
+    def start(self):
+        """Start the worker threads."""
+        if self._running:
+            return
+        
+        self._running = True
+        self._threads = [
+            threading.Thread(target=self._worker, args=(shard,), name=f"stream-dispatch-{i}", daemon=True)
+            for i, shard in enumerate(self._shards)
+        ]
+        for thread in self._threads:
+            thread.start()
+    
+    def stop(self, drain: bool = True, timeout: float = 10.0):
+        """
+        Stop the worker threads.
+        
+        Args:
+            drain: Process pending events before stopping (otherwise discard them)
+            timeout: Maximum seconds to wait for each worker
+        """
+        if not self._running:
+            return
+        
+        self._running = False
+        for shard in self._shards:
+            with shard.cond:
+                if not drain:
+                    shard.dropped += len(shard.queue)
+                    shard.queue.clear()
+                    shard.latest.clear()
+                shard.cond.notify_all()
+        for thread in self._threads:
+            thread.join(timeout=timeout)
+        self._threads = []
+    
+    def submit(self, key: str, event: Any) -> bool:
+        """
+        Queue an event (non-blocking).
+        
+        Args:
+            key: Ordering/coalescing key (ticker)
+            event: Event passed to the callback
+        
+        Returns:
+            bool: False if the event was dropped
+        """
+        shard = self._shards[hash(key) % self.workers]
+        now = time.monotonic()
+        with shard.cond:
+            shard.submitted += 1
+            if len(shard.queue) >= self.shard_capacity:
+                slot = shard.latest.get(key)
+                if slot is None:
+                    shard.dropped += 1
+                    return False
+                # Keep the slot's queue position and enqueue time, take the newer event
+                slot[1] = event
+                shard.coalesced += 1
+                return True
+            
+            slot = [key, event, now]
+            shard.queue.append(slot)
+            shard.latest[key] = slot
+            shard.max_depth = max(shard.max_depth, len(shard.queue))
+            shard.cond.notify()
+        return True
+    
+    def queue_depth(self) -> int:
+        """Number of pending events across workers."""
+        return sum(len(shard.queue) for shard in self._shards)
+    
+    def _worker(self, shard: _Shard):
+        """Drain one queue until stopped."""
+        while True:
+            with shard.cond:
+                while not shard.queue and self._running:
+                    shard.cond.wait()
+                if not shard.queue:
+                    return
+                key, event, enqueued_at = slot = shard.queue.popleft()
+                if shard.latest.get(key) is slot:
+                    del shard.latest[key]
+            
+            started = time.monotonic()
+            try:
+                self.callback(event)
+            except Exception as e:
+                with self._stats_lock:
+                    self.callback_errors += 1
+                self.logger.error(f"Stream callback failed for {key}: {str(e)}")
+            
+            with self._stats_lock:
+                self.processed += 1
+                self._latencies.append(started - enqueued_at)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get dispatcher metrics.
+        
+        Returns:
+            Dict with queue depth, counters and event-to-callback latency (ms)
+        """
+        with self._stats_lock:
+            latencies = np.array(self._latencies) * 1000
+            processed = self.processed
+            callback_errors = self.callback_errors
+        
+        counters = {'submitted': 0, 'coalesced': 0, 'dropped': 0}
+        max_depth = 0
+        for shard in self._shards:
+            with shard.cond:
+                for name in counters:
+                    counters[name] += getattr(shard, name)
+                max_depth = max(max_depth, shard.max_depth)
+        
+        latency: Optional[Dict[str, float]] = None
+        if len(latencies):
+            latency = {
+                'avg': float(latencies.mean()),
+                'p50': float(np.percentile(latencies, 50)),
+                'p95': float(np.percentile(latencies, 95)),
+                'p99': float(np.percentile(latencies, 99)),
+                'max': float(latencies.max())
+            }
+        
+        return {
+            'running': self._running,
+            'workers': self.workers,
+            'queue_depth': self.queue_depth(),
+            'max_worker_queue_depth': max_depth,
+            'queue_capacity': self.shard_capacity * self.workers,
+            **counters,
+            'processed': processed,
+            'callback_errors': callback_errors,
+            'latency_ms': latency
+        }
@@ -0,0 +1,178 @@
+"""
+Pre-market warm-up.
+Bulk-loads recent bars for the trading universe before the open, so the
+first update cycle of the session reads warm cache tiers and indicator
+state instead of going to the API for every ticker.
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+import pandas as pd
+
+from utils.data_source import DataSource
+
+
+@dataclass
+class WarmupReport:
+    """Progress and outcome of a warm-up run."""
+    tickers_total: int
+    tickers_done: int = 0
+    tickers_loaded: int = 0
+    cache_entries: int = 0
+    elapsed: float = 0.0
+    budget_exhausted: bool = False
+    failed: List[str] = field(default_factory=list)
+    seeded: List[str] = field(default_factory=list)
+    
+    @property
+    def engines_seeded(self) -> int:
+        """Number of indicator engines brought up to date."""
+        return len(self.seeded)
+    
+    @property
+    def progress(self) -> float:
+        """Fraction of the universe processed."""
+        return self.tickers_done / self.tickers_total if self.tickers_total else 1.0
+    
+    @property
+    def completed(self) -> bool:
+        """Whether every ticker was processed within the time budget."""
+        return self.tickers_done == self.tickers_total and not self.budget_exhausted
+    
+    def summary(self) -> str:
+        """One-line description for logs and alerts."""
+        text = (f"{self.tickers_loaded}/{self.tickers_total} symbols loaded, "
+                f"{self.engines_seeded} indicator engines seeded in {self.elapsed:.1f}s")
+        if self.budget_exhausted:
+            text += f" (time budget exhausted after {self.tickers_done} symbols)"
+        return text
+
+
+class CacheWarmer:
+    """
+    Loads bars for a universe into the cache tiers and the strategy's
+    streaming indicator engines, chunk by chunk, within a time budget.
+    """
+    
+    def __init__(self, data_source: DataSource,
+                 cache_manager: Any,
+                 key_func: Callable[[str], str],
+                 strategy: Optional[Any] = None,
+                 timeframe: str = "15m",
+                 period: int = 100,
+                 time_budget: float = 300.0,
+                 chunk_size: int = 100):
+        """
+        Initialize warmer.
+        
+        Args:
+            data_source: Source the bars are fetched from (a bar store
+                behind it is filled as a side effect)
+            cache_manager: Cache the frames are written to
+            key_func: Cache key of a ticker's frame (same as the update cycle's)
+            strategy: Strategy whose streaming indicators are brought up to
+                date (None to skip)
+            timeframe: Bar timeframe
+            period: Bars fetched per ticker
+            time_budget: Seconds before the remaining tickers are skipped
+            chunk_size: Tickers per fetch and progress report
+        """
+        self.data_source = data_source
+        self.cache_manager = cache_manager
+        self.key_func = key_func
+        self.strategy = strategy
+        self.timeframe = timeframe
+        self.period = period
+        self.time_budget = time_budget
+        self.chunk_size = chunk_size
+        self.logger = logging.getLogger(__name__)
+    
+    async def run(self, tickers: List[str],
+                  cache_ttl: Optional[int] = None,
+                  drop_last_bar: bool = False,
+                  on_progress: Optional[Callable[[WarmupReport], None]] = None) -> WarmupReport:
+        """
+        Warm the cache and indicator state for tickers.
+        
+        Args:
+            tickers: Trading universe
+            cache_ttl: TTL of the cached frames (should outlast the time to the open)
+            drop_last_bar: Leave the last bar out of the indicator state
+                (it may still be forming when warming during a session)
+            on_progress: Called with the running report after each chunk
+        
+        Returns:
+            WarmupReport: Outcome of the run
+        """
+        tickers = list(dict.fromkeys(tickers))
+        report = WarmupReport(tickers_total=len(tickers))
+        started = time.monotonic()
+        deadline = started + self.time_budget
+        
+        for i in range(0, len(tickers), self.chunk_size):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                report.budget_exhausted = True
+                break
+            
+            chunk = tickers[i:i + self.chunk_size]
+            frames = await self._fetch_chunk(chunk, remaining)
+            frames = {ticker: df for ticker, df in frames.items() if df is not None and not df.empty}
+            
+            if frames:
+                try:
+                    if await self.cache_manager.aset_many(
+                        {self.key_func(ticker): df for ticker, df in frames.items()}, ttl=cache_ttl
+                    ):
+                        report.cache_entries += len(frames)
+                except Exception as e:
+                    self.logger.error(f"Warm-up cache write failed: {str(e)}")
+                
+                if self.strategy is not None:
+                    self._seed_indicators(frames, drop_last_bar, deadline, report)
+            
+            report.tickers_loaded += len(frames)
+            report.failed.extend(ticker for ticker in chunk if ticker not in frames)
+            report.tickers_done += len(chunk)
+            report.elapsed = time.monotonic() - started
+            
+            if on_progress is not None:
+                try:
+                    on_progress(report)
+                except Exception as e:
+                    self.logger.error(f"Warm-up progress callback error: {str(e)}")
+        
+        report.elapsed = time.monotonic() - started
+        return report
+    
+    async def _fetch_chunk(self, chunk: List[str], timeout: float) -> Dict[str, pd.DataFrame]:
+        """Fetch a chunk of tickers, giving up when the budget runs out."""
+        try:
+            return await asyncio.wait_for(
+                self.data_source.afetch_many(chunk, timeframe=self.timeframe, period=self.period,
+                                             timeout=timeout),
+                timeout
+            )
+        except asyncio.TimeoutError:
+            self.logger.warning(f"Warm-up fetch of {len(chunk)} tickers starting at {chunk[0]} "
+                                f"ran out of time budget")
+        except Exception as e:
+            self.logger.error(f"Warm-up fetch failed for {len(chunk)} tickers starting at {chunk[0]}: {str(e)}")
+        return {}
+    
+    def _seed_indicators(self, frames: Dict[str, pd.DataFrame], drop_last_bar: bool,
+                         deadline: float, report: WarmupReport):
+        """Sync streaming indicator engines with fetched frames until the deadline."""
+        for ticker, df in frames.items():
+            if time.monotonic() > deadline:
+                report.budget_exhausted = True
+                break
+            try:
+                self.strategy.sync_streaming_indicators(ticker, df.iloc[:-1] if drop_last_bar else df)
+                report.seeded.append(ticker)
+            except Exception as e:
+                self.logger.error(f"Warm-up indicator seeding failed for {ticker}: {str(e)}")